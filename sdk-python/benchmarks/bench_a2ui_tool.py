@@ -0,0 +1,72 @@
+"""Benchmark: preparing the generate_a2ui tool for a model call.
+
+CopilotKitMiddleware injects generate_a2ui into every model call of an agent
+with A2UI turned on. Compares building the tool with ``get_a2ui_tools`` on
+every call (the previous behavior) against the shared tool cache.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_a2ui_tool
+"""
+
+import json
+import time
+from types import SimpleNamespace
+
+from langchain.agents.middleware import ModelRequest
+
+from copilotkit import copilotkit_lg_middleware
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+
+CALLS = 200
+SCHEMA = json.dumps(
+    {
+        "catalogId": "dashboard",
+        "components": [
+            {"name": f"Component{i}", "props": {"title": "string"}} for i in range(50)
+        ],
+    }
+)
+
+
+def _request(model) -> ModelRequest:
+    return ModelRequest(
+        model=model,
+        messages=[],
+        system_message=None,
+        tools=[],
+        state={
+            "messages": [],
+            "ag-ui": {"a2ui_schema": SCHEMA, "inject_a2ui_tool": True},
+        },
+        runtime=SimpleNamespace(context=None),
+    )
+
+
+def _time(prepare) -> float:
+    request = _request(SimpleNamespace())
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        prepare(request)
+    return (time.perf_counter() - start) / CALLS
+
+
+def main():
+    if copilotkit_lg_middleware.get_a2ui_tools is None:
+        print("ag-ui-langgraph without get_a2ui_tools is installed")
+        return
+    middleware = CopilotKitMiddleware()
+
+    def rebuild(request):
+        copilotkit_lg_middleware._build_a2ui_tool.cache_clear()
+        middleware._maybe_build_a2ui_tool(request)
+
+    rebuilt = _time(rebuild)
+    cached = _time(middleware._maybe_build_a2ui_tool)
+    print(f"{CALLS} model calls")
+    print(f"rebuilt per call  {rebuilt * 1e6:>8.1f}us")
+    print(f"cached            {cached * 1e6:>8.1f}us  ({rebuilt / cached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
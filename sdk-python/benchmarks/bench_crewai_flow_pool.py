@@ -0,0 +1,65 @@
+"""Benchmark: preparing a CrewAI flow for a request in CrewAIAgent.
+
+The flow carries a stand-in for the clients, tools and memory of a real agent:
+a few thousand nested objects. Compares copying the flow for every request
+(the default) against checking a prepared flow out of the pool and resetting
+it afterwards (`pool_size`). Needs crewai.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_crewai_flow_pool
+"""
+
+import time
+
+from crewai import Flow
+from crewai.flow import start
+
+from copilotkit.crewai.crewai_agent import CrewAIAgent
+
+REQUESTS = 200
+
+
+class Client:  # pylint: disable=too-few-public-methods
+    """Stands in for an LLM client with its configuration and caches"""
+
+    def __init__(self, index: int):
+        self.config = {"model": f"model-{index}", "headers": {"x-index": str(index)}}
+        self.cache = {f"key-{i}": list(range(20)) for i in range(50)}
+
+
+class AssistantFlow(Flow):
+    def __init__(self):
+        super().__init__()
+        self.clients = [Client(i) for i in range(50)]
+
+    @start()
+    def chat(self):
+        self.state["turns"] = self.state.get("turns", 0) + 1
+
+
+def _setup_time(agent: CrewAIAgent) -> float:
+    """Seconds per request spent preparing and returning the flow"""
+    start_time = time.perf_counter()
+    for _ in range(REQUESTS):
+        if agent._pool is None:  # pylint: disable=protected-access
+            agent._build_flow()  # pylint: disable=protected-access
+        else:
+            flow, initial_state = agent._pool.check_out()  # pylint: disable=protected-access
+            flow.state["turns"] = 1
+            agent._pool.check_in(flow, initial_state)  # pylint: disable=protected-access
+    return (time.perf_counter() - start_time) / REQUESTS
+
+
+def main():
+    copied = _setup_time(CrewAIAgent(name="assistant", flow=AssistantFlow()))
+    pooled = _setup_time(
+        CrewAIAgent(name="assistant", flow=AssistantFlow(), pool_size=4)
+    )
+    print(f"{REQUESTS} requests")
+    print(f"deepcopy per request  {copied * 1000:>8.3f}ms")
+    print(f"pooled                {pooled * 1000:>8.3f}ms  ({copied / pooled:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: events and encoder work for single-character model chunks.
+
+Streams a 5,000 character answer, one character per chunk and paced like a fast
+provider, through LangGraphAGUIAgent.run() and encodes every event as the AG-UI
+endpoint does. Compares no coalescing (one event per chunk, the previous
+behavior) against the default 15 ms window.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_delta_coalescing
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from ag_ui.core import TextMessageContentEvent, TextMessageEndEvent
+from ag_ui.encoder import EventEncoder
+
+from copilotkit.langgraph_agui_agent import DELTA_COALESCE_WINDOW, LangGraphAGUIAgent
+
+CHARACTERS = 5_000
+CHUNKS_PER_SECOND = 5_000
+
+
+# pylint: disable-next=redefined-builtin,unused-argument
+async def _super_run(self, input):
+    for i in range(CHARACTERS):
+        if i % 50 == 0:
+            await asyncio.sleep(50 / CHUNKS_PER_SECOND)
+        yield TextMessageContentEvent(messageId="message", delta="x")
+    yield TextMessageEndEvent(messageId="message")
+
+
+async def _measure(window: float):
+    agent = LangGraphAGUIAgent(name="bench", graph=MagicMock(), coalesce_window=window)
+    encoder = EventEncoder()
+    events = 0
+    size = 0
+    encoding = 0.0
+    async for event in agent.run(MagicMock()):
+        started = time.perf_counter()
+        size += len(encoder.encode(event))
+        encoding += time.perf_counter() - started
+        events += 1
+    return events, size, encoding
+
+
+def main():
+    print(f"{'window':>8} {'events':>8} {'bytes':>10} {'encode ms':>10}")
+    with patch.object(LangGraphAGUIAgent.__bases__[0], "run", new=_super_run):
+        for window in (0.0, DELTA_COALESCE_WINDOW):
+            events, size, encoding = asyncio.run(_measure(window))
+            print(f"{window:>8} {events:>8,} {size:>10,} {encoding * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: a graph whose hidden sub-model streams 10,000 tokens.
+
+The research node calls a chat model hidden with
+`copilotkit_customize_config(emit_messages=False, emit_tool_calls=False)`, then
+a visible model answers. Compares filtering in `_dispatch_event`, after the
+adapter has built every event (the previous behavior), against skipping the
+hidden model's stream before any event is built. Both still pass the RAW copy
+of every chunk through. Events are encoded as the AG-UI endpoint does.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_hidden_model
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from ag_ui.core import UserMessage
+from ag_ui.core.types import RunAgentInput
+from ag_ui.encoder import EventEncoder
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from copilotkit.langgraph import copilotkit_customize_config
+from copilotkit.langgraph_agui_agent import LangGraphAGUIAgent
+
+HIDDEN_TOKENS = 10_000
+RUNS = 3
+
+
+def _graph():
+    async def research(state: MessagesState, config: RunnableConfig):
+        hidden_model = GenericFakeChatModel(
+            messages=iter([AIMessage(content="token " * HIDDEN_TOKENS)])
+        )
+        await hidden_model.ainvoke(
+            state["messages"],
+            copilotkit_customize_config(
+                config, emit_messages=False, emit_tool_calls=False
+            ),
+        )
+        return {}
+
+    async def answer(state: MessagesState):
+        visible_model = GenericFakeChatModel(messages=iter([AIMessage(content="done")]))
+        return {"messages": [await visible_model.ainvoke(state["messages"])]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("research", research)
+    builder.add_node("answer", answer)
+    builder.add_edge(START, "research")
+    builder.add_edge("research", "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+async def _run(graph, run: int):
+    agent = LangGraphAGUIAgent(name="bench", graph=graph)
+    run_input = RunAgentInput(
+        threadId=f"thread-{run}",
+        runId=f"run-{run}",
+        state={},
+        messages=[UserMessage(id="u1", content="hi")],
+        tools=[],
+        context=[],
+        forwardedProps={},
+    )
+    encoder = EventEncoder()
+    events = 0
+    size = 0
+    started = time.perf_counter()
+    async for event in agent.run(run_input):
+        events += 1
+        size += len(encoder.encode(event))
+    return time.perf_counter() - started, events, size
+
+
+def _best(graph):
+    return min(asyncio.run(_run(graph, run)) for run in range(RUNS))
+
+
+def main():
+    graph = _graph()
+    with patch.object(LangGraphAGUIAgent, "_is_hidden_model_event", return_value=False):
+        previous = _best(graph)
+    skipped = _best(graph)
+    print(f"{'filtering':>22} {'seconds':>8} {'events':>8} {'bytes':>11}")
+    for name, (seconds, events, size) in (
+        ("after building events", previous),
+        ("before building events", skipped),
+    ):
+        print(f"{name:>22} {seconds:>8.2f} {events:>8,} {size:>11,}")
+    print(f"{'speedup':>22} {previous[0] / skipped[0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
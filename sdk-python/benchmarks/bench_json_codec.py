@@ -0,0 +1,116 @@
+"""Benchmark: encoding a token event stream with each JSON codec.
+
+Compares the previous `emit_runtime_events` (rebuilds every event to convert
+Enum values, then `json.dumps` with default separators) against the pluggable
+codec with each installed backend, for the small token events that dominate an
+agent run and for a large state snapshot.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_json_codec
+"""
+
+import json
+import time
+from enum import Enum
+
+from copilotkit import json_codec
+from copilotkit.protocol import (
+    agent_state_message,
+    emit_runtime_events,
+    text_message_content,
+)
+
+TOKEN_EVENTS = 100_000
+STATE_ENCODES = 2_000
+
+
+def _legacy_emit_runtime_events(*events):
+    def serialize_event(event):
+        if isinstance(event, dict):
+            return {
+                k: (v.value if isinstance(v, Enum) else v) for k, v in event.items()
+            }
+        return event
+
+    return "\n".join(json.dumps(serialize_event(event)) for event in events) + "\n"
+
+
+def _state():
+    return {
+        "documents": [
+            {"id": i, "title": f"Document {i}", "tags": ["a", "b", "ü"], "score": i / 7}
+            for i in range(200)
+        ],
+        "progress": 0.5,
+    }
+
+
+def _state_event(state: str):
+    return agent_state_message(
+        thread_id="thread",
+        agent_name="agent",
+        node_name="node",
+        run_id="run",
+        active=True,
+        role="assistant",
+        state=state,
+        running=True,
+    )
+
+
+def _per_second(fn, count) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / (time.perf_counter() - started)
+
+
+def _available_codecs():
+    codecs = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            json_codec.set_json_codec(name)
+        except Exception:  # pylint: disable=broad-except
+            print(f"{name:>8} not installed")
+            continue
+        codecs.append(name)
+    json_codec.set_json_codec()
+    return codecs
+
+
+def main():
+    event = text_message_content(message_id="message", content="token ")
+    state = _state()
+    codecs = _available_codecs()
+
+    legacy_events = _per_second(
+        lambda: _legacy_emit_runtime_events(event), TOKEN_EVENTS
+    )
+    legacy_state = _per_second(
+        lambda: _legacy_emit_runtime_events(_state_event(json.dumps(state))),
+        STATE_ENCODES,
+    )
+
+    print(
+        f"{'codec':>8} {'token events':>16} {'speedup':>8} {'state':>12} {'speedup':>8}"
+    )
+    print(
+        f"{'previous':>8} {legacy_events:>12,.0f} ev/s {'':>8} {legacy_state:>8,.0f} /s"
+    )
+    for name in codecs:
+        json_codec.set_json_codec(name)
+        events = _per_second(lambda: emit_runtime_events(event), TOKEN_EVENTS)
+        states = _per_second(
+            lambda: emit_runtime_events(_state_event(json_codec.dumps(state))),
+            STATE_ENCODES,
+        )
+        print(
+            f"{name:>8} {events:>12,.0f} ev/s {events / legacy_events:>7.1f}x "
+            f"{states:>8,.0f} /s {states / legacy_state:>7.1f}x"
+        )
+    json_codec.set_json_codec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: fixing the message history in CopilotKitMiddleware.wrap_model_call.
+
+A run loads a thread of N messages and then calls the model 10 times in a tool
+loop, each call appending an AIMessage with a tool call and its ToolMessage.
+Compares fixing the whole history on every call (the previous behavior)
+against the per-thread cache, which only fixes the messages appended since the
+previous call.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_message_normalization
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from langchain.agents.middleware import ModelRequest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from copilotkit import copilotkit_lg_middleware
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+
+THREAD_SIZES = (100, 1_000, 5_000)
+MODEL_CALLS = 10
+RUNS = 5
+
+
+def _turn(index: int) -> list:
+    tool_call_id = f"call-{index}"
+    return [
+        AIMessage(
+            content=[
+                {"type": "text", "text": f"Looking up {index}"},
+                {
+                    "type": "tool_use",
+                    "id": tool_call_id,
+                    "name": "search",
+                    "input": {"q": str(index)},
+                },
+            ],
+            tool_calls=[
+                {"id": tool_call_id, "name": "search", "args": {"q": str(index)}}
+            ],
+            id=f"ai-{index}",
+        ),
+        ToolMessage(content="result " * 20, tool_call_id=tool_call_id),
+    ]
+
+
+def _thread(size: int) -> list:
+    messages: list = []
+    while len(messages) < size:
+        messages.append(HumanMessage(f"question {len(messages)}"))
+        messages.extend(_turn(len(messages)))
+    return messages[:size]
+
+
+def _run(size: int, cached: bool) -> float:
+    """Seconds spent in wrap_model_call over one run of the tool loop."""
+    middleware = CopilotKitMiddleware()
+    messages = _thread(size)
+    runtime = SimpleNamespace(context=None)
+    cache_key = ("thread", ("model",)) if cached else None
+    elapsed = 0.0
+    with patch.object(
+        copilotkit_lg_middleware, "_history_cache_key", return_value=cache_key
+    ):
+        for call in range(MODEL_CALLS):
+            request = ModelRequest(
+                model=SimpleNamespace(),
+                messages=messages,
+                system_message=None,
+                tools=[],
+                state={"messages": messages},
+                runtime=runtime,
+            )
+            start = time.perf_counter()
+            middleware.wrap_model_call(request, lambda request: None)
+            elapsed += time.perf_counter() - start
+            messages = [*messages, *_turn(size + call)]
+    return elapsed
+
+
+def main():
+    print(f"{MODEL_CALLS} model calls per run, best of {RUNS} runs")
+    print(f"{'messages':>8}  {'full fix':>10}  {'cached':>10}  {'speedup':>8}")
+    for size in THREAD_SIZES:
+        full = min(_run(size, cached=False) for _ in range(RUNS))
+        cached = min(_run(size, cached=True) for _ in range(RUNS))
+        print(
+            f"{size:>8}  {full * 1000:>8.2f}ms  {cached * 1000:>8.2f}ms"
+            f"  {full / cached:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
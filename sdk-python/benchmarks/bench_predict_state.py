@@ -0,0 +1,110 @@
+"""Benchmark: streaming tool-call argument parsing in predict_state().
+
+Compares re-parsing the whole argument buffer with partialjson on every chunk
+(the previous predict_state() path) against feeding each chunk to one resumable
+`IncrementalJSONParser`, for 1 KB, 10 KB and 100 KB arguments streamed in
+provider-sized chunks. Needs partialjson, which copilotkit no longer depends on.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_predict_state
+"""
+
+import json
+import time
+
+from partialjson.json_parser import JSONParser as PartialJSONParser
+
+from copilotkit.protocol import RuntimeEventTypes
+from copilotkit.runloop import predict_state
+from copilotkit.streaming_json import IncrementalJSONParser
+
+CHUNK_SIZE = 16
+SIZES = [1_000, 10_000, 100_000]
+
+
+def _payload(size: int) -> str:
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    document = (paragraph * (size // len(paragraph) + 1))[:size]
+    return json.dumps({"title": "Report", "document": document, "done": False})
+
+
+def _chunks(payload: str):
+    return [payload[i : i + CHUNK_SIZE] for i in range(0, len(payload), CHUNK_SIZE)]
+
+
+def bench_reparse(chunks) -> float:
+    """The previous path: append to a buffer and parse it from scratch."""
+    started = time.perf_counter()
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        PartialJSONParser().parse(buffer).get("document")
+    return time.perf_counter() - started
+
+
+def bench_incremental(chunks) -> float:
+    """Only tokenize each new chunk, materializing just the tool argument."""
+    started = time.perf_counter()
+    parser = IncrementalJSONParser(keys=["document"])
+    for chunk in chunks:
+        parser.feed(chunk)
+        parser.get("document")
+    return time.perf_counter() - started
+
+
+def bench_predict_state(chunks) -> float:
+    """End to end through predict_state(), including the state message."""
+    execution = {
+        "thread_id": "thread",
+        "agent_name": "agent",
+        "run_id": "run",
+        "should_exit": False,
+        "node_name": "node",
+        "is_finished": False,
+        "predict_state_configuration": {
+            "document": {"tool_name": "write", "tool_argument": "document"}
+        },
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+    started = time.perf_counter()
+    predict_state(
+        thread_id="thread",
+        agent_name="agent",
+        run_id="run",
+        execution=execution,
+        event={"type": RuntimeEventTypes.ACTION_EXECUTION_START, "actionName": "write"},
+    )
+    for chunk in chunks:
+        predict_state(
+            thread_id="thread",
+            agent_name="agent",
+            run_id="run",
+            execution=execution,
+            event={"type": RuntimeEventTypes.ACTION_EXECUTION_ARGS, "args": chunk},
+        )
+    return time.perf_counter() - started
+
+
+def main():
+    print(f"chunk size: {CHUNK_SIZE} characters")
+    print(
+        f"{'size':>8} {'chunks':>7} {'reparse':>11} {'incremental':>12} "
+        f"{'speedup':>8} {'predict_state':>14}"
+    )
+    for size in SIZES:
+        chunks = _chunks(_payload(size))
+        reparse = bench_reparse(chunks)
+        incremental = bench_incremental(chunks)
+        end_to_end = bench_predict_state(chunks)
+        print(
+            f"{size // 1000:>6}KB {len(chunks):>7} {reparse * 1000:>9.1f}ms "
+            f"{incremental * 1000:>10.2f}ms {reparse / incremental:>7.0f}x "
+            f"{end_to_end * 1000:>12.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
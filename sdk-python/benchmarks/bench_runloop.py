@@ -0,0 +1,105 @@
+"""Benchmark: events per second through copilotkit_run().
+
+A producer task streams token events through the run loop while the consumer
+drains them, as CrewAI flows do. Compares the previous loop (unbounded
+`asyncio.Queue`, two `yield_control()` hops per `queue_put` and one event per
+iteration) against the bounded, batch-draining `RunEventQueue`.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_runloop
+"""
+
+import asyncio
+import time
+
+from copilotkit.protocol import RuntimeEventTypes, text_message_content
+from copilotkit.runloop import (
+    copilotkit_run,
+    get_context_queue,
+    handle_runtime_event,
+    queue_put,
+    reset_context_execution,
+    reset_context_queue,
+    set_context_execution,
+    set_context_queue,
+    yield_control,
+)
+
+EVENTS = [10_000, 100_000]
+
+
+def _execution():
+    return {
+        "thread_id": "thread",
+        "agent_name": "agent",
+        "run_id": "run",
+        "should_exit": False,
+        "node_name": "node",
+        "is_finished": False,
+        "predict_state_configuration": {},
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+
+
+async def _legacy_queue_put(*events, priority=False):
+    if not priority:
+        await yield_control()
+    q = get_context_queue()
+    for event in events:
+        await q.put(event)
+    await yield_control()
+
+
+async def _legacy_run(fn, *, execution):
+    local_queue = asyncio.Queue()
+    token_queue = set_context_queue(local_queue)
+    token_execution = set_context_execution(execution)
+    task = asyncio.create_task(fn())
+    try:
+        while True:
+            event = await local_queue.get()
+            local_queue.task_done()
+            json_lines = handle_runtime_event(event=event, execution=execution)
+            if json_lines is not None:
+                yield json_lines
+            if execution["is_finished"]:
+                break
+            await yield_control()
+        await task
+    finally:
+        reset_context_queue(token_queue)
+        reset_context_execution(token_execution)
+
+
+def _producer(put, count):
+    async def _produce():
+        for i in range(count):
+            await put(text_message_content(message_id="m", content=f"token {i} "))
+        await put({"type": RuntimeEventTypes.RUN_FINISHED, "state": {}}, priority=True)
+
+    return _produce
+
+
+async def _events_per_second(run, put, count) -> float:
+    started = time.perf_counter()
+    async for _ in run(_producer(put, count), execution=_execution()):
+        pass
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    print(f"{'events':>8} {'previous':>14} {'bounded':>14} {'speedup':>8}")
+    for count in EVENTS:
+        legacy = asyncio.run(_events_per_second(_legacy_run, _legacy_queue_put, count))
+        bounded = asyncio.run(_events_per_second(copilotkit_run, queue_put, count))
+        print(
+            f"{count:>8} {legacy:>10,.0f} ev/s {bounded:>10,.0f} ev/s "
+            f"{bounded / legacy:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark: the agent state note of CopilotKitMiddleware on a large state.
+
+The state holds a document and a table of 10,000 rows. Compares the previous
+note (indented ``json.dumps``) with the compact default and with a note budget,
+in characters per note and time per model call.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_state_note
+"""
+
+import json
+import time
+
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+
+CALLS = 20
+STATE = {
+    "document": "lorem ipsum " * 2_000,
+    "rows": [{"id": i, "title": f"row {i}", "done": i % 2 == 0} for i in range(10_000)],
+    "filter": "open",
+}
+BUDGET = {"max_chars": 8_000, "max_key_chars": 4_000, "max_list_items": 20}
+
+
+def _indented(state: dict) -> str:
+    return f"Current agent state:\n{json.dumps(state, indent=2, default=str)}"
+
+
+def _time(build) -> tuple[int, float]:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        note = build(STATE)
+    return len(note), (time.perf_counter() - start) / CALLS
+
+
+def main():
+    compact = CopilotKitMiddleware(expose_state=True)
+    budgeted = CopilotKitMiddleware(expose_state=True, note_budget=BUDGET)
+    print(f"{CALLS} model calls with the same state")
+    print(f"{'note':>10}  {'chars':>9}  {'~tokens':>8}  {'per call':>9}")
+    for name, build in (
+        ("indented", _indented),
+        ("compact", compact._build_state_note),
+        ("budgeted", budgeted._build_state_note),
+    ):
+        chars, seconds = _time(build)
+        print(f"{name:>10}  {chars:>9}  {chars // 4:>8}  {seconds * 1000:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: writes and bytes on the wire for one streamed answer.
+
+Streams a 2,000 token answer, paced like a fast model, through the NDJSON
+output of an agent run and counts the ASGI writes and the bytes they carry:
+without an output stage (one write per token, the previous behavior), with
+coalescing only, and with coalescing plus gzip.
+
+Run from the sdk-python directory:
+
+    python -m benchmarks.bench_stream_output
+"""
+
+import asyncio
+import time
+
+from copilotkit.protocol import (
+    emit_runtime_events,
+    text_message_content,
+    text_message_end,
+    text_message_start,
+)
+from copilotkit.stream_output import StreamOutput
+
+TOKENS = 2_000
+TOKENS_PER_SECOND = 2_000
+
+
+async def _answer():
+    yield emit_runtime_events(text_message_start(message_id="message"))
+    for i in range(TOKENS):
+        if i % 20 == 0:
+            await asyncio.sleep(20 / TOKENS_PER_SECOND)
+        yield emit_runtime_events(
+            text_message_content(message_id="message", content=f" token{i}")
+        )
+    yield emit_runtime_events(text_message_end(message_id="message"))
+
+
+async def _measure(output):
+    if output is None:
+        stream = _answer()
+    else:
+        stream, _ = output.wrap(_answer(), "gzip")
+    writes = 0
+    size = 0
+    started = time.perf_counter()
+    async for chunk in stream:
+        writes += 1
+        size += len(chunk.encode() if isinstance(chunk, str) else chunk)
+    return writes, size, time.perf_counter() - started
+
+
+def main():
+    setups = [
+        ("previous", None),
+        ("coalesced", StreamOutput(compression=False)),
+        ("gzip", StreamOutput()),
+    ]
+    print(f"{'output':>10} {'writes':>8} {'bytes':>10} {'seconds':>8}")
+    for name, output in setups:
+        writes, size, seconds = asyncio.run(_measure(output))
+        print(f"{name:>10} {writes:>8,} {size:>10,} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
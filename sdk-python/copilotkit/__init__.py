@@ -14,7 +14,10 @@ from .exc import (
     AgentNotFoundException,
     ActionExecutionException,
     AgentExecutionException,
+    AgentRunRejectedException,
 )
+from .execution import AgentRunLimiter
+from .stream_output import StreamOutput
 from .langgraph import CopilotKitState
 from .parameter import Parameter
 from .agent import Agent
@@ -46,6 +49,9 @@ __all__ = [
     "AgentNotFoundException",
     "ActionExecutionException",
     "AgentExecutionException",
+    "AgentRunRejectedException",
+    "AgentRunLimiter",
+    "StreamOutput",
     "CrewAIAgent",  # pyright: ignore[reportUnsupportedDunderAll] pylint: disable=undefined-all-variable
     "LangGraphAGUIAgent",
     "CopilotKitMiddleware",
@@ -1,9 +1,13 @@
 """Actions"""
 
+import asyncio
 import re
+from concurrent.futures import Executor
+from functools import partial
 from inspect import iscoroutinefunction
 from typing import Optional, List, Callable, TypedDict, Any, cast
 from .parameter import Parameter, normalize_parameters
+from .execution import run_sync
 
 
 class ActionDict(TypedDict):
@@ -20,21 +24,53 @@ class ActionResultDict(TypedDict):
     result: Any
 
 
-class Action:  # pylint: disable=too-few-public-methods
-    """Action class for CopilotKit"""
+class Action:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Action class for CopilotKit
 
-    def __init__(
+    Synchronous handlers run on an executor so that blocking I/O does not stall
+    other requests served by the same event loop.
+
+    Parameters
+    ----------
+    name : str
+        The name of the action.
+    handler : Callable
+        The function called with the action arguments, sync or async.
+    description : Optional[str]
+        The description of the action.
+    parameters : Optional[List[Parameter]]
+        The parameters of the action.
+    run_in_executor : bool
+        Whether to run a synchronous handler on `executor`. Set to False for handlers
+        that are cheap or must run on the event loop thread.
+    executor : Optional[Executor]
+        The thread or process executor for synchronous handlers. Defaults to the event
+        loop's default executor.
+    timeout : Optional[float]
+        The number of seconds after which the execution fails with
+        asyncio.TimeoutError. A synchronous handler that times out cannot be
+        interrupted and keeps running in the background.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         *,
         name: str,
         handler: Callable,
         description: Optional[str] = None,
         parameters: Optional[List[Parameter]] = None,
+        run_in_executor: bool = True,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
     ):
         self.name = name
         self.description = description
         self.parameters = parameters
         self.handler = handler
+        self.run_in_executor = run_in_executor
+        self.executor = executor
+        self.timeout = timeout
 
         if not re.match(r"^[a-zA-Z0-9_-]+$", name):
             raise ValueError(
@@ -44,9 +80,18 @@ class Action:  # pylint: disable=too-few-public-methods
 
     async def execute(self, *, arguments: dict) -> ActionResultDict:
         """Execute the action"""
-        result = self.handler(**arguments)
+        if iscoroutinefunction(self.handler):
+            result = await asyncio.wait_for(self.handler(**arguments), self.timeout)
+        elif self.run_in_executor:
+            result = await run_sync(
+                partial(self.handler, **arguments),
+                executor=self.executor,
+                timeout=self.timeout,
+            )
+        else:
+            result = self.handler(**arguments)
 
-        return {"result": await result if iscoroutinefunction(self.handler) else result}
+        return {"result": result}
 
     def dict_repr(self) -> ActionDict:
         """Dict representation of the action"""
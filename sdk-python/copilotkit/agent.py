@@ -61,6 +61,13 @@ class Agent(ABC):
             "messages": [],
         }
 
+    async def warm_up(self) -> None:
+        """
+        Prepare the agent before it serves its first request, for example by opening
+        connections. `add_fastapi_endpoint(..., warm_up=True)` calls this at startup.
+        Does nothing by default.
+        """
+
     def dict_repr(self) -> AgentDict:
         """Dict representation of the action"""
         return {"name": self.name, "description": self.description or ""}
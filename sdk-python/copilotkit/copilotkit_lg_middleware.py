@@ -14,11 +14,30 @@ Example:
     )
 """
 
+import functools
+import hashlib
 import json
+import logging
+import operator
 import re
-from typing import Any, Callable, Awaitable, ClassVar, Iterable, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Awaitable,
+    ClassVar,
+    Iterable,
+    Literal,
+    Optional,
+    Union,
+)
 
-from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain.agents.middleware import (
     AgentMiddleware,
     AgentState,
@@ -26,9 +45,12 @@ from langchain.agents.middleware import (
     ModelResponse,
 )
 from langgraph.runtime import Runtime
+from typing_extensions import TypedDict
 
+from . import json_codec
 from .header_propagation import install_httpx_hook, set_forwarded_headers
-from .langgraph import CopilotKitProperties
+from .exc import CopilotKitMisuseError
+from .langgraph import CopilotKitProperties, get_runtime_context
 
 # Optional dependency: the A2UI subagent-tool factory ships in ag-ui-langgraph.
 # Guarded so an older/skewed version without the factory degrades to
@@ -39,6 +61,8 @@ except Exception:  # noqa: BLE001 - any import failure means the feature is off
     get_a2ui_tools = None
     A2UIToolParams = None
 
+logger = logging.getLogger(__name__)
+
 # Track which httpx clients already have the header-propagation hook installed
 # (by object id) so we never double-install on repeated model calls.
 _hooked_clients: set[int] = set()
@@ -60,6 +84,9 @@ _a2ui_tools_by_thread: dict[str, Any] = {}
 # checkpointer). Collisions across concurrent context-less runs are an
 # acceptable edge — the deployed path always carries a thread id.
 _DEFAULT_THREAD_KEY = "__copilotkit_a2ui_default__"
+
+# How many built generate_a2ui tools are shared by all threads and turns
+_A2UI_TOOL_CACHE_SIZE = 32
 _FRONTEND_TOOL_RESULT_CONTENT = json.dumps({"status": "forwarded_to_frontend"})
 
 
@@ -78,6 +105,56 @@ def _current_thread_id() -> "str | None":
         return None
 
 
+def _digest(value: Any) -> str:
+    """Stable digest of a JSON-like value; opaque objects count by identity."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=repr)
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _native_catalog_id(a2ui_schema: str) -> "str | None":
+    """The ``catalogId`` of an AG-UI ``a2ui_schema`` JSON string."""
+    try:
+        parsed = json.loads(a2ui_schema)
+    except (TypeError, ValueError):
+        return None
+    return parsed.get("catalogId") if isinstance(parsed, dict) else None
+
+
+class _A2UIToolKey:
+    """The inputs of a generate_a2ui tool: hashed by (model id, catalog id, schema
+    digest, params digest) and carrying the params to build the tool from. The
+    cache keeps the model alive, so its id cannot be recycled while cached."""
+
+    __slots__ = ("params", "_key")
+
+    def __init__(self, params: dict, schema: Any):
+        self.params = params
+        self._key = (
+            id(params.get("model")),
+            params.get("default_catalog_id"),
+            _digest(schema) if schema else None,
+            _digest({k: v for k, v in params.items() if k != "model"}),
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _A2UIToolKey) and self._key == other._key
+
+
+@functools.lru_cache(maxsize=_A2UI_TOOL_CACHE_SIZE)
+def _build_a2ui_tool(key: _A2UIToolKey) -> Any:
+    return get_a2ui_tools(key.params)
+
+
+def _cached_a2ui_tool(params: dict, schema: Any) -> Any:
+    """``get_a2ui_tools(params)``, reusing a tool built for the same inputs."""
+    return _build_a2ui_tool(_A2UIToolKey(params, schema))
+
+
 def _extract_forwarded_headers_from_config() -> None:
     """Extract raw ``x-*`` headers from the current LangGraph RunnableConfig and
     push them into the header-propagation ContextVar so the httpx hook can
@@ -171,6 +248,174 @@ def _extract_forwarded_headers_from_config() -> None:
         )
 
 
+# Id of the message that carries the notes with note_placement="trailing".
+_NOTES_MESSAGE_ID = "copilotkit-notes"
+
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _is_anthropic_model(model: Any) -> bool:
+    """True for Anthropic chat models, which take explicit cache breakpoints."""
+    model = getattr(model, "bound", model)
+    try:
+        llm_type = model._llm_type  # pylint: disable=protected-access
+    except Exception:  # noqa: BLE001 - not a LangChain chat model
+        return False
+    return isinstance(llm_type, str) and "anthropic" in llm_type
+
+
+def _with_cache_breakpoint(message: BaseMessage) -> BaseMessage:
+    """Copy of ``message`` whose last content block ends a cached prefix."""
+    content = message.content
+    if isinstance(content, str):
+        blocks: list = [{"type": "text", "text": content}]
+    else:
+        blocks = [
+            {"type": "text", "text": block} if isinstance(block, str) else block
+            for block in content
+        ]
+    if not blocks or not isinstance(blocks[-1], dict):
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": _CACHE_CONTROL}
+    return message.model_copy(update={"content": blocks})
+
+
+def _history_cache_key() -> "tuple | None":
+    """The thread and checkpoint namespace of the active run, if any."""
+    try:
+        from langgraph.config import get_config
+
+        configurable = (get_config() or {}).get("configurable") or {}
+    except Exception:  # noqa: BLE001 - no active context / older langgraph
+        return None
+    thread_id = configurable.get("thread_id")
+    if thread_id is None:
+        return None
+    # the namespace names a new task on every step, keep only the node path
+    checkpoint_ns = configurable.get("checkpoint_ns") or ""
+    return (
+        thread_id,
+        tuple(part.partition(":")[0] for part in checkpoint_ns.split("|")),
+    )
+
+
+def _tool_call_ids(messages: Iterable[Any]) -> set:
+    """Ids of the tool calls of the AIMessages in ``messages``."""
+    ids: set = set()
+    for msg in messages:
+        if isinstance(msg, AIMessage):
+            for tc in getattr(msg, "tool_calls", None) or []:
+                tc_id = tc.get("id")
+                if tc_id:
+                    ids.add(tc_id)
+    return ids
+
+
+def _tool_message_ids(messages: Iterable[Any]) -> set:
+    """Tool call ids answered by the ToolMessages in ``messages``."""
+    return {
+        getattr(msg, "tool_call_id", None)
+        for msg in messages
+        if isinstance(msg, ToolMessage)
+    }
+
+
+# Threads whose fixed message history is kept by each middleware instance.
+_NORMALIZED_HISTORIES_SIZE = 128
+
+
+class _NormalizedHistory:
+    """The fixed history of a thread, up to its last AIMessage.
+
+    Fixing a message only depends on later messages through the ToolMessages
+    that follow an AIMessage, duplicate ToolMessages of a tool call and
+    ToolMessages whose tool call appears later. The history is cached up to
+    the last AIMessage, where neither applies, and the rest of the history is
+    fixed again on the next call. Histories that are not a continuation of the
+    cached one (compared by identity, so messages replaced under the same id
+    are noticed) or that interact with the cached messages are fixed in full.
+    """
+
+    __slots__ = (
+        "inputs",
+        "cut",
+        "fixed",
+        "tool_message_ids",
+        "tool_call_ids",
+        "orphan_ids",
+    )
+
+    def __init__(self) -> None:
+        # the messages of the previous call, before fixing
+        self.inputs: list = []
+        # messages before this index are fixed and cached
+        self.cut = 0
+        self.fixed: list = []
+        self.tool_message_ids: set = set()
+        # tool calls of the fixed messages
+        self.tool_call_ids: set = set()
+        # ToolMessages of the fixed messages that were dropped as orphans
+        self.orphan_ids: set = set()
+
+    def _accepts(self, messages: list) -> bool:
+        return (
+            len(messages) >= len(self.inputs)
+            and all(map(operator.is_, self.inputs, messages))
+            and self._independent(messages[self.cut :])
+        )
+
+    def _independent(self, messages: list) -> bool:
+        return (
+            not self.tool_message_ids
+            or self.tool_message_ids.isdisjoint(_tool_message_ids(messages))
+        ) and (
+            not self.orphan_ids or self.orphan_ids.isdisjoint(_tool_call_ids(messages))
+        )
+
+    def normalize(self, messages: list) -> "tuple[list, _NormalizedHistory] | None":
+        """Fix ``messages`` and return them with the history to cache.
+
+        Returns ``None`` when ``messages`` do not continue this history.
+        """
+        if not self._accepts(messages):
+            return None
+        fix = CopilotKitMiddleware._fix_messages_for_bedrock
+
+        cut = self.cut
+        for idx in range(len(messages) - 1, self.cut, -1):
+            if isinstance(messages[idx], AIMessage):
+                cut = idx
+                break
+        segment, rest = messages[self.cut : cut], messages[cut:]
+        answered = _tool_message_ids(segment)
+        if segment and answered.isdisjoint(_tool_message_ids(rest)):
+            fixed_segment = fix(list(segment), self.tool_call_ids)
+            tool_call_ids = self.tool_call_ids | _tool_call_ids(fixed_segment)
+            orphan_ids = self.orphan_ids | (answered - tool_call_ids)
+            if orphan_ids.isdisjoint(_tool_call_ids(rest)):
+                extended = _NormalizedHistory()
+                extended.inputs = messages
+                extended.cut = cut
+                extended.fixed = [*self.fixed, *fixed_segment]
+                extended.tool_message_ids = self.tool_message_ids | answered
+                extended.tool_call_ids = tool_call_ids
+                extended.orphan_ids = orphan_ids
+                fixed_rest = fix(list(rest), tool_call_ids)
+                return [*extended.fixed, *fixed_rest], extended
+
+        # The new messages cannot be split at their last AIMessage: fix them
+        # together and keep the cached history as it is.
+        fixed_rest = fix(messages[self.cut :], self.tool_call_ids)
+        kept = _NormalizedHistory()
+        kept.inputs = messages
+        kept.cut = self.cut
+        kept.fixed = self.fixed
+        kept.tool_message_ids = self.tool_message_ids
+        kept.tool_call_ids = self.tool_call_ids
+        kept.orphan_ids = self.orphan_ids
+        return [*self.fixed, *fixed_rest], kept
+
+
 def _ensure_httpx_hook(model: Any) -> None:
     """Install the header-propagation httpx hook on a LangChain chat model's
     underlying HTTP client(s), if present.  No-op for models that don't expose
@@ -186,6 +431,90 @@ def _ensure_httpx_hook(model: Any) -> None:
             _hooked_clients.add(cid)
 
 
+class NoteBudget(TypedDict, total=False):
+    """Size limits for the state and app context notes, in characters of JSON.
+
+    A token is roughly four characters.
+    """
+
+    max_chars: int
+    """The whole note. State keys past the budget are listed but omitted."""
+    max_key_chars: int
+    """A single state key."""
+    max_list_items: int
+    """Longer lists keep their first and last items and a count of the rest."""
+
+
+def _shrink(value: Any, max_items: Optional[int], max_string: Optional[int]) -> Any:
+    """Copy of ``value`` with long lists and strings cut down."""
+    if isinstance(value, str):
+        if max_string is not None and len(value) > max_string:
+            return f"{value[:max_string]}… [{len(value) - max_string} more characters]"
+        return value
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        if max_items is not None and len(items) > max_items:
+            head = (max_items + 1) // 2
+            tail = max_items - head
+            items = [
+                *items[:head],
+                f"… {len(items) - head - tail} more items …",
+                *items[len(items) - tail :],
+            ]
+        return [_shrink(item, max_items, max_string) for item in items]
+    if isinstance(value, dict):
+        return {k: _shrink(v, max_items, max_string) for k, v in value.items()}
+    return value
+
+
+def _dumps(value: Any) -> str:
+    try:
+        return json_codec.dumps(value, default=str)
+    except (TypeError, ValueError):
+        return json.dumps(str(value), ensure_ascii=False)
+
+
+def _render_within(
+    value: Any, max_chars: Optional[int], max_items: Optional[int]
+) -> str:
+    """Compact JSON of ``value``, cut down until it fits into ``max_chars``."""
+    rendered = _dumps(value if max_items is None else _shrink(value, max_items, None))
+    if max_chars is None or len(rendered) <= max_chars:
+        return rendered
+    size = len(rendered)
+    items = max_items if max_items is not None else 64
+    string = max_chars
+    while len(rendered) > max_chars and (items > 2 or string > 64):
+        items = max(2, items // 2)
+        string = max(64, string // 2)
+        rendered = _dumps(_shrink(value, items, string))
+    if len(rendered) > max_chars:
+        return _dumps(f"[omitted: {size} characters]")
+    return rendered
+
+
+def _render_object(values: dict, budget: NoteBudget) -> str:
+    """Compact JSON object of ``values``, key by key within the budget."""
+    max_chars = budget.get("max_chars")
+    max_key_chars = budget.get("max_key_chars")
+    max_items = budget.get("max_list_items")
+    if max_chars is None and max_key_chars is None and max_items is None:
+        return _dumps(values)
+
+    parts = []
+    used = 2
+    for key, value in values.items():
+        name = _dumps(str(key))
+        limit = max_key_chars
+        if max_chars is not None:
+            remaining = max(0, max_chars - used - len(name) - 2)
+            limit = remaining if limit is None else min(limit, remaining)
+        rendered = _render_within(value, limit, max_items)
+        parts.append(f"{name}:{rendered}")
+        used += len(parts[-1]) + 1
+    return "{" + ",".join(parts) + "}"
+
+
 class StateSchema(AgentState):
     copilotkit: CopilotKitProperties
 
@@ -249,6 +578,26 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
             model (the host cannot supply the live, header-hooked model), and
             folds the registered catalog id + component schema into the params
             unless the host already set them — so host values win.
+        note_placement: Where the state and app context notes go.
+
+            - ``"system"`` (default) — appended to the system message.
+            - ``"trailing"`` — sent as a message after the conversation, which
+              keeps the tools, the system message and the conversation a
+              stable prefix that the provider's prompt cache can reuse while
+              the notes change. For Anthropic models, cache breakpoints
+              (``cache_control``) are set on the system message and on the
+              last message of the conversation; OpenAI caches prefixes
+              without breakpoints.
+
+            The prompt tokens each model call read from or wrote to the
+            cache are reported by the provider in the ``usage_metadata`` of
+            its response (``input_token_details``).
+        note_budget: Optional size limits for the notes, a ``NoteBudget``
+            dict: ``max_chars`` for the whole note, ``max_key_chars`` per
+            state key and ``max_list_items`` per list. Long lists keep their
+            first and last items with a count of the omitted ones, long
+            strings are cut, and state keys that do not fit are listed as
+            omitted. Unlimited by default. Notes are compact JSON either way.
     """
 
     state_schema = StateSchema
@@ -259,8 +608,21 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         *,
         expose_state: Union[bool, Iterable[str]] = False,
         a2ui_params: "Optional[A2UIToolParams]" = None,
+        note_placement: Literal["system", "trailing"] = "system",
+        note_budget: Optional[NoteBudget] = None,
     ):
         super().__init__()
+        if note_placement not in ("system", "trailing"):
+            raise CopilotKitMisuseError(
+                f"note_placement must be 'system' or 'trailing', got {note_placement!r}"
+            )
+        self._note_placement = note_placement
+        self._note_budget: NoteBudget = dict(note_budget or {})  # type: ignore[assignment]
+        for name, limit in self._note_budget.items():
+            if not isinstance(limit, int) or limit < 1:
+                raise CopilotKitMisuseError(
+                    f"note_budget['{name}'] must be a positive integer"
+                )
         if isinstance(expose_state, bool):
             self._expose_state: Union[bool, frozenset[str]] = expose_state
         else:
@@ -270,6 +632,8 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         # bleed into the middleware. ``model`` + the registered catalog are
         # layered in at build time; everything here is host-owned and wins.
         self._a2ui_params: dict = dict(a2ui_params or {})
+        # Fixed message histories by thread, least recently used first.
+        self._normalized_histories: dict[tuple, _NormalizedHistory] = {}
 
     @property
     def name(self) -> str:
@@ -317,7 +681,13 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
             from langgraph.config import get_config
 
             cfg = get_config() or {}
-            for carrier in (cfg.get("context"), cfg.get("configurable")):
+            # the runtime context also carries the payload for agents that keep it
+            # out of the checkpointed state (checkpoint_runtime_payload=False)
+            for carrier in (
+                get_runtime_context(),
+                cfg.get("context"),
+                cfg.get("configurable"),
+            ):
                 candidate = CopilotKitMiddleware._copilotkit_from_runtime_context(
                     carrier or {}
                 )
@@ -369,11 +739,14 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         if not snapshot:
             return None
 
-        try:
-            body = json.dumps(snapshot, default=str, ensure_ascii=False, indent=2)
-        except (TypeError, ValueError):
-            body = str(snapshot)
-        return f"Current agent state:\n{body}"
+        if not self._note_budget:
+            try:
+                body = json_codec.dumps(snapshot, default=str)
+            except (TypeError, ValueError):
+                body = str(snapshot)
+            return f"Current agent state:\n{body}"
+
+        return f"Current agent state:\n{_render_object(snapshot, self._note_budget)}"
 
     def _apply_state_note(self, request: ModelRequest) -> ModelRequest:
         note = self._build_state_note(request.state or {})
@@ -433,7 +806,11 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
                     item.model_dump() if hasattr(item, "model_dump") else item
                     for item in app_context
                 ]
-            context_content = json.dumps(app_context, indent=2)
+            context_content = _render_within(
+                app_context,
+                self._note_budget.get("max_chars"),
+                self._note_budget.get("max_list_items"),
+            )
 
         return f"App Context:\n{context_content}"
 
@@ -456,6 +833,36 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
             system_message=SystemMessage(content=f"{base}\n\n{note}")
         )
 
+    def _apply_notes(self, request: ModelRequest) -> ModelRequest:
+        if self._note_placement == "system":
+            return self._apply_app_context_note(self._apply_state_note(request))
+
+        notes = [
+            note
+            for note in (
+                self._build_state_note(request.state or {}),
+                self._build_app_context_note(
+                    request.state or {},
+                    getattr(request.runtime, "context", None),
+                ),
+            )
+            if note
+        ]
+        messages = list(request.messages)
+        system_message = request.system_message
+        if _is_anthropic_model(request.model):
+            if system_message is not None:
+                system_message = _with_cache_breakpoint(system_message)
+            for idx in range(len(messages) - 1, -1, -1):
+                if messages[idx].content:
+                    messages[idx] = _with_cache_breakpoint(messages[idx])
+                    break
+        if notes:
+            messages.append(
+                HumanMessage(content="\n\n".join(notes), id=_NOTES_MESSAGE_ID)
+            )
+        return request.override(messages=messages, system_message=system_message)
+
     # ------------------------------------------------------------------
     # Auto-A2UI tool injection
     # ------------------------------------------------------------------
@@ -483,17 +890,13 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         ag_ui = state.get("ag-ui") or {}
         a2ui_schema = ag_ui.get("a2ui_schema")
         if a2ui_schema:
-            catalog_id = None
-            try:
-                parsed = (
-                    json.loads(a2ui_schema)
-                    if isinstance(a2ui_schema, str)
-                    else a2ui_schema
-                )
-                if isinstance(parsed, dict):
-                    catalog_id = parsed.get("catalogId")
-            except (TypeError, ValueError):
-                pass
+            if isinstance(a2ui_schema, str):
+                # The same schema arrives with every model call, parse it once.
+                catalog_id = _native_catalog_id(a2ui_schema)
+            elif isinstance(a2ui_schema, dict):
+                catalog_id = a2ui_schema.get("catalogId")
+            else:
+                catalog_id = None
             # Native path: the toolkit reads ``a2ui_schema`` from state itself,
             # so no composition_guide is needed — just surface the catalog id.
             return None, catalog_id
@@ -549,8 +952,10 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         component schema and catalog id come from the registered catalog (when
         present) so the subagent composes the right components and surfaces bind
         to the frontend's catalog — otherwise the toolkit's basic catalog is
-        used. The built tool is stashed for the tool-call hook to execute.
-        Returns the tool or ``None`` when A2UI is not applicable.
+        used. The built tool is stashed for the tool-call hook to execute, and
+        reused by later model calls, turns and threads with the same model,
+        catalog and params. Returns the tool or ``None`` when A2UI is not
+        applicable.
         """
         if get_a2ui_tools is None:
             return None
@@ -582,7 +987,8 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
             guidelines.setdefault("composition_guide", component_schema)
             params["guidelines"] = guidelines
 
-        tool = get_a2ui_tools(params)
+        schema = component_schema or (state.get("ag-ui") or {}).get("a2ui_schema")
+        tool = _cached_a2ui_tool(params, schema)
 
         # (2) Don't double-inject if the agent already defines this tool.
         existing_names = {getattr(t, "name", None) for t in (request.tools or [])}
@@ -600,14 +1006,13 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
     ) -> ModelResponse:
         _extract_forwarded_headers_from_config()
         _ensure_httpx_hook(request.model)
-        request = request.override(messages=list(request.messages))
-        self._restore_intercepted_tool_call_history(
-            request.messages,
-            request.state.get("copilotkit", {}),
+        request = request.override(
+            messages=self._normalize_messages(
+                request.messages,
+                request.state.get("copilotkit", {}),
+            )
         )
-        self._fix_messages_for_bedrock(request.messages)
-        request = self._apply_state_note(request)
-        request = self._apply_app_context_note(request)
+        request = self._apply_notes(request)
 
         a2ui_tool = self._maybe_build_a2ui_tool(request)
         frontend_tools = self._get_copilotkit_context(
@@ -634,7 +1039,9 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         return handler(request.override(tools=merged_tools))
 
     @staticmethod
-    def _fix_messages_for_bedrock(messages: list) -> list:
+    def _fix_messages_for_bedrock(
+        messages: list, preceding_tool_call_ids: Optional[set] = None
+    ) -> list:
         """Fix messages loaded from checkpoint before sending to Bedrock.
 
         Handles four issues caused by CopilotKit's after_agent restoring
@@ -649,6 +1056,10 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
            the duplicate toolResult IDs. We keep the real result (non-interrupted)
            over the placeholder, falling back to the last occurrence if both look
            real.
+
+        ``preceding_tool_call_ids`` are the tool call ids of already fixed
+        messages that precede ``messages`` in the history, so that their
+        ToolMessages are not treated as orphans.
         """
         # 4. Deduplicate ToolMessages by tool_call_id before all other processing.
         #    patch_orphan_tool_calls adds "…was interrupted before completion."
@@ -789,13 +1200,7 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
         # 5. Remove orphan ToolMessages whose tool_call_id no longer matches
         #    any remaining tool_call in any AIMessage. These can be left over
         #    after stripping unanswered tool_calls above.
-        remaining_tc_ids: set = set()
-        for msg in messages:
-            if isinstance(msg, AIMessage):
-                for tc in getattr(msg, "tool_calls", None) or []:
-                    tc_id = tc.get("id")
-                    if tc_id:
-                        remaining_tc_ids.add(tc_id)
+        remaining_tc_ids = _tool_call_ids(messages) | (preceding_tool_call_ids or set())
         messages[:] = [
             msg
             for msg in messages
@@ -805,6 +1210,32 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
 
         return messages
 
+    def _normalize_messages(
+        self, messages: list, copilotkit_state: dict[str, Any]
+    ) -> list:
+        """Restore intercepted tool calls and fix the history for the model call.
+
+        The history of a thread only grows between model calls, so the fixed
+        messages are cached per thread and only the messages appended since the
+        previous call are processed.
+        """
+        messages = list(messages)
+        cache_key = _history_cache_key()
+        if (
+            self._restore_intercepted_tool_call_history(messages, copilotkit_state)
+            or cache_key is None
+        ):
+            return self._fix_messages_for_bedrock(messages)
+
+        history = self._normalized_histories.pop(cache_key, None)
+        result = history.normalize(messages) if history is not None else None
+        if result is None:
+            result = _NormalizedHistory().normalize(messages)
+        normalized, self._normalized_histories[cache_key] = result
+        while len(self._normalized_histories) > _NORMALIZED_HISTORIES_SIZE:
+            self._normalized_histories.pop(next(iter(self._normalized_histories)))
+        return normalized
+
     @staticmethod
     def _frontend_tool_result_message(tool_call: dict[str, Any]) -> ToolMessage | None:
         tool_call_id = tool_call.get("id")
@@ -944,14 +1375,13 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
     ) -> ModelResponse:
         _extract_forwarded_headers_from_config()
         _ensure_httpx_hook(request.model)
-        request = request.override(messages=list(request.messages))
-        self._restore_intercepted_tool_call_history(
-            request.messages,
-            request.state.get("copilotkit", {}),
+        request = request.override(
+            messages=self._normalize_messages(
+                request.messages,
+                request.state.get("copilotkit", {}),
+            )
         )
-        self._fix_messages_for_bedrock(request.messages)
-        request = self._apply_state_note(request)
-        request = self._apply_app_context_note(request)
+        request = self._apply_notes(request)
 
         a2ui_tool = self._maybe_build_a2ui_tool(request)
         frontend_tools = self._get_copilotkit_context(
@@ -1117,10 +1547,10 @@ class CopilotKitMiddleware(AgentMiddleware[StateSchema, Any]):
 
         for message in messages:
             if isinstance(message, AIMessage) and message.id == original_message_id:
-                restored_tool_calls = (
-                    copilotkit_state.get("original_tool_calls")
-                    or [*(message.tool_calls or []), *intercepted_tool_calls]
-                )
+                restored_tool_calls = copilotkit_state.get("original_tool_calls") or [
+                    *(message.tool_calls or []),
+                    *intercepted_tool_calls,
+                ]
                 updated_messages.append(
                     self._copy_ai_message_with_tool_calls(
                         message,
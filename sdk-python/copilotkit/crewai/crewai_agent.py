@@ -2,22 +2,50 @@
 CrewAI Agent
 """
 
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
 import uuid
 import json
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import aclosing
 from copy import deepcopy
-from typing import Optional, List, Callable
+from pathlib import Path
+from typing import Optional, List, Callable, Tuple, Union
 from typing_extensions import TypedDict, NotRequired, Any, Dict, cast
 from pydantic import BaseModel
+import crewai
 from crewai import Crew, Flow
 from crewai.flow import start
+from crewai.types.crew_chat import ChatInputs
 from crewai.cli.crew_chat import (
     initialize_chat_llm as crew_chat_initialize_chat_llm,
+    fetch_required_inputs as crew_chat_fetch_required_inputs,
     generate_crew_chat_inputs as crew_chat_generate_crew_chat_inputs,
     generate_crew_tool_schema as crew_chat_generate_crew_tool_schema,
     build_system_message as crew_chat_build_system_message,
-    create_tool_function as crew_chat_create_tool_function,
 )
-from litellm import completion
+
+try:
+    from crewai.utilities.events import (
+        crewai_event_bus,
+        AgentExecutionStartedEvent,
+        TaskCompletedEvent,
+        TaskStartedEvent,
+        ToolUsageStartedEvent,
+    )
+except ImportError:
+    from crewai.events import (  # type: ignore[no-redef]
+        crewai_event_bus,
+        AgentExecutionStartedEvent,
+        TaskCompletedEvent,
+        TaskStartedEvent,
+        ToolUsageStartedEvent,
+    )
+from litellm import acompletion
 from copilotkit.agent import Agent
 from copilotkit.types import Message
 from copilotkit.action import ActionDict
@@ -29,12 +57,15 @@ from copilotkit.crewai.crewai_sdk import (
     copilotkit_messages_to_crewai_flow,
     crewai_flow_messages_to_copilotkit,
     crewai_flow_async_runner,
+    copilotkit_emit_state,
     copilotkit_stream,
     copilotkit_exit,
     logger,
 )
+from copilotkit.execution import run_sync
 
 from copilotkit.runloop import copilotkit_run, CopilotKitRunExecution
+from copilotkit.json_codec import dumps
 
 
 class CopilotKitConfig(TypedDict):
@@ -76,7 +107,6 @@ class CrewAIFlowExecutionState(TypedDict):
     is_finished: bool
     predict_state_configuration: Dict[str, Any]
     predicted_state: Dict[str, Any]
-    argument_buffer: str
     current_tool_call: Optional[str]
 
 
@@ -140,6 +170,18 @@ class CrewAIAgent(Agent):
         The description of the agent.
     copilotkit_config : Optional[CopilotKitConfig]
         The CopilotKit config to use with the agent.
+    pool_size : int
+        How many prepared copies of the crew or flow to keep for reuse. By default
+        (`0`), every request runs on a new deep copy. With a pool, a request checks
+        out a prepared copy and returns it when the run completes; its flow state
+        is reset to the initial state first, and a crew's task outputs and usage
+        counters are cleared so that they do not carry over. A flow can define a `copilotkit_reset()`
+        method to reset other attributes it changes during a run. Flows whose
+        state cannot be reset are copied for every request. `warm_up()` prepares
+        the copies ahead of the first requests.
+    crew_executor : Optional[Executor]
+        The thread executor a crew runs on when the chat kicks it off. Defaults to
+        an executor shared by all crews.
 
     """
 
@@ -151,6 +193,8 @@ class CrewAIAgent(Agent):
         crew: Optional[Crew] = None,
         flow: Optional[Flow] = None,
         copilotkit_config: Optional[CopilotKitConfig] = None,
+        pool_size: int = 0,
+        crew_executor: Optional[Executor] = None,
     ):
         super().__init__(
             name=name,
@@ -158,10 +202,38 @@ class CrewAIAgent(Agent):
         )
         if (crew is None) == (flow is None):
             raise ValueError("Either crew or flow must be provided to CrewAIAgent")
+        if pool_size < 0:
+            raise ValueError("pool_size must not be negative")
 
         self.crew = crew
         self.flow = flow
         self.copilotkit_config = copilotkit_config or {}
+        self.crew_executor = crew_executor
+        self._pool: Optional[_FlowPool] = None
+        if pool_size and (crew is not None or _can_reset(flow)):
+            self._pool = _FlowPool(self._build_flow, self._reset_flow, pool_size)
+
+    def _build_flow(self) -> Flow:
+        """A new flow to serve requests on: a copy of the flow, or a crew chat"""
+        if self.crew:
+            return ChatWithCrewFlow(
+                crew=deepcopy(self.crew),
+                crew_name=self.name,
+                thread_id="",
+                executor=self.crew_executor,
+            )
+        return deepcopy(self.flow)
+
+    def _reset_flow(self, flow: Flow, initial_state: Any) -> None:
+        """Return a pooled flow to the state it was prepared with"""
+        if isinstance(flow, ChatWithCrewFlow):
+            _reset_crew(flow.crew)
+        _reset_flow(flow, initial_state)
+
+    async def warm_up(self) -> None:
+        """Prepares the pooled crew or flow copies, see `pool_size`"""
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.fill)
 
     def execute(  # pylint: disable=too-many-arguments
         self,
@@ -173,6 +245,15 @@ class CrewAIAgent(Agent):
         **kwargs,
     ):
         """Execute the agent"""
+        if self._pool is not None:
+            return self._execute_pooled(
+                state=state,
+                messages=messages,
+                thread_id=thread_id,
+                actions=actions,
+                **kwargs,
+            )
+
         if self.crew:
             crew = deepcopy(self.crew)
             return self.execute_crew(
@@ -213,7 +294,7 @@ class CrewAIAgent(Agent):
             crew=crew,
             crew_name=self.name,
             thread_id=thread_id,
-            cache_key=f"crew_{id(self.crew)}",
+            executor=self.crew_executor,
         )
 
         return self.execute_flow(
@@ -225,6 +306,22 @@ class CrewAIAgent(Agent):
             **kwargs,
         )
 
+    async def _execute_pooled(self, *, thread_id: str, **kwargs):
+        """Execute the agent on a flow checked out of the pool"""
+        flow, initial_state = self._pool.check_out()
+        if isinstance(flow, ChatWithCrewFlow):
+            flow.thread_id = thread_id
+        completed = False
+        async with aclosing(
+            self.execute_flow(thread_id=thread_id, flow=flow, **kwargs)
+        ) as events:
+            async for event in events:
+                yield event
+            completed = True
+        # a failed or cancelled run may have left the flow in any state
+        if completed:
+            await asyncio.to_thread(self._pool.check_in, flow, initial_state)
+
     async def execute_flow(  # pylint: disable=too-many-arguments,unused-argument,too-many-locals
         self,
         *,
@@ -265,16 +362,19 @@ class CrewAIAgent(Agent):
             is_finished=False,
             predict_state_configuration={},
             predicted_state={},
-            argument_buffer="",
             current_tool_call=None,
             state=state,
         )
 
-        async for event in copilotkit_run(
-            fn=lambda: crewai_flow_async_runner(flow, deepcopy(state)),
-            execution=execution,
-        ):
-            yield event
+        # closing the run cancels the flow when the client disconnects
+        async with aclosing(
+            copilotkit_run(
+                fn=lambda: crewai_flow_async_runner(flow, deepcopy(state)),
+                execution=execution,
+            )
+        ) as events:
+            async for event in events:
+                yield event
 
         state = {
             **(
@@ -295,7 +395,7 @@ class CrewAIAgent(Agent):
                 run_id=run_id,
                 active=False,
                 role="assistant",
-                state=json.dumps(filter_state(state, exclude_keys=["id"])),
+                state=dumps(filter_state(state, exclude_keys=["id"])),
                 running=not execution["should_exit"],
             )
         )
@@ -340,6 +440,132 @@ class CrewAIAgent(Agent):
         return {**super_repr, "type": "crewai"}
 
 
+def _can_reset(flow: Any) -> bool:
+    return hasattr(flow, "_state") or callable(getattr(flow, "copilotkit_reset", None))
+
+
+# Per-run bookkeeping of a crewai Flow (checked against crewai 0.175), emptied
+# before a pooled flow is reused
+_FLOW_RUN_ATTRIBUTES = (
+    "_method_outputs",
+    "_completed_methods",
+    "_method_execution_counts",
+    "_pending_and_listeners",
+)
+
+
+def _reset_flow(flow: Any, initial_state: Any) -> None:
+    """Return a flow to the state it was prepared with"""
+    if hasattr(flow, "_state"):
+        for name in _FLOW_RUN_ATTRIBUTES:
+            value = getattr(flow, name, None)
+            if isinstance(value, (dict, list, set)):
+                setattr(flow, name, type(value)())
+        if hasattr(flow, "_is_execution_resuming"):
+            flow._is_execution_resuming = False  # pylint: disable=protected-access
+        flow._state = deepcopy(initial_state)  # pylint: disable=protected-access
+    reset = getattr(flow, "copilotkit_reset", None)
+    if callable(reset):
+        reset()
+
+
+# Per-run results and counters of a crewai Crew, its tasks and its agents
+# (checked against crewai 0.175), set back to their defaults before a pooled crew
+# is reused. Agent executors are rebuilt on every kickoff, and memories are kept
+# in storage that copies of a crew share as well.
+_CREW_RUN_ATTRIBUTES = ("usage_metrics", "token_usage")
+_TASK_RUN_ATTRIBUTES = (
+    "output",
+    "start_time",
+    "end_time",
+    "prompt_context",
+    "retry_count",
+    "delegations",
+    "tools_errors",
+    "used_tools",
+    "processed_by_agents",
+)
+_AGENT_RUN_ATTRIBUTES = ("tools_results", "_times_executed", "_token_process")
+
+
+def _reset_to_defaults(model: Any, names: Tuple[str, ...]) -> None:
+    fields = getattr(type(model), "model_fields", {})
+    private_attributes = getattr(type(model), "__private_attributes__", {})
+    for name in names:
+        if name in fields:
+            setattr(model, name, fields[name].get_default(call_default_factory=True))
+        elif name in private_attributes:
+            setattr(model, name, private_attributes[name].get_default())
+
+
+def _reset_crew(crew: Any) -> None:
+    """Clear the task outputs and usage counters a run left on a crew"""
+    _reset_to_defaults(crew, _CREW_RUN_ATTRIBUTES)
+    for task in getattr(crew, "tasks", None) or []:
+        _reset_to_defaults(task, _TASK_RUN_ATTRIBUTES)
+    agents = [*(getattr(crew, "agents", None) or [])]
+    if getattr(crew, "manager_agent", None) is not None:
+        agents.append(crew.manager_agent)
+    for agent in agents:
+        _reset_to_defaults(agent, _AGENT_RUN_ATTRIBUTES)
+
+
+class _FlowPool:
+    """
+    Prepared flows of a CrewAIAgent. Each request checks one out and returns it
+    after a completed run; at most `size` flows are kept.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Flow],
+        reset: Callable[[Flow, Any], None],
+        size: int,
+    ):
+        self._build = build
+        self._reset = reset
+        self._size = size
+        self._idle: deque = deque()
+        # flows are checked out on the event loop and checked in from threads
+        self._lock = threading.Lock()
+
+    def _prepare(self) -> Tuple[Flow, Any]:
+        flow = self._build()
+        return flow, deepcopy(getattr(flow, "_state", None))
+
+    def _has_room(self) -> bool:
+        with self._lock:
+            return len(self._idle) < self._size
+
+    def _keep(self, prepared: Tuple[Flow, Any]) -> None:
+        with self._lock:
+            if len(self._idle) < self._size:
+                self._idle.append(prepared)
+
+    def check_out(self) -> Tuple[Flow, Any]:
+        """A prepared flow and its initial state, built if none is idle"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._prepare()
+
+    def check_in(self, flow: Flow, initial_state: Any) -> None:
+        """Reset a flow and keep it for the next request"""
+        if not self._has_room():
+            return
+        try:
+            self._reset(flow, initial_state)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Discarding a pooled flow that failed to reset: {e}")
+            return
+        self._keep((flow, initial_state))
+
+    def fill(self) -> None:
+        """Prepare flows until the pool is full"""
+        while self._has_room():
+            self._keep(self._prepare())
+
+
 def crewai_flow_default_merge_state(  # pylint: disable=unused-argument, too-many-arguments
     *,
     state: dict,
@@ -389,13 +615,339 @@ CREW_EXIT_TOOL = {
     },
 }
 
-_CREW_INPUTS_CACHE = {}
+CREW_CHAT_INPUTS_CACHE_DIR_ENV = "COPILOTKIT_CREW_CHAT_INPUTS_CACHE_DIR"
+
+# bump when the stored format or the key of crew chat inputs changes
+_CREW_CHAT_INPUTS_VERSION = 1
+
+
+def _llm_name(llm: Any) -> Optional[str]:
+    if llm is None or isinstance(llm, str):
+        return llm
+    return getattr(llm, "model", None) or type(llm).__name__
+
+
+def crew_chat_inputs_key(crew: Crew, crew_name: str, chat_llm: Any) -> str:
+    """
+    The digest of everything the generated chat inputs of a crew depend on: its
+    agents, tasks, input placeholders and LLMs. Equal crews get equal keys in every
+    process, so the inputs can be shared across restarts and replicas.
+    """
+    definition = {
+        "version": _CREW_CHAT_INPUTS_VERSION,
+        "crewai": getattr(crewai, "__version__", None),
+        "crew_name": crew_name,
+        "agents": [
+            {
+                "role": agent.role,
+                "goal": agent.goal,
+                "backstory": agent.backstory,
+                "llm": _llm_name(getattr(agent, "llm", None)),
+            }
+            for agent in crew.agents
+        ],
+        "tasks": [
+            {
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "agent": getattr(task.agent, "role", None),
+            }
+            for task in crew.tasks
+        ],
+        "inputs": sorted(crew_chat_fetch_required_inputs(crew)),
+        "chat_llm": _llm_name(chat_llm),
+    }
+    return hashlib.blake2b(
+        json.dumps(definition, sort_keys=True, default=str).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+class CrewChatInputsCache:
+    """
+    Caches the chat inputs generated for crews, which takes an LLM call per crew.
+
+    Entries are keyed by `crew_chat_inputs_key` and kept in memory, evicting the
+    least recently used. With a `directory`, they are also stored as one JSON file
+    per crew, so they survive restarts and can be shared by replicas through a
+    common volume or baked into an image. Files are only written on a miss, and
+    the oldest are removed past `max_entries`. Files of another format version are
+    ignored and failing to read or write the directory only logs a warning.
+
+    Parameters
+    ----------
+    directory : Optional[Union[str, Path]]
+        Where to store the entries. Defaults to
+        `$COPILOTKIT_CREW_CHAT_INPUTS_CACHE_DIR`; without either, entries are only
+        kept in memory.
+    max_entries : int
+        The number of crews to keep inputs for.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_entries: int = 256,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        directory = directory or os.getenv(CREW_CHAT_INPUTS_CACHE_DIR_ENV)
+        self.directory = Path(directory) if directory else None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ChatInputs]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_generate(self, crew: Crew, crew_name: str, chat_llm: Any) -> ChatInputs:
+        """The cached chat inputs of the crew, generated on a miss"""
+        key = crew_chat_inputs_key(crew, crew_name, chat_llm)
+        inputs = self.get(key)
+        if inputs is None:
+            inputs = crew_chat_generate_crew_chat_inputs(crew, crew_name, chat_llm)
+            self.put(key, inputs)
+        return inputs
+
+    def get(self, key: str) -> Optional[ChatInputs]:
+        """The chat inputs stored under `key`, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory is None:
+            return None
+        inputs = self._read(key)
+        if inputs is not None:
+            with self._lock:
+                self._remember(key, inputs)
+        return inputs
+
+    def put(self, key: str, inputs: ChatInputs) -> None:
+        """Stores the chat inputs under `key`, in memory and on disk"""
+        with self._lock:
+            self._remember(key, inputs)
+        if self.directory is not None:
+            self._write(key, inputs)
+
+    def _remember(self, key: str, inputs: ChatInputs) -> None:
+        self._entries[key] = inputs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return cast(Path, self.directory) / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[ChatInputs]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring cached crew chat inputs %s: %s", path, exc)
+            return None
+        if (
+            not isinstance(stored, dict)
+            or stored.get("version") != _CREW_CHAT_INPUTS_VERSION
+        ):
+            return None
+        try:
+            inputs = ChatInputs.model_validate(stored.get("inputs"))
+        except ValueError as exc:
+            logger.warning("Ignoring cached crew chat inputs %s: %s", path, exc)
+            return None
+        return inputs
+
+    def _write(self, key: str, inputs: ChatInputs) -> None:
+        directory = cast(Path, self.directory)
+        stored = {
+            "version": _CREW_CHAT_INPUTS_VERSION,
+            "key": key,
+            "inputs": inputs.model_dump(),
+        }
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    json.dump(stored, file)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict(directory)
+        except OSError as exc:
+            logger.warning("Could not store crew chat inputs in %s: %s", directory, exc)
+
+    def _evict(self, directory: Path) -> None:
+        # oldest written first
+        files = []
+        for path in directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if len(files) <= self.max_entries:
+            return
+        files.sort()
+        for _, path in files[: len(files) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+_crew_chat_inputs_cache = CrewChatInputsCache()
+
+
+class _CrewCancelled(BaseException):
+    """
+    Stops a crew whose run was cancelled. A BaseException, so that crewai's error
+    handling does not retry the task.
+    """
+
+
+class _CrewRun:
+    """
+    A crew kickoff. Installed as the crew's step and task callbacks while the crew
+    runs, so that the crew stops at its next step or task once the run is
+    cancelled, and events of the crew find their run.
+    """
+
+    def __init__(self, crew: Any, report: Callable[[Dict[str, Any]], None]):
+        self._crew = crew
+        self._report = report
+        self.cancelled = False
+        self.state: Dict[str, Any] = {
+            "tasks_completed": 0,
+            "task": None,
+            "agent": None,
+            "tool": None,
+        }
+        self._step_callback = crew.step_callback
+        self._task_callback = crew.task_callback
+
+    def __enter__(self) -> "_CrewRun":
+        self._crew.step_callback = self.step_callback
+        self._crew.task_callback = self.task_callback
+        return self
+
+    def __exit__(self, *exc_info):
+        self._crew.step_callback = self._step_callback
+        self._crew.task_callback = self._task_callback
+        # crewai hands the crew's callbacks to agents and tasks without their own
+        for agent in getattr(self._crew, "agents", None) or []:
+            if getattr(agent, "step_callback", None) == self.step_callback:
+                agent.step_callback = None
+        for task in getattr(self._crew, "tasks", None) or []:
+            if getattr(task, "callback", None) == self.task_callback:
+                task.callback = None
+
+    def step_callback(self, step: Any):
+        """Called by crewai after each agent step"""
+        if self.cancelled:
+            raise _CrewCancelled()
+        if self._step_callback is not None:
+            self._step_callback(step)
+
+    def task_callback(self, output: Any):
+        """Called by crewai after each task"""
+        if self.cancelled:
+            raise _CrewCancelled()
+        if self._task_callback is not None:
+            self._task_callback(output)
+
+    def update(self, event: Any):
+        """Report a crew event"""
+        if self.cancelled:
+            return
+        if isinstance(event, TaskStartedEvent):
+            task = event.task
+            self.state["task"] = getattr(task, "name", None) or getattr(
+                task, "description", None
+            )
+            self.state["tool"] = None
+        elif isinstance(event, TaskCompletedEvent):
+            self.state["tasks_completed"] += 1
+        elif isinstance(event, AgentExecutionStartedEvent):
+            self.state["agent"] = getattr(event.agent, "role", None)
+        elif isinstance(event, ToolUsageStartedEvent):
+            self.state["tool"] = event.tool_name
+        else:
+            return
+        self._report(dict(self.state))
+
+
+_crew_listener_registered = False
+_crew_listener_lock = threading.Lock()
+_default_crew_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _event_crew(source: Any, event: Any) -> Any:
+    """The crew whose agent or task emitted the event"""
+    agent = getattr(event, "agent", None) or getattr(source, "agent", None)
+    if agent is None:
+        agent = getattr(getattr(event, "task", None), "agent", None)
+    return getattr(agent, "crew", None)
+
+
+def _crew_run(crew: Any) -> Optional[_CrewRun]:
+    """The run of a crew that is being kicked off"""
+    run = getattr(getattr(crew, "task_callback", None), "__self__", None)
+    return run if isinstance(run, _CrewRun) else None
+
+
+def _crew_event_listener(source: Any, event: Any, **_kw):
+    # crewai calls listeners in whichever thread emits, asynchronous tasks run
+    # on threads of their own
+    run = _crew_run(_event_crew(source, event))
+    if run is not None:
+        run.update(event)
+
+
+def _register_crew_event_listener():
+    """Subscribe the crew progress listener to the crewai event bus, once per process"""
+    global _crew_listener_registered  # pylint: disable=global-statement
+    if _crew_listener_registered:
+        return
+    with _crew_listener_lock:
+        if _crew_listener_registered:
+            return
+        for _ev_cls in (
+            TaskStartedEvent,
+            TaskCompletedEvent,
+            AgentExecutionStartedEvent,
+            ToolUsageStartedEvent,
+        ):
+            crewai_event_bus.on(_ev_cls)(_crew_event_listener)  # type: ignore
+        _crew_listener_registered = True
+
+
+def _crew_executor() -> ThreadPoolExecutor:
+    """The executor shared by crews, kept apart from the loop's default executor"""
+    global _default_crew_executor  # pylint: disable=global-statement
+    with _crew_listener_lock:
+        if _default_crew_executor is None:
+            _default_crew_executor = ThreadPoolExecutor(
+                thread_name_prefix="copilotkit-crew"
+            )
+        return _default_crew_executor
 
 
 class ChatWithCrewFlow(Flow):
     """Chat with crew"""
 
-    def __init__(self, *, crew: Crew, crew_name: str, thread_id: str, cache_key: str):
+    def __init__(
+        self,
+        *,
+        crew: Crew,
+        crew_name: str,
+        thread_id: str,
+        cache_key: Optional[str] = None,  # pylint: disable=unused-argument
+        executor: Optional[Executor] = None,
+    ):
+        # the chat inputs are cached by the crew definition, `cache_key` is
+        # accepted for compatibility
         super().__init__()
 
         self.crew = cast(Any, crew).crew()
@@ -405,15 +957,12 @@ class ChatWithCrewFlow(Flow):
 
         self.crew_name = crew_name
         self.thread_id = thread_id
+        self.executor = executor
         self.chat_llm = crew_chat_initialize_chat_llm(self.crew)
 
-        if cache_key not in _CREW_INPUTS_CACHE:
-            self.crew_chat_inputs = crew_chat_generate_crew_chat_inputs(
-                self.crew, self.crew_name, self.chat_llm
-            )
-            _CREW_INPUTS_CACHE[cache_key] = self.crew_chat_inputs
-        else:
-            self.crew_chat_inputs = _CREW_INPUTS_CACHE[cache_key]
+        self.crew_chat_inputs = _crew_chat_inputs_cache.get_or_generate(
+            self.crew, self.crew_name, self.chat_llm
+        )
 
         self.crew_tool_schema = crew_chat_generate_crew_tool_schema(
             self.crew_chat_inputs
@@ -422,6 +971,56 @@ class ChatWithCrewFlow(Flow):
 
         super().__init__()
 
+    async def kickoff_crew(self, inputs: Dict[str, Any], messages: List[Any]) -> str:
+        """
+        Runs the crew on the crew executor and emits its progress as
+        `crew_progress` state. Cancelling stops the crew at its next agent step
+        or task.
+        """
+        _register_crew_event_listener()
+        loop = asyncio.get_running_loop()
+        updates: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        run = _CrewRun(
+            self.crew,
+            lambda update: loop.call_soon_threadsafe(updates.put_nowait, update),
+        )
+
+        def _kickoff() -> str:
+            # the inputs of crewai's chat tool
+            crew_inputs = {**inputs, "crew_chat_messages": json.dumps(messages)}
+            # installed until the crew stops, also when its run was cancelled
+            with run:
+                return str(self.crew.kickoff(inputs=crew_inputs))
+
+        result = asyncio.ensure_future(
+            run_sync(_kickoff, executor=self.executor or _crew_executor())
+        )
+        update: "Optional[asyncio.Future[Dict[str, Any]]]" = None
+        try:
+            while not result.done():
+                update = asyncio.ensure_future(updates.get())
+                await asyncio.wait(
+                    {result, update}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if update.done():
+                    await copilotkit_emit_state(
+                        {**self.state, "crew_progress": update.result()}
+                    )
+            update.cancel()
+            # the updates of the last steps, reported before the crew finished
+            while not updates.empty():
+                await copilotkit_emit_state(
+                    {**self.state, "crew_progress": updates.get_nowait()}
+                )
+        except asyncio.CancelledError:
+            run.cancelled = True
+            result.cancel()
+            raise
+        finally:
+            if update is not None:
+                update.cancel()
+        return result.result()
+
     @start()
     async def chat(self):
         """Chat with the crew"""
@@ -448,7 +1047,7 @@ class ChatWithCrewFlow(Flow):
         tools += [self.crew_tool_schema, CREW_EXIT_TOOL]
 
         response = await copilotkit_stream(
-            completion(
+            await acompletion(
                 model=self.crew.chat_llm,
                 messages=messages,
                 tools=tools,
@@ -463,9 +1062,8 @@ class ChatWithCrewFlow(Flow):
         if message.get("tool_calls"):
             if message["tool_calls"][0]["function"]["name"] == self.crew_name:
                 # run the crew
-                crew_function = crew_chat_create_tool_function(self.crew, messages)
                 args = json.loads(message["tool_calls"][0]["function"]["arguments"])
-                result = crew_function(**args)
+                result = await self.kickoff_crew(args, messages)
 
                 if isinstance(result, str):
                     self.state["outputs"] = result
@@ -497,7 +1095,7 @@ class ChatWithCrewFlow(Flow):
                 )
 
                 response = await copilotkit_stream(
-                    completion(  # pylint: disable=too-many-arguments
+                    await acompletion(  # pylint: disable=too-many-arguments
                         model=self.crew.chat_llm,
                         messages=[
                             {
@@ -5,7 +5,12 @@ CrewAI integration for CopilotKit
 import uuid
 import json
 import asyncio
-from typing_extensions import Any, Dict, List, Literal, Optional
+import inspect
+import threading
+import weakref
+from collections.abc import AsyncIterable
+from contextlib import aclosing
+from typing_extensions import Any, Dict, List, Literal, Optional, Tuple
 from copilotkit.exc import CopilotKitMisuseError
 from pydantic import BaseModel, Field
 from litellm.types.utils import (
@@ -38,8 +43,16 @@ from crewai.utilities.events import crewai_event_bus as _crewai_event_bus
 
 from copilotkit.types import Message
 from copilotkit.logging import get_logger
-from copilotkit.runloop import queue_put, get_context_execution
+from copilotkit.runloop import (
+    RunEventQueue,
+    queue_put,
+    get_context_execution,
+    get_context_queue,
+)
+from copilotkit.json_codec import dumps
+from copilotkit.execution import iterate_in_thread
 from copilotkit.protocol import (
+    RuntimeEvent,
     RuntimeEventTypes,
     RunStarted,
     RunFinished,
@@ -74,62 +87,115 @@ class CopilotKitState(FlowState):
     copilotkit: CopilotKitProperties = Field(default_factory=CopilotKitProperties)
 
 
-async def crewai_flow_async_runner(flow: Flow, inputs: Dict[str, Any]):
-    """
-    Runs a flow in a separate thread. Workaround since the flow will use
-    asyncio.run().
-    """
+# The loop and event queue of the flows running in this process, by flow. A
+# single listener routes crewai's flow events to the run of the flow that emitted
+# them.
+_RunningFlow = Tuple[asyncio.AbstractEventLoop, RunEventQueue]
+_running_flows: "weakref.WeakKeyDictionary[Any, _RunningFlow]" = (
+    weakref.WeakKeyDictionary()
+)
+_flow_listener_registered = False
+_flow_listener_lock = threading.Lock()
 
-    async def crewai_flow_event_subscriber(flow: Any, event: CrewAIFlowEvent):
-        if isinstance(event, FlowStartedEvent):
-            await queue_put(
-                RunStarted(type=RuntimeEventTypes.RUN_STARTED, state=flow.state),
-                priority=True,
-            )
-        elif isinstance(event, MethodExecutionStartedEvent):
-            await queue_put(
-                NodeStarted(
-                    type=RuntimeEventTypes.NODE_STARTED,
-                    node_name=event.method_name,
-                    state=flow.state,
-                ),
-                priority=True,
-            )
-        elif isinstance(event, MethodExecutionFinishedEvent):
-            await queue_put(
-                NodeFinished(
-                    type=RuntimeEventTypes.NODE_FINISHED,
-                    node_name=event.method_name,
-                    state=flow.state,
-                ),
-                priority=True,
-            )
-        elif isinstance(event, FlowFinishedEvent):
-            await queue_put(
-                RunFinished(type=RuntimeEventTypes.RUN_FINISHED, state=flow.state),
-                priority=True,
-            )
 
-    def _global_event_listener(_sender: Any, _event: CrewAIFlowEvent, **_kw):  # noqa: D401
-        # Forward to the async handler inside the flow's loop
-        loop = asyncio.get_running_loop()
-        loop.call_soon(
-            lambda: asyncio.create_task(crewai_flow_event_subscriber(flow, _event))
+def _put_flow_event(
+    loop: asyncio.AbstractEventLoop, q: RunEventQueue, event: RuntimeEvent
+):
+    """Queue an event of a flow, handing it over to the run's loop off-loop"""
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        q.put_nowait(event)
+        return
+    try:
+        loop.call_soon_threadsafe(q.put_nowait, event)
+    except RuntimeError:  # the run's loop is closed
+        pass
+
+
+def _crewai_flow_event_listener(source: Any, event: CrewAIFlowEvent, **_kw):
+    try:
+        running = _running_flows.get(source)
+    except TypeError:  # events from sources that are not flows
+        return
+    if running is None:
+        return
+    loop, q = running
+    # Queue lifecycle events right away, so they keep their position
+    # relative to the events emitted by the flow methods
+    if isinstance(event, FlowStartedEvent):
+        _put_flow_event(
+            loop,
+            q,
+            RunStarted(type=RuntimeEventTypes.RUN_STARTED, state=source.state),
+        )
+    elif isinstance(event, MethodExecutionStartedEvent):
+        _put_flow_event(
+            loop,
+            q,
+            NodeStarted(
+                type=RuntimeEventTypes.NODE_STARTED,
+                node_name=event.method_name,
+                state=source.state,
+            ),
+        )
+    elif isinstance(event, MethodExecutionFinishedEvent):
+        _put_flow_event(
+            loop,
+            q,
+            NodeFinished(
+                type=RuntimeEventTypes.NODE_FINISHED,
+                node_name=event.method_name,
+                state=source.state,
+            ),
+        )
+    elif isinstance(event, FlowFinishedEvent):
+        _put_flow_event(
+            loop,
+            q,
+            RunFinished(type=RuntimeEventTypes.RUN_FINISHED, state=source.state),
         )
 
-    # Register for the specific event classes we care about to avoid noise
-    for _ev_cls in (
-        FlowStartedEvent,
-        MethodExecutionStartedEvent,
-        MethodExecutionFinishedEvent,
-        FlowFinishedEvent,
-    ):
-        _crewai_event_bus.on(_ev_cls)(_global_event_listener)  # type: ignore
 
+def _register_flow_event_listener():
+    """Subscribe the flow event listener to the crewai event bus, once per process"""
+    global _flow_listener_registered  # pylint: disable=global-statement
+    if _flow_listener_registered:
+        return
+    with _flow_listener_lock:
+        if _flow_listener_registered:
+            return
+        # Register for the specific event classes we care about to avoid noise
+        for _ev_cls in (
+            FlowStartedEvent,
+            MethodExecutionStartedEvent,
+            MethodExecutionFinishedEvent,
+            FlowFinishedEvent,
+        ):
+            _crewai_event_bus.on(_ev_cls)(_crewai_flow_event_listener)  # type: ignore
+        _flow_listener_registered = True
+
+
+async def crewai_flow_async_runner(flow: Flow, inputs: Dict[str, Any]):
+    """
+    Runs a flow in a separate thread. Workaround since the flow will use
+    asyncio.run().
+    """
+    _register_flow_event_listener()
+    q = get_context_queue()
+    running = (asyncio.get_running_loop(), q)
+    _running_flows[flow] = running
     try:
         await flow.kickoff_async(inputs=inputs)
     except Exception as e:  # pylint: disable=broad-except
-        await queue_put(RunError(type=RuntimeEventTypes.RUN_ERROR, error=e))
+        await queue_put(
+            RunError(type=RuntimeEventTypes.RUN_ERROR, error=e), priority=True
+        )
+    finally:
+        if _running_flows.get(flow) is running:
+            del _running_flows[flow]
 
 
 async def copilotkit_emit_state(state: Any) -> Literal[True]:
@@ -179,7 +245,7 @@ async def copilotkit_emit_state(state: Any) -> Literal[True]:
             run_id=execution["run_id"],
             active=True,
             role="assistant",
-            state=json.dumps(state_as_dict),
+            state=dumps(state_as_dict),
             running=True,
         )
     )
@@ -309,7 +375,7 @@ async def copilotkit_stream(response):
 
     ```python
     response = await copilotkit_stream(
-        completion(
+        await acompletion(
             model="openai/gpt-4o",
             messages=messages,
             tools=tools,
@@ -317,6 +383,10 @@ async def copilotkit_stream(response):
         )
     )
     ```
+
+    Streams from `acompletion` are read on the event loop. Streams from the
+    synchronous `completion` are read on a worker thread, so that waiting for the
+    next chunk does not block other runs.
     """
     if isinstance(response, ModelResponse):
         return _copilotkit_stream_response(response)
@@ -325,6 +395,25 @@ async def copilotkit_stream(response):
     raise ValueError("Invalid response type")
 
 
+def _is_async_stream(response: CustomStreamWrapper) -> bool:
+    """True for streams created by `acompletion`"""
+    stream = response.completion_stream
+    if stream is None:
+        # the request is only made with the first chunk
+        return inspect.iscoroutinefunction(response.make_call)
+    return isinstance(stream, AsyncIterable)
+
+
+async def _stream_chunks(response: CustomStreamWrapper):
+    if _is_async_stream(response):
+        async for chunk in response:
+            yield chunk
+        return
+    async with aclosing(iterate_in_thread(response)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
 async def _copilotkit_stream_custom_stream_wrapper(response: CustomStreamWrapper):
     message_id: str = ""
     tool_call_id: str = ""
@@ -336,72 +425,79 @@ async def _copilotkit_stream_custom_stream_wrapper(response: CustomStreamWrapper
     mode = None
     all_tool_calls = []
 
-    for chunk in response:
-        if message_id is None:
-            message_id = chunk["id"]
+    async with aclosing(_stream_chunks(response)) as chunks:
+        async for chunk in chunks:
+            if message_id is None:
+                message_id = chunk["id"]
 
-        tool_calls = chunk["choices"][0]["delta"]["tool_calls"]
-        finish_reason = chunk["choices"][0]["finish_reason"]
-        created = chunk["created"]
-        model = chunk["model"]
-        system_fingerprint = chunk["system_fingerprint"]
+            tool_calls = chunk["choices"][0]["delta"]["tool_calls"]
+            finish_reason = chunk["choices"][0]["finish_reason"]
+            created = chunk["created"]
+            model = chunk["model"]
+            system_fingerprint = chunk["system_fingerprint"]
 
-        if mode == "text" and (tool_calls is not None or finish_reason is not None):
-            # end the current text message
-            await queue_put(text_message_end(message_id=message_id))
+            if mode == "text" and (tool_calls is not None or finish_reason is not None):
+                # end the current text message
+                await queue_put(text_message_end(message_id=message_id))
 
-        elif mode == "tool" and (tool_calls is None or finish_reason is not None):
-            # end the current tool call
-            await queue_put(action_execution_end(action_execution_id=tool_call_id))
+            elif mode == "tool" and (tool_calls is None or finish_reason is not None):
+                # end the current tool call
+                await queue_put(action_execution_end(action_execution_id=tool_call_id))
 
-        if finish_reason is not None:
-            break
+            if finish_reason is not None:
+                break
 
-        if mode != "text" and tool_calls is None:
-            # start a new text message
-            await queue_put(
-                text_message_start(message_id=message_id, parent_message_id=None)
-            )
-        elif mode != "tool" and tool_calls is not None and tool_calls[0].id is not None:
-            # start a new tool call
-            tool_call_id = tool_calls[0].id
+            if mode != "text" and tool_calls is None:
+                # start a new text message
+                await queue_put(
+                    text_message_start(message_id=message_id, parent_message_id=None)
+                )
+            elif (
+                mode != "tool"
+                and tool_calls is not None
+                and tool_calls[0].id is not None
+            ):
+                # start a new tool call
+                tool_call_id = tool_calls[0].id
 
-            await queue_put(
-                action_execution_start(
-                    action_execution_id=tool_call_id,
-                    action_name=tool_calls[0].function["name"],
-                    parent_message_id=message_id,
+                await queue_put(
+                    action_execution_start(
+                        action_execution_id=tool_call_id,
+                        action_name=tool_calls[0].function["name"],
+                        parent_message_id=message_id,
+                    )
                 )
-            )
 
-            all_tool_calls.append(
-                {
-                    "id": tool_call_id,
-                    "name": tool_calls[0].function["name"],
-                    "arguments": "",
-                }
-            )
+                all_tool_calls.append(
+                    {
+                        "id": tool_call_id,
+                        "name": tool_calls[0].function["name"],
+                        "arguments": "",
+                    }
+                )
 
-        mode = "tool" if tool_calls is not None else "text"
+            mode = "tool" if tool_calls is not None else "text"
 
-        if mode == "text":
-            text_content = chunk["choices"][0]["delta"]["content"]
-            if text_content is not None:
-                content += text_content
-                await queue_put(
-                    text_message_content(message_id=message_id, content=text_content)
-                )
+            if mode == "text":
+                text_content = chunk["choices"][0]["delta"]["content"]
+                if text_content is not None:
+                    content += text_content
+                    await queue_put(
+                        text_message_content(
+                            message_id=message_id, content=text_content
+                        )
+                    )
 
-        elif mode == "tool":
-            tool_arguments = tool_calls[0].function["arguments"]
-            if tool_arguments is not None:
-                await queue_put(
-                    action_execution_args(
-                        action_execution_id=tool_call_id, args=tool_arguments
+            elif mode == "tool":
+                tool_arguments = tool_calls[0].function["arguments"]
+                if tool_arguments is not None:
+                    await queue_put(
+                        action_execution_args(
+                            action_execution_id=tool_call_id, args=tool_arguments
+                        )
                     )
-                )
 
-                all_tool_calls[-1]["arguments"] += tool_arguments
+                    all_tool_calls[-1]["arguments"] += tool_arguments
 
     tool_calls = [
         ChatCompletionMessageToolCall(
@@ -52,3 +52,13 @@ class CopilotKitMisuseError(CopilotKitError, ValueError):
     """
 
     pass
+
+
+class AgentRunRejectedException(CopilotKitError):
+    """Exception raised when an agent run is not admitted because the server is saturated."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f"Agent run rejected: {reason}. Retry after {retry_after}s.")
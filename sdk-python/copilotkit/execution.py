@@ -0,0 +1,400 @@
+"""
+Admission control, cancellation metrics and off-loop execution for agent runs
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Generic,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+from typing_extensions import TypedDict
+
+from .exc import AgentRunRejectedException, CopilotKitMisuseError
+
+T = TypeVar("T")
+
+
+async def run_sync(
+    call: Callable[[], T],
+    *,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Run a blocking callable without blocking the event loop.
+
+    On a thread executor the callable runs in a copy of the current context, so
+    context variables such as the forwarded headers stay visible. Process executors
+    cannot carry context variables and need a picklable callable.
+
+    Parameters
+    ----------
+    call : Callable[[], T]
+        The callable to run.
+    executor : Optional[Executor]
+        The executor to run it on. Defaults to the event loop's default executor.
+    timeout : Optional[float]
+        The number of seconds to wait for the result before raising
+        asyncio.TimeoutError. The callable itself cannot be interrupted and keeps
+        running in the background.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        future = loop.run_in_executor(executor, call)
+    else:
+        future = loop.run_in_executor(executor, contextvars.copy_context().run, call)
+    if timeout is None:
+        return await future
+    return await asyncio.wait_for(future, timeout)
+
+
+async def iterate_in_thread(
+    items: Iterable[T],
+    *,
+    executor: Optional[Executor] = None,
+    maxsize: int = 64,
+) -> AsyncIterator[T]:
+    """
+    Iterate a blocking iterable, such as a synchronous LLM stream, on a worker
+    thread without blocking the event loop.
+
+    The worker reads at most `maxsize` items ahead of the consumer and runs in a
+    copy of the current context. When the consumer stops early, the worker stops
+    after the item it is reading and closes the iterator.
+
+    Parameters
+    ----------
+    items : Iterable[T]
+        The source.
+    executor : Optional[Executor]
+        A thread executor to run the worker on. Defaults to the event loop's
+        default executor.
+    maxsize : int
+        The number of items read ahead of the consumer.
+    """
+    if maxsize <= 0:
+        raise CopilotKitMisuseError("maxsize must be greater than 0")
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Tuple[bool, Any]]" = asyncio.Queue()
+    room = threading.Semaphore(maxsize)
+    stopped = threading.Event()
+
+    def _deliver(done: bool, item: Any):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (done, item))
+        except RuntimeError:  # the loop is closed
+            stopped.set()
+
+    def _pump():
+        iterator = iter(items)
+        try:
+            while not stopped.is_set():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    _deliver(True, None)
+                    return
+                room.acquire()
+                if stopped.is_set():
+                    return
+                _deliver(False, item)
+        except Exception as exc:  # pylint: disable=broad-except
+            _deliver(True, exc)
+        finally:
+            close = getattr(iterator, "close", None)
+            if stopped.is_set() and close is not None:
+                try:
+                    close()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+
+    loop.run_in_executor(executor, contextvars.copy_context().run, _pump)
+    try:
+        while True:
+            done, item = await queue.get()
+            if done:
+                if item is not None:
+                    raise item
+                return
+            room.release()
+            yield item
+    finally:
+        stopped.set()
+        room.release()
+
+
+class EventPump(Generic[T]):
+    """
+    Iterates an async iterator in a task of its own, so that the consumer can
+    wait for the next item with a timeout.
+
+    Cancelling a pending `__anext__()` would end most async generators, and
+    driving one generator from several tasks breaks the context variables it
+    sets. The pump keeps the whole iteration, including closing the source, in
+    one task.
+
+    Parameters
+    ----------
+    events : AsyncIterator[T]
+        The source.
+    maxsize : int
+        The number of items read ahead of the consumer.
+    """
+
+    _END = object()
+
+    def __init__(self, events: AsyncIterator[T], maxsize: int = 64):
+        self._items: "asyncio.Queue[Union[T, BaseException, object]]" = asyncio.Queue(
+            maxsize=maxsize
+        )
+        self._task = asyncio.ensure_future(self._pump(events))
+
+    async def _pump(self, events: AsyncIterator[T]):
+        try:
+            async for item in events:
+                await self._items.put(item)
+        except Exception as exc:  # pylint: disable=broad-except
+            await self._items.put(exc)
+            return
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        await self._items.put(self._END)
+
+    def ready(self) -> bool:
+        """True if the next item is available without waiting"""
+        return not self._items.empty()
+
+    async def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Returns the next item.
+
+        Raises asyncio.TimeoutError if none arrives within `timeout` seconds,
+        StopAsyncIteration at the end of the source and the exception the source
+        raised, if any.
+        """
+        if timeout is None:
+            item = await self._items.get()
+        elif timeout <= 0 and not self.ready():
+            raise asyncio.TimeoutError()
+        else:
+            item = await asyncio.wait_for(self._items.get(), timeout)
+        if item is self._END:
+            self._items.put_nowait(item)
+            raise StopAsyncIteration
+        if isinstance(item, BaseException):
+            raise item
+        return cast(T, item)
+
+    async def aclose(self):
+        """Stop the pump and close the source"""
+        self._task.cancel()
+        await asyncio.wait({self._task})
+
+
+class CancellationMetrics(TypedDict):
+    """
+    Counters of agent runs stopped before they finished
+
+    Parameters
+    ----------
+    client_disconnects : int
+        The number of streamed agent runs whose client went away.
+    cancelled_runs : int
+        The number of agent run tasks cancelled because their stream was closed.
+    """
+
+    client_disconnects: int
+    cancelled_runs: int
+
+
+_cancellations: CancellationMetrics = {"client_disconnects": 0, "cancelled_runs": 0}
+_cancellations_lock = threading.Lock()
+
+
+def record_cancellation(kind: str):
+    """Increment a counter of `cancellation_metrics()`"""
+    with _cancellations_lock:
+        _cancellations[kind] += 1  # type: ignore[literal-required]
+
+
+def cancellation_metrics() -> CancellationMetrics:
+    """Returns how many agent runs were stopped because nobody was listening"""
+    with _cancellations_lock:
+        return cast(CancellationMetrics, dict(_cancellations))
+
+
+class RunLimiterMetrics(TypedDict):
+    """
+    Metrics of an AgentRunLimiter
+
+    Parameters
+    ----------
+    active_runs : int
+        The number of agent runs currently executing.
+    queue_depth : int
+        The number of agent runs waiting for a slot.
+    admitted : int
+        The number of agent runs admitted so far.
+    rejected : int
+        The number of agent runs rejected because the wait queue was full.
+    timed_out : int
+        The number of agent runs rejected after waiting `queue_timeout` seconds.
+    total_wait_time : float
+        The seconds admitted runs spent waiting for a slot, summed.
+    max_wait_time : float
+        The longest time an admitted run waited for a slot, in seconds.
+    """
+
+    active_runs: int
+    queue_depth: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+class AgentRunLimiter:
+    """
+    Caps the number of concurrently executing agent runs.
+
+    Runs beyond `max_concurrent_runs` wait in a bounded first-in, first-out queue.
+    When the queue is full, a run is rejected right away with status 429. A run that
+    waits longer than `queue_timeout` is rejected with status 503. Both carry a
+    `Retry-After` hint.
+
+    ```python
+    from copilotkit.execution import AgentRunLimiter
+    from copilotkit.integrations.fastapi import add_fastapi_endpoint
+
+    limiter = AgentRunLimiter(max_concurrent_runs=8, max_queued_runs=32)
+    add_fastapi_endpoint(app, sdk, "/copilotkit", run_limiter=limiter)
+
+    limiter.metrics()  # {"active_runs": 8, "queue_depth": 3, ...}
+    ```
+
+    A limiter must only be used from a single event loop.
+
+    Parameters
+    ----------
+    max_concurrent_runs : int
+        The maximum number of agent runs executing at the same time.
+    max_queued_runs : int
+        The maximum number of agent runs waiting for a slot. 0 rejects every run
+        that cannot start immediately.
+    queue_timeout : Optional[float]
+        The number of seconds a run may wait for a slot. None waits indefinitely.
+    retry_after : int
+        The number of seconds clients are asked to wait before retrying a rejected run.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent_runs: int,
+        max_queued_runs: int = 64,
+        queue_timeout: Optional[float] = 30.0,
+        retry_after: int = 1,
+    ):
+        if max_concurrent_runs <= 0:
+            raise CopilotKitMisuseError("max_concurrent_runs must be greater than 0")
+        if max_queued_runs < 0:
+            raise CopilotKitMisuseError("max_queued_runs must not be negative")
+        if queue_timeout is not None and queue_timeout <= 0:
+            raise CopilotKitMisuseError("queue_timeout must be greater than 0")
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queued_runs = max_queued_runs
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    async def acquire(self):
+        """
+        Wait for a run slot.
+
+        Raises AgentRunRejectedException if the queue is full or the wait times out.
+        """
+        if self._active < self.max_concurrent_runs and not self._waiters:
+            self._active += 1
+            self._admit(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queued_runs:
+            self._rejected += 1
+            raise AgentRunRejectedException(
+                "too many queued agent runs", 429, self.retry_after
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError as exc:
+            self._abandon(waiter)
+            self._timed_out += 1
+            raise AgentRunRejectedException(
+                "timed out waiting for a free agent run slot", 503, self.retry_after
+            ) from exc
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self._admit(time.monotonic() - started)
+
+    def release(self):
+        """Free the slot of a finished run, handing it to the next queued run"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def metrics(self) -> RunLimiterMetrics:
+        """Returns queue depth, wait time and admission counters"""
+        return {
+            "active_runs": self._active,
+            "queue_depth": len(self._waiters),
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "total_wait_time": self._total_wait_time,
+            "max_wait_time": self._max_wait_time,
+        }
+
+    def _admit(self, waited: float):
+        self._admitted += 1
+        self._total_wait_time += waited
+        self._max_wait_time = max(self._max_wait_time, waited)
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # the slot was handed over just before the wait ended
+            self.release()
+            return
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
@@ -3,13 +3,15 @@
 import logging
 import asyncio
 import re
+import threading
 import uuid
 import warnings
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Any, cast, Optional
+from typing import List, Any, Callable, cast, Optional
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse, HTMLResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse, HTMLResponse
 from fastapi.encoders import jsonable_encoder
+from starlette.requests import ClientDisconnect
 from ..sdk import CopilotKitRemoteEndpoint, CopilotKitContext
 from ..types import Message, MetaEvent
 from ..exc import (
@@ -17,14 +19,23 @@ from ..exc import (
     ActionExecutionException,
     AgentNotFoundException,
     AgentExecutionException,
+    AgentRunRejectedException,
 )
+from ..execution import AgentRunLimiter, record_cancellation
+from ..stream_output import StreamOutput
 from ..action import ActionDict
 from ..html import generate_info_html
+from .. import json_codec
 from ..header_propagation import set_forwarded_headers
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# Paths of the v1 endpoints, matched against the whole path
+_AGENT_RUN_PATH = re.compile(r"agent/([a-zA-Z0-9_-]+)")
+_AGENT_STATE_PATH = re.compile(r"agent/([a-zA-Z0-9_-]+)/state")
+_ACTION_PATH = re.compile(r"action/([a-zA-Z0-9_-]+)")
+
 
 def add_fastapi_endpoint(
     fastapi_app: FastAPI,
@@ -33,8 +44,23 @@ def add_fastapi_endpoint(
     *,
     use_thread_pool: bool = False,
     max_workers: int = 10,
+    run_limiter: Optional[AgentRunLimiter] = None,
+    stream_output: Optional[StreamOutput] = None,
+    warm_up: bool = False,
 ):
-    """Add FastAPI endpoint with configurable ThreadPoolExecutor size"""
+    """
+    Add FastAPI endpoint with configurable ThreadPoolExecutor size
+
+    Pass an `AgentRunLimiter` as `run_limiter` to cap concurrent agent runs. Runs that
+    cannot be admitted are answered with 429 or 503 and a `Retry-After` header.
+
+    Pass a `StreamOutput` as `stream_output` to coalesce the events of agent runs into
+    fewer writes and compress them when the client sends a matching `Accept-Encoding`.
+
+    Pass `warm_up=True` to call `warm_up()` on the agents at startup, so that the first
+    request does not pay for introspecting graphs or opening connections. Agents built
+    by a callable are created per request and are not warmed up.
+    """
     if use_thread_pool:
         warnings.warn(
             "The 'use_thread_pool' parameter is deprecated "
@@ -42,19 +68,80 @@ def add_fastapi_endpoint(
             DeprecationWarning,
         )
 
+    # One executor for the lifetime of the app, each worker thread keeps its loop
+    executor: Optional[ThreadPoolExecutor] = None
+    worker_state = threading.local()
+    worker_loops: List[asyncio.AbstractEventLoop] = []
+    if use_thread_pool:
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="copilotkit"
+        )
+
+        def shutdown_executor():
+            cast(ThreadPoolExecutor, executor).shutdown(wait=True, cancel_futures=True)
+            for loop in worker_loops:
+                loop.close()
+
+        fastapi_app.router.on_shutdown.append(shutdown_executor)
+
+    if warm_up:
+
+        async def warm_up_agents():
+            await warm_up_static_agents(sdk)
+
+        fastapi_app.router.on_startup.append(warm_up_agents)
+
     def run_handler_in_thread(request: Request, sdk: CopilotKitRemoteEndpoint):
-        # Run the handler coroutine in the event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run the handler coroutine in the event loop of this worker thread
+        loop = getattr(worker_state, "loop", None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            worker_state.loop = loop
+            worker_loops.append(loop)
         return loop.run_until_complete(handler(request, sdk))
 
+    async def dispatch(request: Request):
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                executor, run_handler_in_thread, request, sdk
+            )
+        else:
+            response = await handler(request, sdk)
+        if stream_output is not None and isinstance(response, AgentStreamingResponse):
+            response.apply_stream_output(
+                stream_output, request.headers.get("accept-encoding")
+            )
+        return response
+
     async def make_handler(request: Request):
-        if use_thread_pool:
-            executor = ThreadPoolExecutor(max_workers=max_workers)
-            loop = asyncio.get_event_loop()
-            future = loop.run_in_executor(executor, run_handler_in_thread, request, sdk)
-            return await future
-        return await handler(request, sdk)
+        if run_limiter is None or not is_agent_run(
+            request.method, request.path_params.get("path", "")
+        ):
+            return await dispatch(request)
+
+        try:
+            await run_limiter.acquire()
+        except AgentRunRejectedException as exc:
+            logger.warning("Agent run rejected: %s", exc)
+            return JSONResponse(
+                content={"error": str(exc)},
+                status_code=exc.status_code,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+
+        try:
+            response = await dispatch(request)
+        except BaseException:
+            run_limiter.release()
+            raise
+        if isinstance(response, AgentStreamingResponse):
+            # the run continues until the stream is sent
+            response.on_close.append(run_limiter.release)
+        else:
+            run_limiter.release()
+        return response
 
     # Ensure the prefix starts with a slash and remove trailing slashes
     normalized_prefix = "/" + prefix.strip("/")
@@ -66,6 +153,95 @@ def add_fastapi_endpoint(
     )
 
 
+async def warm_up_static_agents(sdk: CopilotKitRemoteEndpoint):
+    """Warm up the agents of `sdk` that are not built per request"""
+    if callable(sdk.agents):
+        return
+    agents = [agent for agent in sdk.agents if hasattr(agent, "warm_up")]
+    results = await asyncio.gather(
+        *(agent.warm_up() for agent in agents), return_exceptions=True
+    )
+    for agent, result in zip(agents, results):
+        if isinstance(result, Exception):
+            logger.warning("Warm up of agent %s failed: %s", agent.name, result)
+
+
+def is_agent_run(method: str, path: str) -> bool:
+    """Check whether a request executes an agent"""
+    return method == "POST" and (
+        path == "agents/execute" or _AGENT_RUN_PATH.fullmatch(path) is not None
+    )
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the SDK's JSON codec"""
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return json_codec.dumps_bytes(content)
+        except TypeError:
+            # models and other types only FastAPI knows how to encode
+            return json_codec.dumps_bytes(jsonable_encoder(content))
+
+
+class AgentStreamingResponse(StreamingResponse):
+    """
+    Streams the events of an agent run and stops the run when the client disconnects.
+
+    Callbacks in `on_close` are called once the response has been sent or abandoned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close: List[Callable[[], None]] = []
+
+    def apply_stream_output(
+        self, stream_output: StreamOutput, accept_encoding: Optional[str]
+    ):
+        """Send the events through `stream_output`"""
+        self.body_iterator, headers = stream_output.wrap(
+            self.body_iterator, accept_encoding
+        )
+        self.headers.update(headers)
+
+    async def __call__(self, scope, receive, send):
+        async def wait_for_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+
+        streaming = asyncio.ensure_future(self.stream_response(send))
+        disconnect = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait(
+                {streaming, disconnect}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not streaming.done():
+                logger.info("Client disconnected, cancelling the agent run")
+                record_cancellation("client_disconnects")
+            elif isinstance(streaming.exception(), OSError):
+                # ASGI 2.4 servers report the disconnect by failing to send
+                record_cancellation("client_disconnects")
+                raise ClientDisconnect() from streaming.exception()
+            else:
+                streaming.result()
+        finally:
+            disconnect.cancel()
+            if not streaming.done():
+                streaming.cancel()
+                await asyncio.wait({streaming})
+            # close the run even if it was suspended between two events
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            for callback in self.on_close:
+                callback()
+
+        if self.background is not None:
+            await self.background()
+
+
 def body_get_or_raise(body: Any, key: str):
     """Get value from body or raise an error"""
     value = body.get(key)
@@ -106,7 +282,7 @@ async def handler(request: Request, sdk: CopilotKitRemoteEndpoint):
         )
 
     # handle /agent/name request for executing an agent
-    if method == "POST" and (match := re.match(r"agent/([a-zA-Z0-9_-]+)", path)):
+    if method == "POST" and (match := _AGENT_RUN_PATH.fullmatch(path)):
         name = match.group(1)
         body = body or {}
 
@@ -130,7 +306,7 @@ async def handler(request: Request, sdk: CopilotKitRemoteEndpoint):
         )
 
     # handle /agent/name/state request for getting agent state
-    if method == "POST" and (match := re.match(r"agent/([a-zA-Z0-9_-]+)/state", path)):
+    if method == "POST" and (match := _AGENT_STATE_PATH.fullmatch(path)):
         name = match.group(1)
         thread_id = body_get_or_raise(body, "threadId")
 
@@ -142,7 +318,7 @@ async def handler(request: Request, sdk: CopilotKitRemoteEndpoint):
         )
 
     # handle /action/name request for executing an action
-    if method == "POST" and (match := re.match(r"action/([a-zA-Z0-9_-]+)", path)):
+    if method == "POST" and (match := _ACTION_PATH.fullmatch(path)):
         name = match.group(1)
         arguments = body.get("arguments", {})
 
@@ -241,10 +417,28 @@ async def handle_info(
     as_html: bool = False,
 ):
     """Handle info request with FastAPI"""
-    result = sdk.info(context=context)
+    result = sdk.serialized_info(context=context)
     if as_html:
-        return HTMLResponse(content=generate_info_html(result))
-    return JSONResponse(content=jsonable_encoder(result))
+        return HTMLResponse(content=generate_info_html(result["info"]))
+    headers = {"ETag": result["etag"]}
+    if etag_matches(context["headers"].get("if-none-match"), result["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=result["json"], media_type="application/json", headers=headers
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
 
 
 async def handle_execute_action(
@@ -259,7 +453,7 @@ async def handle_execute_action(
         result = await sdk.execute_action(
             context=context, name=name, arguments=arguments
         )
-        return JSONResponse(content=jsonable_encoder(result))
+        return CodecJSONResponse(content=result)
     except ActionNotFoundException as exc:
         logger.error("Action not found: %s", exc)
         return JSONResponse(content={"error": str(exc)}, status_code=404)
@@ -297,7 +491,7 @@ def handle_execute_agent(  # pylint: disable=too-many-arguments
             actions=actions,
             meta_events=meta_events,
         )
-        return StreamingResponse(events, media_type="application/json")
+        return AgentStreamingResponse(events, media_type="application/json")
     except AgentNotFoundException as exc:
         logger.error("Agent not found: %s", exc, exc_info=True)
         return JSONResponse(content={"error": str(exc)}, status_code=404)
@@ -323,7 +517,7 @@ async def handle_get_agent_state(
             thread_id=thread_id,
             name=name,
         )
-        return JSONResponse(content=jsonable_encoder(result))
+        return CodecJSONResponse(content=result)
     except AgentNotFoundException as exc:
         logger.error("Agent not found: %s", exc, exc_info=True)
         return JSONResponse(content={"error": str(exc)}, status_code=404)
@@ -0,0 +1,209 @@
+"""
+JSON encoding for the SDK's serialization hot paths.
+
+Uses orjson or msgspec when one of them is installed and falls back to the
+standard library otherwise. All codecs produce compact JSON and encode Enum
+members as their values.
+
+```bash
+pip install "copilotkit[orjson]"
+```
+
+```python
+from copilotkit.json_codec import set_json_codec
+
+set_json_codec("json")  # force the standard library
+```
+"""
+
+import json
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Union
+
+from .exc import CopilotKitMisuseError
+
+Default = Optional[Callable[[Any], Any]]
+
+_ENUM_VALUES: Dict[Enum, Any] = {}
+
+
+def _encode_enum(obj: Any) -> Any:
+    """Returns the value of an Enum member, computed once per member"""
+    try:
+        return _ENUM_VALUES[obj]
+    except (KeyError, TypeError):
+        pass
+    if isinstance(obj, Enum):
+        value = _ENUM_VALUES[obj] = obj.value
+        return value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _with_enums(default: Default) -> Callable[[Any], Any]:
+    if default is None:
+        return _encode_enum
+
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, Enum):
+            return _encode_enum(obj)
+        return default(obj)
+
+    return _default
+
+
+class StdlibCodec:
+    """JSON codec backed by the standard library"""
+
+    name = "json"
+
+    def __init__(self):
+        # json.dumps() builds a new encoder for every call with custom options
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=_encode_enum
+        )
+
+    def dumps(self, obj: Any, *, default: Default = None) -> str:
+        """Encode to a string"""
+        if default is None:
+            return self._encoder.encode(obj)
+        return json.dumps(
+            obj,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=_with_enums(default),
+        )
+
+    def dumps_bytes(self, obj: Any, *, default: Default = None) -> bytes:
+        """Encode to UTF-8 bytes"""
+        return self.dumps(obj, default=default).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a string or bytes"""
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """JSON codec backed by orjson"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+        self._fallback = StdlibCodec()
+
+    def dumps(self, obj: Any, *, default: Default = None) -> str:
+        """Encode to a string"""
+        return self.dumps_bytes(obj, default=default).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any, *, default: Default = None) -> bytes:
+        """Encode to UTF-8 bytes"""
+        try:
+            return self._orjson.dumps(obj, default=default, option=self._options)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the standard library supports
+            return self._fallback.dumps_bytes(obj, default=default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a string or bytes"""
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec:
+    """JSON codec backed by msgspec"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec  # pylint: disable=import-outside-toplevel
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._fallback = StdlibCodec()
+
+    def dumps(self, obj: Any, *, default: Default = None) -> str:
+        """Encode to a string"""
+        return self.dumps_bytes(obj, default=default).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any, *, default: Default = None) -> bytes:
+        """Encode to UTF-8 bytes"""
+        try:
+            if default is None:
+                return self._encoder.encode(obj)
+            return self._msgspec.json.encode(obj, enc_hook=default)
+        except (TypeError, OverflowError):
+            return self._fallback.dumps_bytes(obj, default=default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a string or bytes"""
+        return self._decoder.decode(data)
+
+
+JSONCodec = Union[StdlibCodec, OrjsonCodec, MsgspecCodec]
+
+_CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": StdlibCodec,
+}
+
+
+def _detect_codec() -> JSONCodec:
+    for factory in (OrjsonCodec, MsgspecCodec):
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return StdlibCodec()
+
+
+_codec: JSONCodec = _detect_codec()
+
+
+def get_json_codec() -> JSONCodec:
+    """Returns the codec currently in use"""
+    return _codec
+
+
+def set_json_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Select the JSON codec.
+
+    Parameters
+    ----------
+    name : Optional[str]
+        "orjson", "msgspec" or "json". None picks the fastest installed codec.
+    """
+    global _codec  # pylint: disable=global-statement
+    if name is None:
+        _codec = _detect_codec()
+        return _codec
+    if name not in _CODECS:
+        raise CopilotKitMisuseError(
+            f"Unknown JSON codec '{name}', expected one of {', '.join(_CODECS)}"
+        )
+    try:
+        _codec = _CODECS[name]()
+    except ImportError as error:
+        raise CopilotKitMisuseError(
+            f"JSON codec '{name}' is not installed, run `pip install {name}`"
+        ) from error
+    return _codec
+
+
+def dumps(obj: Any, *, default: Default = None) -> str:
+    """Encode `obj` as compact JSON with the current codec"""
+    return _codec.dumps(obj, default=default)
+
+
+def dumps_bytes(obj: Any, *, default: Default = None) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON with the current codec"""
+    return _codec.dumps_bytes(obj, default=default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with the current codec"""
+    return _codec.loads(data)
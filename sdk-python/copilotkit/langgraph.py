@@ -6,8 +6,10 @@ import uuid
 import json
 import warnings
 import asyncio
-from typing import List, Optional, Any, Union, Dict
-from typing_extensions import TypedDict
+import contextvars
+from typing import List, Optional, Any, Union, Dict, Tuple
+from typing_extensions import TypedDict, cast
+from langgraph.config import get_config
 from langgraph.graph import MessagesState
 
 
@@ -19,6 +21,7 @@ from langchain_core.messages import (
     ToolMessage,
 )
 from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ensure_config, merge_configs
 from langchain_core.callbacks.manager import adispatch_custom_event
 from langgraph.types import interrupt
 
@@ -28,6 +31,118 @@ from .logging import get_logger
 
 logger = get_logger(__name__)
 
+# How long the emit helpers wait for the stream to pick up a custom event before
+# giving up on the acknowledgement and continuing anyway.
+EMIT_ACK_TIMEOUT = 1.0
+
+# The metadata key of the id that the emit helpers add to their custom events
+EMIT_ID_METADATA_KEY = "copilotkit:emit-id"
+
+_NO_STATE = object()
+
+
+class EmitAcknowledgements:
+    """
+    Tracks custom events dispatched by the copilotkit_emit_* helpers until the
+    agent streaming the run has dispatched them to the client.
+
+    Events are matched by the id under `EMIT_ID_METADATA_KEY` in their metadata.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def expect(self) -> Tuple[str, asyncio.Future]:
+        """Register an event that is about to be dispatched, and return its id"""
+        emit_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[emit_id] = future
+        return emit_id, future
+
+    def acknowledge(self, emit_id: Optional[str]):
+        """Mark the event with this id as delivered"""
+        future = self._pending.pop(emit_id, None) if emit_id else None
+        if future is not None and not future.done():
+            future.set_result(True)
+
+    def discard(self, emit_id: str):
+        """Stop waiting for an event, e.g. because it failed or timed out"""
+        future = self._pending.pop(emit_id, None)
+        if future is not None:
+            future.cancel()
+
+    def release_all(self):
+        """Release every waiting emitter, used when the run ends"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(False)
+        self._pending.clear()
+
+
+_EMIT_ACKNOWLEDGEMENTS = contextvars.ContextVar("emit_acknowledgements", default=None)
+
+
+def get_emit_acknowledgements() -> Optional[EmitAcknowledgements]:
+    """
+    Get the emit acknowledgements of the run streaming in this context, if any.
+    """
+    return _EMIT_ACKNOWLEDGEMENTS.get()
+
+
+def set_emit_acknowledgements(acks: EmitAcknowledgements) -> contextvars.Token:
+    """
+    Set the emit acknowledgements for this context.
+    """
+    return _EMIT_ACKNOWLEDGEMENTS.set(cast(Any, acks))
+
+
+def reset_emit_acknowledgements(token: contextvars.Token):
+    """
+    Reset the emit acknowledgements for this context.
+    """
+    _EMIT_ACKNOWLEDGEMENTS.reset(token)
+
+
+async def _dispatch_custom_event(name: str, payload: Any, config: RunnableConfig):
+    """
+    Dispatch a custom event and return an awaitable that completes once the
+    event has been dispatched to the stream.
+    """
+    acks = get_emit_acknowledgements()
+    if acks is None:
+        # nothing acknowledges the events of this run, so there is nothing to
+        # wait for
+        await adispatch_custom_event(name, payload, config=config)
+        return _dispatched()
+    emit_id, ack = acks.expect()
+    try:
+        await adispatch_custom_event(
+            name,
+            payload,
+            config=merge_configs(
+                ensure_config(config), {"metadata": {EMIT_ID_METADATA_KEY: emit_id}}
+            ),
+        )
+    except BaseException:
+        acks.discard(emit_id)
+        raise
+    return _wait_for_ack(acks, emit_id, ack)
+
+
+async def _dispatched():
+    pass
+
+
+async def _wait_for_ack(acks: EmitAcknowledgements, emit_id: str, ack: asyncio.Future):
+    try:
+        await asyncio.wait_for(ack, timeout=EMIT_ACK_TIMEOUT)
+    except asyncio.TimeoutError:
+        acks.discard(emit_id)
+        logger.warning(
+            "Custom event was not acknowledged by the stream within %ss",
+            EMIT_ACK_TIMEOUT,
+        )
+
 
 class CopilotContextItem(TypedDict):
     """Copilot context item"""
@@ -54,6 +169,72 @@ class CopilotKitState(MessagesState):
     copilotkit: CopilotKitProperties
 
 
+def _has_copilotkit_payload(candidate: Any) -> bool:
+    return isinstance(candidate, dict) and (
+        bool(candidate.get("actions")) or bool(candidate.get("context"))
+    )
+
+
+def copilotkit_get_payload(state: Any) -> CopilotKitProperties:
+    """
+    Returns the frontend actions and app context of the current run.
+
+    Reads `state["copilotkit"]`, falling back to the runtime context of the graph
+    run, which is where the payload lives for agents created with
+    `LangGraphAGUIAgent(..., checkpoint_runtime_payload=False)` and for subgraphs
+    that do not receive the `copilotkit` state key.
+
+    ### Examples
+
+    ```python
+    from copilotkit.langgraph import copilotkit_get_payload
+
+    async def chat_node(state: AgentState, config: RunnableConfig):
+        actions = copilotkit_get_payload(state).get("actions", [])
+        model = ChatOpenAI().bind_tools([*actions, *backend_tools])
+        ...
+    ```
+
+    Parameters
+    ----------
+    state : Any
+        The state of the node.
+
+    Returns
+    -------
+    CopilotKitProperties
+        The payload, empty when the run has none.
+    """
+    payload = (state or {}).get("copilotkit") or {}
+    if _has_copilotkit_payload(payload):
+        return payload
+    try:
+        config = get_config()
+    except RuntimeError:
+        # not called from a running graph
+        return cast(CopilotKitProperties, payload)
+    for carrier in (get_runtime_context(), config.get("configurable")):
+        candidate = carrier.get("copilotkit") if isinstance(carrier, dict) else None
+        if _has_copilotkit_payload(candidate):
+            return candidate
+    return cast(CopilotKitProperties, payload)
+
+
+def get_runtime_context() -> Any:
+    """
+    Get the runtime context of the running graph, or None outside of a graph run.
+    """
+    try:
+        from langgraph.runtime import (  # pylint: disable=import-outside-toplevel
+            get_runtime,
+        )
+
+        return getattr(get_runtime(), "context", None)
+    except Exception:  # pylint: disable=broad-except
+        # not in a running graph, or a langgraph without a runtime
+        return None
+
+
 def langchain_messages_to_copilotkit(messages: List[BaseMessage]) -> List[Message]:
     """
     Convert LangChain messages to CopilotKit messages
@@ -286,12 +467,8 @@ async def copilotkit_exit(config: RunnableConfig):
         Always return True.
     """
 
-    await adispatch_custom_event(
-        "copilotkit_exit",
-        {},
-        config=config,
-    )
-    await asyncio.sleep(0.02)
+    flush = await _dispatch_custom_event("copilotkit_exit", {}, config)
+    await flush
 
     return True
 
@@ -324,16 +501,126 @@ async def copilotkit_emit_state(config: RunnableConfig, state: Any):
         Always return True.
     """
 
-    await adispatch_custom_event(
-        "copilotkit_manually_emit_intermediate_state",
-        state,
-        config=config,
+    flush = await _dispatch_custom_event(
+        "copilotkit_manually_emit_intermediate_state", state, config
     )
-    await asyncio.sleep(0.02)
+    await flush
 
     return True
 
 
+class CopilotKitStateStream:
+    """
+    Coalesces rapid state updates into at most `max_hz` emitted states per second.
+
+    Create it with `copilotkit_state_stream`. Updates are latest-wins: when several
+    updates arrive within one interval, only the most recent one is emitted. The
+    last update is always emitted when the stream is closed. When the block exits
+    with an error, the pending update is discarded instead, since the node did not
+    complete.
+    """
+
+    def __init__(self, config: RunnableConfig, *, max_hz: float = 10.0):
+        if max_hz <= 0:
+            raise CopilotKitMisuseError("max_hz must be greater than 0")
+        self._config = config
+        self._interval = 1.0 / max_hz
+        self._latest: Any = _NO_STATE
+        self._last_emit: Optional[float] = None
+        self._closed = False
+        self._wake = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def update(self, state: Any):
+        """Record the latest state. It is emitted once the rate limit allows."""
+        if self._closed:
+            raise CopilotKitMisuseError("Cannot update a closed state stream")
+        self._latest = state
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def flush(self):
+        """Emit the pending state right away, ignoring the rate limit."""
+        if self._latest is _NO_STATE:
+            return
+        state, self._latest = self._latest, _NO_STATE
+        self._last_emit = asyncio.get_running_loop().time()
+        await copilotkit_emit_state(self._config, state)
+
+    async def aclose(self):
+        """Emit the final state and stop the stream."""
+        self._closed = True
+        self._wake.set()
+        if self._flusher is not None:
+            await self._flusher
+        await self.flush()
+
+    async def _run_flusher(self):
+        loop = asyncio.get_running_loop()
+        while self._latest is not _NO_STATE:
+            if self._last_emit is not None and not self._closed:
+                delay = self._last_emit + self._interval - loop.time()
+                if delay > 0:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            await self.flush()
+
+    async def __aenter__(self) -> "CopilotKitStateStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.aclose()
+            return
+        self._closed = True
+        self._latest = _NO_STATE
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            # wait for the flusher to stop, without raising its cancellation
+            await asyncio.wait([self._flusher])
+
+
+def copilotkit_state_stream(
+    config: RunnableConfig, *, max_hz: float = 10.0
+) -> CopilotKitStateStream:
+    """
+    Streams intermediate state to CopilotKit at a bounded rate. Useful for long running
+    nodes that produce many state updates, where emitting each of them with
+    `copilotkit_emit_state` would flood the client with redundant snapshots.
+
+    Updates are latest-wins: at most `max_hz` states are emitted per second, and the
+    final state is always emitted when the block exits. If the block raises, the
+    state that is still pending is discarded.
+
+    ### Examples
+
+    ```python
+    from copilotkit.langgraph import copilotkit_state_stream
+
+    async with copilotkit_state_stream(config, max_hz=5) as stream:
+        for i, document in enumerate(documents):
+            await ingest(document)
+            stream.update({"ingested": i + 1})
+    ```
+
+    Parameters
+    ----------
+    config : RunnableConfig
+        The LangGraph configuration.
+    max_hz : float
+        The maximum number of states emitted per second. Defaults to 10.
+
+    Returns
+    -------
+    CopilotKitStateStream
+        An async context manager. Call `update(state)` to record the latest state.
+    """
+    return CopilotKitStateStream(config, max_hz=max_hz)
+
+
 async def copilotkit_emit_message(config: RunnableConfig, message: str):
     """
     Manually emits a message to CopilotKit. Useful in longer running nodes to update the user.
@@ -365,12 +652,12 @@ async def copilotkit_emit_message(config: RunnableConfig, message: str):
     Awaitable[bool]
         Always return True.
     """
-    await adispatch_custom_event(
+    flush = await _dispatch_custom_event(
         "copilotkit_manually_emit_message",
         {"message": message, "message_id": str(uuid.uuid4()), "role": "assistant"},
-        config=config,
+        config,
     )
-    await asyncio.shield(asyncio.sleep(0.02))
+    await asyncio.shield(flush)
 
     return True
 
@@ -432,17 +719,18 @@ async def copilotkit_emit_tool_call(
             f"Tool arguments for '{name}' are not JSON-serializable: {e}"
         ) from e
 
-    await adispatch_custom_event(
+    flush = await _dispatch_custom_event(
         "copilotkit_manually_emit_tool_call",
         {"name": name, "args": args, "id": tool_call_id},
-        config=config,
+        config,
     )
     # LangGraph's adispatch_custom_event is async but does not guarantee the event
-    # has been flushed to the SSE stream before it returns. Without this sleep,
-    # a subsequent emit can interleave and corrupt event ordering on the client.
-    # Shielded so that task cancellation doesn't prevent us from returning the ID.
+    # has been flushed to the SSE stream before it returns. Without waiting for
+    # the flush, a subsequent emit can interleave and corrupt event ordering on
+    # the client. Shielded so that task cancellation doesn't prevent us from
+    # returning the ID.
     try:
-        await asyncio.shield(asyncio.sleep(0.02))
+        await asyncio.shield(flush)
     except asyncio.CancelledError:
         logger.warning(
             "copilotkit_emit_tool_call cancelled during post-dispatch flush for "
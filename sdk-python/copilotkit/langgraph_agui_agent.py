@@ -1,12 +1,27 @@
+import asyncio
 import inspect
 import json
 import logging
+import weakref
+from contextlib import aclosing
 from enum import Enum
-from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from ag_ui.core import (
     CustomEvent,
     EventType,
+    StateDeltaEvent,
     StateSnapshotEvent,
     TextMessageContentEvent,
     TextMessageEndEvent,
@@ -16,10 +31,23 @@ from ag_ui.core import (
     ToolCallStartEvent,
 )
 from ag_ui_langgraph import LangGraphAgent
-from langchain_core.runnables import RunnableConfig
+from ag_ui_langgraph.utils import (
+    resolve_encrypted_reasoning_content,
+    resolve_reasoning_content,
+)
+from langchain_core.runnables import RunnableConfig, ensure_config
 from langgraph.graph.state import CompiledStateGraph
+from typing_extensions import TypedDict
 
+from . import json_codec
 from .exc import CopilotKitMisuseError
+from .execution import EventPump
+from .langgraph import (
+    EMIT_ID_METADATA_KEY,
+    EmitAcknowledgements,
+    reset_emit_acknowledgements,
+    set_emit_acknowledgements,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +70,7 @@ class LangGraphEventTypes(Enum):
     """LangGraph event types"""
 
     OnChatModelStream = "on_chat_model_stream"
+    OnChatModelEnd = "on_chat_model_end"
     OnCustomEvent = "on_custom_event"
 
 
@@ -52,8 +81,69 @@ class PredictStateTool:
         self.tool_argument = tool_argument
 
 
+# A STATE_DELTA is only sent when its JSON Patch is smaller than this fraction of
+# the full snapshot; otherwise the snapshot is cheaper for the client to apply.
+STATE_DELTA_MAX_RATIO = 0.5
+
+# With `coalesce_window` set, consecutive TEXT_MESSAGE_CONTENT / TOOL_CALL_ARGS
+# deltas of the same message or tool call are merged for up to that many seconds,
+# or until they reach the size below, before they are sent. A suggested window:
+DELTA_COALESCE_WINDOW = 0.015
+DELTA_COALESCE_MAX_BYTES = 4096
+
+_TEXT_MESSAGE_EVENT_TYPES = frozenset(
+    [
+        EventType.TEXT_MESSAGE_START,
+        EventType.TEXT_MESSAGE_CONTENT,
+        EventType.TEXT_MESSAGE_END,
+    ]
+)
+_TOOL_CALL_EVENT_TYPES = frozenset(
+    [
+        EventType.TOOL_CALL_START,
+        EventType.TOOL_CALL_ARGS,
+        EventType.TOOL_CALL_END,
+    ]
+)
+_FILTERED_EVENT_TYPES = _TEXT_MESSAGE_EVENT_TYPES | _TOOL_CALL_EVENT_TYPES
+_CHAT_MODEL_EVENTS = frozenset(
+    [
+        LangGraphEventTypes.OnChatModelStream.value,
+        LangGraphEventTypes.OnChatModelEnd.value,
+    ]
+)
+
 State = Dict[str, Any]
 SchemaKeys = Dict[str, List[str]]
+
+
+class GraphCapabilities(TypedDict):
+    """
+    What the agent knows about its graph after introspecting it
+
+    Parameters
+    ----------
+    supports_context : bool
+        Whether `astream_events` accepts a runtime `context`.
+    schema_keys : SchemaKeys
+        The input, output, config and context schema keys, including the agent's
+        constant keys.
+    """
+
+    supports_context: bool
+    schema_keys: SchemaKeys
+
+
+class _GraphIntrospection(TypedDict):
+    supports_context: bool
+    # by the constant schema keys of the agent class
+    schema_keys: Dict[Tuple[str, ...], SchemaKeys]
+
+
+# Introspection results, shared by every agent (and clone) serving the same graph
+_graph_introspection: "weakref.WeakKeyDictionary[Any, _GraphIntrospection]" = (
+    weakref.WeakKeyDictionary()
+)
 TextMessageEvents = Union[
     TextMessageStartEvent, TextMessageContentEvent, TextMessageEndEvent
 ]
@@ -68,10 +158,95 @@ class LangGraphAGUIAgent(LangGraphAgent):
         graph: CompiledStateGraph,
         description: Optional[str] = None,
         config: Union[Optional[RunnableConfig], dict] = None,
+        emit_state_deltas: bool = False,
+        coalesce_window: float = 0,
+        coalesce_max_bytes: int = DELTA_COALESCE_MAX_BYTES,
+        checkpoint_runtime_payload: bool = True,
     ):
+        if coalesce_window < 0:
+            raise CopilotKitMisuseError("coalesce_window must not be negative")
+        if coalesce_max_bytes < 1:
+            raise CopilotKitMisuseError("coalesce_max_bytes must be at least 1")
         super().__init__(name=name, graph=graph, description=description, config=config)
         self.constant_schema_keys = self.constant_schema_keys + ["copilotkit"]
+        self.emit_state_deltas = emit_state_deltas
+        self.coalesce_window = coalesce_window
+        self.coalesce_max_bytes = coalesce_max_bytes
+        # False keeps the frontend actions and app context out of the graph state
+        # (and so out of every checkpoint); they reach the graph through the
+        # runtime context only, see copilotkit_get_payload().
+        self.checkpoint_runtime_payload = checkpoint_runtime_payload
         self._copilotkit_runtime_payload: dict[str, Any] | None = None
+        self._emit_acknowledgements: Optional[EmitAcknowledgements] = None
+        self._sending_checkpoint_snapshots = False
+
+    async def warm_up(
+        self, *, connect: Optional[Sequence[Callable[[], Any]]] = None
+    ) -> GraphCapabilities:
+        """
+        Introspect the graph ahead of the first request.
+
+        The results are cached per graph, so runs (and clones of this agent) skip the
+        introspection. `add_fastapi_endpoint(..., warm_up=True)` calls this at startup.
+
+        Parameters
+        ----------
+        connect : Optional[Sequence[Callable[[], Any]]]
+            Callables that open provider connections ahead of time, for example
+            `lambda: model.ainvoke("ping")`. They run concurrently; failures are
+            logged and do not fail the warm up.
+        """
+        capabilities: GraphCapabilities = {
+            "supports_context": self._graph_introspection()["supports_context"],
+            "schema_keys": self.get_schema_keys(ensure_config(dict(self.config or {}))),
+        }
+        results = await asyncio.gather(
+            *(_call_warm_up_hook(hook) for hook in connect or ()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Warm up of agent %s failed: %s", self.name, result)
+        return capabilities
+
+    def _graph_introspection(self) -> _GraphIntrospection:
+        try:
+            introspection = _graph_introspection.get(self.graph)
+        except TypeError:  # the graph cannot be weakly referenced
+            introspection = None
+        if introspection is None:
+            parameters = inspect.signature(self.graph.astream_events).parameters
+            introspection = {
+                "supports_context": "context" in parameters,
+                "schema_keys": {},
+            }
+            try:
+                _graph_introspection[self.graph] = introspection
+            except TypeError:
+                pass
+        return introspection
+
+    def get_schema_keys(self, config: RunnableConfig) -> SchemaKeys:
+        """Cached per graph, the schemas of a compiled graph do not change"""
+        cache = self._graph_introspection()["schema_keys"]
+        constant_keys = tuple(self.constant_schema_keys)
+        schema_keys = cache.get(constant_keys)
+        if schema_keys is None:
+            schema_keys = cache[constant_keys] = super().get_schema_keys(config)
+        return {kind: list(keys) for kind, keys in schema_keys.items()}
+
+    def clone(self) -> "LangGraphAGUIAgent":
+        """Create a fresh copy with clean per-request state."""
+        return type(self)(
+            name=self.name,
+            graph=self.graph,
+            description=self.description,
+            config=dict(self.config) if self.config else None,
+            emit_state_deltas=self.emit_state_deltas,
+            coalesce_window=self.coalesce_window,
+            coalesce_max_bytes=self.coalesce_max_bytes,
+            checkpoint_runtime_payload=self.checkpoint_runtime_payload,
+        )
 
     def _dispatch_event(self, event) -> str:
         """Override the dispatch event method to handle custom CopilotKit events and filtering.
@@ -80,7 +255,26 @@ class LangGraphAGUIAgent(LangGraphAgent):
         but the base class also violates it by returning event objects). The None values are
         filtered out in run() before reaching the encoder.
         """
+        try:
+            dispatched = self._dispatch_copilotkit_event(event)
+            if (
+                getattr(dispatched, "type", None) == EventType.STATE_SNAPSHOT
+                and self.emit_state_deltas
+            ):
+                return self._state_snapshot_or_delta(dispatched)
+            return dispatched
+        finally:
+            # Custom events are acknowledged once dispatched, so the emit helper
+            # that sent them can continue without a fixed delay.
+            if (
+                event.type == EventType.CUSTOM
+                and self._emit_acknowledgements is not None
+            ):
+                self._emit_acknowledgements.acknowledge(
+                    _metadata(event.raw_event).get(EMIT_ID_METADATA_KEY)
+                )
 
+    def _dispatch_copilotkit_event(self, event) -> str:
         if event.type == EventType.CUSTOM:
             custom_event = event
 
@@ -143,46 +337,125 @@ class LangGraphAGUIAgent(LangGraphAgent):
 
         # Handle filtering based on metadata for text messages and tool calls
         raw_event = getattr(event, "raw_event", None)
-        if raw_event:
-            is_message_event = event.type in [
-                EventType.TEXT_MESSAGE_START,
-                EventType.TEXT_MESSAGE_CONTENT,
-                EventType.TEXT_MESSAGE_END,
-            ]
-            is_tool_event = event.type in [
-                EventType.TOOL_CALL_START,
-                EventType.TOOL_CALL_ARGS,
-                EventType.TOOL_CALL_END,
-            ]
-
-            # Handle both dict and object cases for raw_event
-            # See: https://github.com/CopilotKit/CopilotKit/issues/2066
-            metadata = (
-                raw_event.get("metadata", {})
-                if isinstance(raw_event, dict)
-                else getattr(raw_event, "metadata", {})
-            ) or {}
-
-            if "copilotkit:emit-tool-calls" in metadata:
-                if metadata["copilotkit:emit-tool-calls"] is False and is_tool_event:
-                    return None  # Don't dispatch this event
-
-            if "copilotkit:emit-messages" in metadata:
-                if metadata["copilotkit:emit-messages"] is False and is_message_event:
-                    return None  # Don't dispatch this event
+        if raw_event and event.type in _FILTERED_EVENT_TYPES:
+            emit_messages, emit_tool_calls = self._emit_flags(raw_event)
+            if not emit_tool_calls and event.type in _TOOL_CALL_EVENT_TYPES:
+                return None  # Don't dispatch this event
+            if not emit_messages and event.type in _TEXT_MESSAGE_EVENT_TYPES:
+                return None  # Don't dispatch this event
 
         return super()._dispatch_event(event)
 
+    def _emit_flags(self, raw_event: Any) -> Tuple[bool, bool]:
+        """Whether the LangGraph run that produced `raw_event` emits messages and
+        tool calls, from the metadata set by `copilotkit_customize_config`.
+
+        The metadata of a run does not change, so it is read once per run id.
+        """
+        # Handle both dict and object cases for raw_event
+        # See: https://github.com/CopilotKit/CopilotKit/issues/2066
+        is_dict = isinstance(raw_event, dict)
+        run_id = raw_event.get("run_id") if is_dict else None
+        active_run = getattr(self, "active_run", None)
+        cache = None
+        if run_id is not None and active_run is not None:
+            cache = active_run.setdefault("emit_flags", {})
+            flags = cache.get(run_id)
+            if flags is not None:
+                return flags
+
+        metadata = _metadata(raw_event)
+        flags = (
+            metadata.get("copilotkit:emit-messages") is not False,
+            metadata.get("copilotkit:emit-tool-calls") is not False,
+        )
+        if cache is not None:
+            cache[run_id] = flags
+        return flags
+
+    def _is_hidden_model_event(self, event: Dict[str, Any]) -> bool:
+        """True for stream and end events of a chat model that emits neither
+        messages nor tool calls, which would only produce events that
+        `_dispatch_event` drops. Reasoning and predicted state are still
+        handled by the adapter."""
+        if getattr(self, "active_run", None) is None:
+            return False
+        if any(self._emit_flags(event)):
+            return False
+        if (event.get("metadata") or {}).get(
+            "copilotkit:emit-intermediate-state"
+        ) is not None or self.active_run.get("reasoning_process") is not None:
+            return False
+        chunk = (event.get("data") or {}).get("chunk")
+        return chunk is None or (
+            resolve_reasoning_content(chunk) is None
+            and not resolve_encrypted_reasoning_content(chunk)
+        )
+
+    def _state_snapshot_or_delta(self, event: StateSnapshotEvent):
+        """Replace a STATE_SNAPSHOT with a STATE_DELTA against the last state sent in
+        this run, when the JSON Patch is small enough to be worth it.
+
+        The client's state can drift from the last state sent (predicted state, its
+        own updates), so the snapshots of the checkpoint that end a run are always
+        sent in full to reconcile it."""
+        active_run = getattr(self, "active_run", None)
+        if active_run is None:
+            return event
+
+        encoded = json_codec.dumps_bytes(event.snapshot, default=str)
+        snapshot = json_codec.loads(encoded)
+        previous = active_run.get("last_state_snapshot")
+        active_run["last_state_snapshot"] = snapshot
+        if previous is None or self._sending_checkpoint_snapshots:
+            return event
+
+        delta = _json_patch(previous, snapshot)
+        if not delta:
+            return event
+        delta_size = len(json_codec.dumps_bytes(delta, default=str))
+        if delta_size >= len(encoded) * STATE_DELTA_MAX_RATIO:
+            return event
+        return StateDeltaEvent(
+            type=EventType.STATE_DELTA,
+            delta=delta,
+            raw_event=event.raw_event,
+        )
+
+    async def get_state_and_messages_snapshots(self, config: RunnableConfig):
+        """Override to send the snapshots of the checkpoint in full"""
+        self._sending_checkpoint_snapshots = True
+        try:
+            async for event in super().get_state_and_messages_snapshots(config):
+                yield event
+        finally:
+            self._sending_checkpoint_snapshots = False
+
     async def run(self, input):
         """Override run to filter out None events from _dispatch_event filtering."""
         self._copilotkit_runtime_payload = self._serialize_copilotkit_runtime_payload(
             input
         )
+        self._emit_acknowledgements = EmitAcknowledgements()
+        # Graph tasks inherit this context, which lets the emit helpers find the
+        # acknowledgements of the run they are part of.
+        token_acks = set_emit_acknowledgements(self._emit_acknowledgements)
+        coalesce_window = getattr(self, "coalesce_window", 0)
         try:
-            async for event in super().run(input):
-                if event is not None:
-                    yield event
+            # close the graph stream right away when the consumer stops listening
+            async with aclosing(super().run(input)) as events:
+                if coalesce_window:
+                    events = _coalesce_deltas(
+                        events, coalesce_window, self.coalesce_max_bytes
+                    )
+                async with aclosing(events):
+                    async for event in events:
+                        if event is not None:
+                            yield event
         finally:
+            self._emit_acknowledgements.release_all()
+            self._emit_acknowledgements = None
+            reset_emit_acknowledgements(token_acks)
             self._copilotkit_runtime_payload = None
 
     async def _handle_single_event(
@@ -190,6 +463,13 @@ class LangGraphAGUIAgent(LangGraphAgent):
     ) -> AsyncGenerator[str, None]:
         """Override to add custom event processing for PredictState events"""
 
+        # Chat models hidden with copilotkit_customize_config are skipped before the
+        # adapter builds events for them.
+        if event.get("event") in _CHAT_MODEL_EVENTS and self._is_hidden_model_event(
+            event
+        ):
+            return
+
         # First, check if this is a raw event that should generate a PredictState event
         if event.get("event") == LangGraphEventTypes.OnChatModelStream.value:
             predict_state_metadata = event.get("metadata", {}).get(
@@ -396,9 +676,7 @@ class LangGraphAGUIAgent(LangGraphAgent):
         fork: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """Thread CopilotKit payload through LangGraph runtime context for subgraphs."""
-        supports_context = (
-            "context" in inspect.signature(self.graph.astream_events).parameters
-        )
+        supports_context = self._graph_introspection()["supports_context"]
         merged_context = dict(context or {})
         captured_payload = self._copilotkit_runtime_payload
         if captured_payload is not None:
@@ -433,6 +711,8 @@ class LangGraphAGUIAgent(LangGraphAgent):
     ) -> State:
         """Override to add CopilotKit actions to the state"""
         merged_state = super().langgraph_default_merge_state(state, messages, input)
+        if not getattr(self, "checkpoint_runtime_payload", True):
+            return self._without_runtime_payload(merged_state)
         # Extract tools from the merged state and add them as CopilotKit actions
         agui_properties = merged_state.get("ag-ui", {}) or merged_state
 
@@ -450,6 +730,24 @@ class LangGraphAGUIAgent(LangGraphAgent):
             },
         }
 
+    @staticmethod
+    def _without_runtime_payload(merged_state: State) -> State:
+        """
+        Strip the tool schemas and app context from the state of the run.
+
+        Every channel of the state is written to each checkpoint, while the payload is
+        sent again with every request and threaded through the runtime context by
+        get_stream_kwargs(). The keys are emptied rather than left out so that
+        payloads checkpointed by earlier runs are replaced.
+        """
+        stripped: State = {**merged_state, "copilotkit": {}}
+        if "tools" in merged_state:
+            stripped["tools"] = []
+        agui_properties = merged_state.get("ag-ui")
+        if isinstance(agui_properties, dict):
+            stripped["ag-ui"] = {**agui_properties, "tools": [], "context": []}
+        return stripped
+
     def dict_repr(self):
         """Return dictionary representation of the agent"""
         return {
@@ -457,3 +755,134 @@ class LangGraphAGUIAgent(LangGraphAgent):
             "description": self.description or "",
             "type": "langgraph_agui",
         }
+
+
+def _metadata(raw_event: Any) -> Dict[str, Any]:
+    """The metadata of a LangGraph event, which can be a dict or an object"""
+    if isinstance(raw_event, dict):
+        return raw_event.get("metadata") or {}
+    return getattr(raw_event, "metadata", None) or {}
+
+
+async def _call_warm_up_hook(hook: Callable[[], Any]):
+    result = hook()
+    if inspect.isawaitable(result):
+        await result
+
+
+def _delta_key(event: Any) -> Optional[tuple]:
+    event_type = getattr(event, "type", None)
+    if event_type == EventType.TEXT_MESSAGE_CONTENT:
+        return (event_type, event.message_id)
+    if event_type == EventType.TOOL_CALL_ARGS:
+        return (event_type, event.tool_call_id)
+    return None
+
+
+def _merged(event: Any, deltas: List[str]) -> Any:
+    if len(deltas) == 1:
+        return event
+    return event.model_copy(update={"delta": "".join(deltas)})
+
+
+async def _coalesce_deltas(
+    events: AsyncIterator[Any], window: float, max_bytes: int
+) -> AsyncGenerator[Any, None]:
+    """Merge consecutive deltas of the same message or tool call.
+
+    A merged event is sent when `window` seconds have passed since its first
+    delta, when it reaches `max_bytes`, or as soon as any other event arrives, so
+    the order of events is unchanged.
+    """
+    loop = asyncio.get_running_loop()
+    pump: EventPump[Any] = EventPump(events)
+    pending: Any = None
+    pending_key: Optional[tuple] = None
+    deltas: List[str] = []
+    size = 0
+    deadline = 0.0
+    try:
+        while True:
+            try:
+                event = await pump.get(
+                    deadline - loop.time() if pending is not None else None
+                )
+            except asyncio.TimeoutError:
+                yield _merged(pending, deltas)
+                pending = None
+                continue
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # send what the graph produced before it failed
+                if pending is not None:
+                    yield _merged(pending, deltas)
+                raise
+
+            key = _delta_key(event)
+            if pending is not None and key == pending_key:
+                deltas.append(event.delta)
+                size += len(event.delta.encode("utf-8"))
+            else:
+                if pending is not None:
+                    yield _merged(pending, deltas)
+                    pending = None
+                if key is None:
+                    yield event
+                    continue
+                pending, pending_key, deltas = event, key, [event.delta]
+                size = len(event.delta.encode("utf-8"))
+                deadline = loop.time() + window
+            if size >= max_bytes:
+                yield _merged(pending, deltas)
+                pending = None
+        if pending is not None:
+            yield _merged(pending, deltas)
+    finally:
+        await pump.aclose()
+
+
+def _json_pointer(path: str, key: Any) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _json_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Build an RFC 6902 JSON Patch that turns `old` into `new`.
+
+    Both values must be plain JSON data. Lists are diffed by index, with appended
+    and truncated tails expressed as add and remove operations.
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(new, dict):
+        ops: List[Dict[str, Any]] = [
+            {"op": "remove", "path": _json_pointer(path, key)}
+            for key in old
+            if key not in new
+        ]
+        for key, value in new.items():
+            if key not in old:
+                ops.append(
+                    {"op": "add", "path": _json_pointer(path, key), "value": value}
+                )
+            elif old[key] != value or type(old[key]) is not type(value):
+                ops.extend(_json_patch(old[key], value, _json_pointer(path, key)))
+        return ops
+
+    if isinstance(new, list):
+        ops = []
+        for index in range(min(len(old), len(new))):
+            if old[index] != new[index] or type(old[index]) is not type(new[index]):
+                ops.extend(
+                    _json_patch(old[index], new[index], _json_pointer(path, index))
+                )
+        for value in new[len(old) :]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": value})
+        for index in reversed(range(len(new), len(old))):
+            ops.append({"op": "remove", "path": _json_pointer(path, index)})
+        return ops
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
@@ -2,11 +2,12 @@
 CopilotKit Protocol
 """
 
-import json
 from enum import Enum
 from typing import Union, Optional
 from typing_extensions import TypedDict, Literal, Any, Dict
 
+from .json_codec import dumps
+
 
 class RuntimeEventTypes(Enum):
     """CopilotKit Runtime Event Types"""
@@ -288,16 +289,8 @@ def meta_event(*, name: RuntimeMetaEventName, value: Any) -> MetaEvent:
 
 def emit_runtime_events(*events: RuntimeProtocolEvent) -> str:
     """Emit a list of runtime events"""
-
-    def serialize_event(event):
-        # Convert enum values to their string representation
-        if isinstance(event, dict):
-            return {
-                k: (v.value if isinstance(v, Enum) else v) for k, v in event.items()
-            }
-        return event
-
-    return "\n".join(json.dumps(serialize_event(event)) for event in events) + "\n"
+    # the codec encodes Enum members as their values
+    return "".join(dumps(event) + "\n" for event in events)
 
 
 def emit_runtime_event(event: RuntimeProtocolEvent) -> str:
@@ -0,0 +1,173 @@
+"""
+Name-indexed registries of actions and agents, and the cache for dynamic resolvers
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from typing_extensions import Protocol, TypedDict
+
+from .json_codec import dumps
+
+
+class _Named(Protocol):  # pylint: disable=too-few-public-methods
+    name: str
+
+    def dict_repr(self) -> Any:
+        """Dict representation of the item"""
+
+
+class SerializedItems(TypedDict):
+    """The dict representations of a registry, encoded once"""
+
+    items: List[Any]
+    json: str
+    digest: str
+
+
+T = TypeVar("T", bound=_Named)
+
+
+class Registry(Generic[T]):
+    """
+    An ordered collection of actions or agents with constant-time lookup by name.
+
+    When several items share a name, lookups return the first one, matching the
+    order in which they were provided.
+    """
+
+    def __init__(self, items: List[T]):
+        self.items = list(items)
+        self._by_name: Dict[str, T] = {}
+        for item in self.items:
+            self._by_name.setdefault(item.name, item)
+        self._serialized: Optional[SerializedItems] = None
+
+    def get(self, name: str) -> Optional[T]:
+        """Get an item by name"""
+        return self._by_name.get(name)
+
+    def same_items(self, items: List[T]) -> bool:
+        """Whether `items` are the very same instances as the registry's, in order"""
+        return len(self.items) == len(items) and all(
+            mine is theirs for mine, theirs in zip(self.items, items)
+        )
+
+    def serialized(self) -> SerializedItems:
+        """
+        The `dict_repr()` of every item, its compact JSON encoding and a digest of it.
+
+        Computed on first use and kept for the lifetime of the registry, so
+        `normalize_parameters` runs once per action rather than once per request.
+        """
+        if self._serialized is None:
+            items = [item.dict_repr() for item in self.items]
+            encoded = dumps(items)
+            self._serialized = {
+                "items": items,
+                "json": encoded,
+                "digest": hashlib.sha256(encoded.encode("utf-8")).hexdigest(),
+            }
+        return self._serialized
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class CacheInfo(TypedDict):
+    """Statistics of a ResolverCache"""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class ResolverCache:
+    """
+    LRU cache, with an optional time to live, for the registries built by dynamic
+    `actions` and `agents` resolvers.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of cached registries. The least recently used one is
+        evicted first.
+    ttl : Optional[float]
+        The number of seconds a registry stays cached. None keeps it until evicted.
+    """
+
+    def __init__(self, *, maxsize: int = 128, ttl: Optional[float] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Registry]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Registry]) -> Registry:
+        """Return the registry cached under `key`, building it with `factory` on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+
+        # Build outside the lock, factories may compile graphs or do I/O.
+        registry = factory()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                # another request built it first, keep a single shared instance
+                return entry[1]
+            self._entries[key] = (time.monotonic(), registry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return registry
+
+    def clear(self):
+        """Remove all cached registries"""
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        """Hit, miss and eviction counters of the cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def _expired(self, entry: Tuple[float, Registry]) -> bool:
+        return self.ttl is not None and time.monotonic() - entry[0] >= self.ttl
@@ -4,24 +4,34 @@ CopilotKit Run Loop
 
 import asyncio
 import contextvars
-import json
 import traceback
-from typing import Callable
+from collections import deque
+from typing import Callable, Deque
 from pydantic import BaseModel
-from typing_extensions import Any, Dict, Optional, List, TypedDict, cast
-from partialjson.json_parser import JSONParser as PartialJSONParser
+from typing_extensions import (
+    Any,
+    Dict,
+    Optional,
+    List,
+    Tuple,
+    TypedDict,
+    NotRequired,
+    cast,
+)
 
 from .protocol import (
     RuntimeEvent,
     RuntimeEventTypes,
     RuntimeMetaEventName,
-    emit_runtime_event,
     emit_runtime_events,
     agent_state_message,
     AgentStateMessage,
     PredictStateConfig,
     RuntimeProtocolEvent,
 )
+from .streaming_json import IncrementalJSONParser
+from .json_codec import dumps
+from .execution import record_cancellation
 
 
 async def yield_control():
@@ -34,6 +44,92 @@ async def yield_control():
     await future
 
 
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_BATCH_SIZE = 256
+
+
+class RunEventQueue:
+    """
+    Bounded first-in, first-out queue between a running task and the stream of
+    `copilotkit_run`.
+
+    - `put` waits while `maxsize` events are pending, so a slow consumer slows the
+      producer down instead of letting memory grow.
+    - A pending AGENT_STATE_MESSAGE is dropped when the next one is put, only the
+      latest state is sent, after the events put before it. Replacing never waits.
+    - Priority events never wait for room, they keep their position relative to
+      the events put before and after them.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize = maxsize
+        self._events: Deque[List[RuntimeEvent]] = deque()
+        self._pending_state: Optional[List[RuntimeEvent]] = None
+        # entries of dropped states, emptied in place and skipped by get_batch
+        self._dropped = 0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def qsize(self) -> int:
+        """The number of pending events"""
+        return len(self._events) - self._dropped
+
+    async def put(self, event: RuntimeEvent, *, priority: bool = False):
+        """Add an event, waiting for room unless it is a priority event"""
+        while (
+            not priority and self.qsize() >= self.maxsize and not self._conflates(event)
+        ):
+            self._writable.clear()
+            await self._writable.wait()
+        self.put_nowait(event)
+
+    def put_nowait(self, event: RuntimeEvent):
+        """Add an event without waiting for room"""
+        if self._conflates(event):
+            stale = cast(List[RuntimeEvent], self._pending_state)
+            if self._events[-1] is stale:
+                stale[0] = event
+                return
+            # events put after the stale state happened before this one
+            stale.clear()
+            self._dropped += 1
+        entry = [event]
+        self._events.append(entry)
+        if event["type"] == RuntimeEventTypes.AGENT_STATE_MESSAGE:
+            self._pending_state = entry
+        self._readable.set()
+
+    async def get_batch(
+        self, max_events: int = DEFAULT_BATCH_SIZE
+    ) -> List[RuntimeEvent]:
+        """Wait for pending events and take up to `max_events` of them"""
+        while not self._events:
+            self._readable.clear()
+            await self._readable.wait()
+
+        batch: List[RuntimeEvent] = []
+        while self._events and len(batch) < max_events:
+            entry = self._events.popleft()
+            if not entry:
+                self._dropped -= 1
+                continue
+            if entry is self._pending_state:
+                self._pending_state = None
+            batch.append(entry[0])
+
+        self._writable.set()
+        return batch
+
+    def _conflates(self, event: RuntimeEvent) -> bool:
+        return (
+            self._pending_state is not None
+            and event["type"] == RuntimeEventTypes.AGENT_STATE_MESSAGE
+        )
+
+
 class CopilotKitRunExecution(TypedDict):
     """
     CopilotKit Run Execution
@@ -47,7 +143,7 @@ class CopilotKitRunExecution(TypedDict):
     is_finished: bool
     predict_state_configuration: Dict[str, PredictStateConfig]
     predicted_state: Dict[str, Any]
-    argument_buffer: str
+    argument_parser: NotRequired[Optional[IncrementalJSONParser]]
     current_tool_call: Optional[str]
     state: Dict[str, Any]
 
@@ -56,7 +152,7 @@ _CONTEXT_QUEUE = contextvars.ContextVar("queue", default=None)
 _CONTEXT_EXECUTION = contextvars.ContextVar("execution", default=None)
 
 
-def get_context_queue() -> asyncio.Queue:
+def get_context_queue() -> RunEventQueue:
     """
     Retrieve the queue from this task's context.
     """
@@ -66,7 +162,7 @@ def get_context_queue() -> asyncio.Queue:
     return q
 
 
-def set_context_queue(q: asyncio.Queue) -> contextvars.Token:
+def set_context_queue(q: RunEventQueue) -> contextvars.Token:
     """
     Set the queue in this task's context.
     """
@@ -106,17 +202,24 @@ def reset_context_execution(token: contextvars.Token):
 async def queue_put(*events: RuntimeEvent, priority: bool = False):
     """
     Put an event in the queue.
-    """
-    if not priority:
-        # yield control so that priority events can be processed first
-        await yield_control()
 
+    Waits only while the queue is full. Priority events never wait.
+    """
     q = get_context_queue()
     for event in events:
-        await q.put(event)
+        await q.put(event, priority=priority)
 
-    # yield control so that the reader can process the event
-    await yield_control()
+
+def queue_put_nowait(*events: RuntimeEvent):
+    """
+    Put an event in the queue right away, even if the queue is full.
+
+    Lifecycle events use this from synchronous callbacks, so they are queued exactly
+    where they happened relative to the events of the running task.
+    """
+    q = get_context_queue()
+    for event in events:
+        q.put_nowait(event)
 
 
 def _to_dict_if_pydantic(obj):
@@ -134,44 +237,94 @@ def _filter_state(
     return {k: v for k, v in state.items() if k not in exclude_keys}
 
 
-async def copilotkit_run(fn: Callable, *, execution: CopilotKitRunExecution):
+async def copilotkit_run(
+    fn: Callable,
+    *,
+    execution: CopilotKitRunExecution,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
     """
     Run a task with a local queue.
+
+    Pending events are drained in batches of up to `batch_size` and sent as one
+    chunk. At most `queue_size` events wait in the queue before the task is paused.
     """
-    local_queue = asyncio.Queue()
+    local_queue = RunEventQueue(maxsize=queue_size)
     token_queue = set_context_queue(local_queue)
     token_execution = set_context_execution(execution)
 
     task = asyncio.create_task(fn())
     try:
-        while True:
-            event = await local_queue.get()
-            local_queue.task_done()
-
-            json_lines = handle_runtime_event(event=event, execution=execution)
+        while not execution["is_finished"]:
+            batch = await local_queue.get_batch(batch_size)
+            json_lines = _handle_runtime_events(events=batch, execution=execution)
 
             if json_lines is not None:
                 yield json_lines
 
-            if execution["is_finished"]:
-                break
-
-            # return control to the containing run loop to send events
-            await yield_control()
-
         await task
 
     finally:
+        if not task.done():
+            # the consumer went away, e.g. the client disconnected
+            task.cancel()
+            record_cancellation("cancelled_runs")
         reset_context_queue(token_queue)
         reset_context_execution(token_execution)
 
 
+def _handle_runtime_events(
+    *, events: List[RuntimeEvent], execution: CopilotKitRunExecution
+) -> Optional[str]:
+    """
+    Handle a batch of runtime events, stopping after the run has finished.
+
+    The predicted state is sent once per run of consecutive tool call arguments,
+    with the latest prediction.
+    """
+    protocol_events: List[RuntimeProtocolEvent] = []
+    predicted = False
+    for event in events:
+        if predicted and event["type"] != RuntimeEventTypes.ACTION_EXECUTION_ARGS:
+            protocol_events.append(_predicted_state_message(execution))
+            predicted = False
+
+        handled, updated = _runtime_protocol_events(event=event, execution=execution)
+        protocol_events.extend(handled)
+        predicted = predicted or updated
+
+        if execution["is_finished"]:
+            break
+
+    if predicted:
+        protocol_events.append(_predicted_state_message(execution))
+    if not protocol_events:
+        return None
+    return emit_runtime_events(*protocol_events)
+
+
 def handle_runtime_event(
     *, event: RuntimeEvent, execution: CopilotKitRunExecution
 ) -> Optional[str]:
     """
     Handle a runtime event.
     """
+    events, predicted = _runtime_protocol_events(event=event, execution=execution)
+    if predicted:
+        events.append(_predicted_state_message(execution))
+    if not events:
+        return None
+    return emit_runtime_events(*events)
+
+
+def _runtime_protocol_events(
+    *, event: RuntimeEvent, execution: CopilotKitRunExecution
+) -> Tuple[List[RuntimeProtocolEvent], bool]:
+    """
+    Update the execution for a runtime event and return the protocol events to send,
+    and whether the predicted state was updated.
+    """
 
     if event["type"] in [
         RuntimeEventTypes.TEXT_MESSAGE_START,
@@ -183,40 +336,30 @@ def handle_runtime_event(
         RuntimeEventTypes.ACTION_EXECUTION_RESULT,
         RuntimeEventTypes.AGENT_STATE_MESSAGE,
     ]:
-        events: List[RuntimeProtocolEvent] = [cast(RuntimeProtocolEvent, event)]
-        if event["type"] in [
+        predicted = event["type"] in [
             RuntimeEventTypes.ACTION_EXECUTION_START,
             RuntimeEventTypes.ACTION_EXECUTION_ARGS,
-        ]:
-            message = predict_state(
-                thread_id=execution["thread_id"],
-                agent_name=execution["agent_name"],
-                run_id=execution["run_id"],
-                event=event,
-                execution=execution,
-            )
-            if message is not None:
-                events.append(message)
-        return emit_runtime_events(*events)
+        ] and _update_predicted_state(event=event, execution=execution)
+        return [cast(RuntimeProtocolEvent, event)], predicted
 
     if event["type"] == RuntimeEventTypes.META_EVENT:
         if event["name"] == RuntimeMetaEventName.PREDICT_STATE:
             execution["predict_state_configuration"] = event["value"]
-            return None
+            return [], False
         if event["name"] == RuntimeMetaEventName.EXIT:
             execution["should_exit"] = event["value"]
-            return None
-        return None
+            return [], False
+        return [], False
 
     if event["type"] == RuntimeEventTypes.RUN_STARTED:
         execution["state"] = event["state"]
-        return None
+        return [], False
 
     if event["type"] == RuntimeEventTypes.NODE_STARTED:
         execution["node_name"] = event["node_name"]
         execution["state"] = event["state"]
 
-        return emit_runtime_event(
+        return [
             agent_state_message(
                 thread_id=execution["thread_id"],
                 agent_name=execution["agent_name"],
@@ -224,20 +367,20 @@ def handle_runtime_event(
                 run_id=execution["run_id"],
                 active=True,
                 role="assistant",
-                state=json.dumps(_filter_state(state=execution["state"])),
+                state=dumps(_filter_state(state=execution["state"])),
                 running=True,
             )
-        )
+        ], False
 
     if event["type"] == RuntimeEventTypes.NODE_FINISHED:
         # reset the predict state configuration at the end of the method execution
         execution["predict_state_configuration"] = {}
         execution["current_tool_call"] = None
-        execution["argument_buffer"] = ""
+        execution["argument_parser"] = None
         execution["predicted_state"] = {}
         execution["state"] = event["state"]
 
-        return emit_runtime_event(
+        return [
             agent_state_message(
                 thread_id=execution["thread_id"],
                 agent_name=execution["agent_name"],
@@ -245,14 +388,14 @@ def handle_runtime_event(
                 run_id=execution["run_id"],
                 active=False,
                 role="assistant",
-                state=json.dumps(_filter_state(state=execution["state"])),
+                state=dumps(_filter_state(state=execution["state"])),
                 running=True,
             )
-        )
+        ], False
 
     if event["type"] == RuntimeEventTypes.RUN_FINISHED:
         execution["is_finished"] = True
-        return None
+        return [], False
 
     if event["type"] == RuntimeEventTypes.RUN_ERROR:
         print("Flow execution error", flush=True)
@@ -274,7 +417,9 @@ def handle_runtime_event(
             print(error_info, flush=True)
 
         execution["is_finished"] = True
-        return None
+        return [], False
+
+    return [], False
 
 
 def predict_state(
@@ -286,61 +431,88 @@ def predict_state(
     execution: CopilotKitRunExecution,
 ) -> Optional[AgentStateMessage]:
     """Predict the state"""
+    if not _update_predicted_state(event=event, execution=execution):
+        return None
+    return _predicted_state_message(
+        execution, thread_id=thread_id, agent_name=agent_name, run_id=run_id
+    )
+
+
+def _update_predicted_state(*, event: Any, execution: CopilotKitRunExecution) -> bool:
+    """Update the predicted state from a tool call event, returns whether it changed"""
 
     if event["type"] == RuntimeEventTypes.ACTION_EXECUTION_START:
         execution["current_tool_call"] = event["actionName"]
-        execution["argument_buffer"] = ""
+        execution["argument_parser"] = None
     elif event["type"] == RuntimeEventTypes.ACTION_EXECUTION_ARGS:
-        execution["argument_buffer"] += event["args"]
-
-        tool_names = [
-            config.get("tool_name")
+        configs = [
+            config
             for config in execution["predict_state_configuration"].values()
+            if config.get("tool_name") == execution["current_tool_call"]
         ]
 
-        if execution["current_tool_call"] not in tool_names:
-            return None
+        if not configs:
+            return False
+
+        # the parser keeps its state for the whole tool call, so every chunk
+        # is only tokenized once instead of re-parsing the full buffer
+        parser = execution.get("argument_parser")
+        if parser is None:
+            tool_arguments = [config.get("tool_argument") for config in configs]
+            parser = IncrementalJSONParser(
+                keys=None if None in tool_arguments else tool_arguments
+            )
+            execution["argument_parser"] = parser
 
-        current_arguments = {}
         try:
-            current_arguments = PartialJSONParser().parse(execution["argument_buffer"])
-        except:  # pylint: disable=bare-except
-            return None
+            parser.feed(event["args"])
+        except ValueError:
+            return False
 
         emit_update = False
         for k, v in execution["predict_state_configuration"].items():
             if v["tool_name"] == execution["current_tool_call"]:
                 tool_argument = v.get("tool_argument")
                 if tool_argument is not None:
-                    argument_value = current_arguments.get(tool_argument)
+                    argument_value = parser.get(tool_argument)
                     if argument_value is not None:
                         execution["predicted_state"][k] = argument_value
                         emit_update = True
                 else:
-                    execution["predicted_state"][k] = current_arguments
+                    execution["predicted_state"][k] = parser.value
                     emit_update = True
 
-        if emit_update:
-            return agent_state_message(
-                thread_id=thread_id,
-                agent_name=agent_name,
-                node_name=execution["node_name"],
-                run_id=run_id,
-                active=True,
-                role="assistant",
-                state=json.dumps(
-                    _filter_state(
-                        state={
-                            **(
-                                execution["state"].model_dump()
-                                if isinstance(execution["state"], BaseModel)
-                                else execution["state"]
-                            ),
-                            **execution["predicted_state"],
-                        }
-                    )
-                ),
-                running=True,
-            )
+        return emit_update
 
-        return None
+    return False
+
+
+def _predicted_state_message(
+    execution: CopilotKitRunExecution,
+    *,
+    thread_id: Optional[str] = None,
+    agent_name: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> AgentStateMessage:
+    """The agent state message for the current predicted state"""
+    return agent_state_message(
+        thread_id=thread_id or execution["thread_id"],
+        agent_name=agent_name or execution["agent_name"],
+        node_name=execution["node_name"],
+        run_id=run_id or execution["run_id"],
+        active=True,
+        role="assistant",
+        state=dumps(
+            _filter_state(
+                state={
+                    **(
+                        execution["state"].model_dump()
+                        if isinstance(execution["state"], BaseModel)
+                        else execution["state"]
+                    ),
+                    **execution["predicted_state"],
+                }
+            )
+        ),
+        running=True,
+    )
@@ -1,13 +1,17 @@
 """CopilotKit SDK"""
 
+import hashlib
+import logging
 import warnings
 from importlib import metadata
 
 from pprint import pformat
-from typing import List, Callable, Union, Optional, Any, Coroutine
+from typing import List, Callable, Union, Optional, Any, Coroutine, Hashable
 from typing_extensions import TypedDict, Tuple, cast, Mapping
 from .agent import Agent, AgentDict
 from .action import Action, ActionDict, ActionResultDict
+from .registry import Registry, ResolverCache, CacheInfo
+from .json_codec import dumps
 from .types import Message, MetaEvent
 from .exc import (
     ActionNotFoundException,
@@ -59,6 +63,25 @@ class CopilotKitContext(TypedDict):
     headers: Mapping[str, str]
 
 
+class SerializedInfo(TypedDict):
+    """
+    Info dictionary with its JSON encoding
+
+    Parameters
+    ----------
+    info : InfoDict
+        The information about available actions and agents
+    json : str
+        The compact JSON encoding of `info`
+    etag : str
+        A strong ETag for `json`, including the surrounding quotes
+    """
+
+    info: InfoDict
+    json: str
+    etag: str
+
+
 # Alias for backwards compatibility
 CopilotKitSDKContext = CopilotKitContext
 
@@ -182,6 +205,24 @@ class CopilotKitRemoteEndpoint:
     )
     ```
 
+    ## Caching dynamic actions and agents
+
+    Callables are invoked on every request. If building the agents is expensive, for
+    example because it compiles a graph, pass `cache_key` to reuse the result for all
+    requests that map to the same key. Returning `None` from `cache_key` skips the cache
+    for that request.
+
+    ```python
+    from copilotkit import CopilotKitRemoteEndpoint
+
+    sdk = CopilotKitRemoteEndpoint(
+        agents=lambda context: build_agents_for_tenant(context["properties"]["tenant"]),
+        cache_key=lambda context: context["properties"].get("tenant"),
+        cache_size=256,
+        cache_ttl=600,
+    )
+    ```
+
     ## Serving the CopilotKit SDK
 
     To serve the CopilotKit SDK, you can use the `add_fastapi_endpoint` function from the `copilotkit.integrations.fastapi` module:
@@ -210,6 +251,14 @@ class CopilotKitRemoteEndpoint:
         The actions to make available to the Copilot.
     agents : Optional[Union[List[Agent], Callable[[CopilotKitContext], List[Agent]]]]
         The agents to make available to the Copilot.
+    cache_key : Optional[Callable[[CopilotKitContext], Optional[Hashable]]]
+        Derives a cache key from the request context. When provided, the results of
+        callable `actions` and `agents` are cached per key.
+    cache_size : int
+        The maximum number of cached results. The least recently used is evicted first.
+    cache_ttl : Optional[float]
+        The number of seconds a cached result is reused. By default it is kept until
+        evicted.
     """
 
     def __init__(
@@ -221,34 +270,108 @@ class CopilotKitRemoteEndpoint:
         agents: Optional[
             Union[List[Agent], Callable[[CopilotKitContext], List[Agent]]]
         ] = None,
+        cache_key: Optional[Callable[[CopilotKitContext], Optional[Hashable]]] = None,
+        cache_size: int = 128,
+        cache_ttl: Optional[float] = None,
     ):
         self.agents = agents or []
         self.actions = actions or []
+        self.cache_key = cache_key
+        self._resolver_cache = (
+            ResolverCache(maxsize=cache_size, ttl=cache_ttl)
+            if cache_key is not None
+            else None
+        )
+        self._static_registries: dict = {}
+        self._last_resolved: dict = {}
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        """
+        Returns hit, miss and eviction counters of the dynamic resolver cache, or None
+        if no `cache_key` was configured.
+        """
+        if self._resolver_cache is None:
+            return None
+        return self._resolver_cache.info()
+
+    def _resolve(self, kind: str, source: Any, context: CopilotKitContext) -> Registry:
+        """
+        Resolve the actions or agents for a request into a name-indexed registry
+        """
+        if not callable(source):
+            registry = self._static_registries.get(kind)
+            if registry is None or not registry.same_items(source):
+                registry = Registry(source)
+                self._static_registries[kind] = registry
+            return registry
+
+        key = (
+            self.cache_key(context)
+            if self.cache_key is not None and self._resolver_cache is not None
+            else None
+        )
+        if key is None:
+            items = source(context)
+            registry = self._last_resolved.get(kind)
+            # keep the previous registry, and its serialized form, while the
+            # resolver keeps returning the same instances
+            if registry is None or not registry.same_items(items):
+                registry = Registry(items)
+                self._last_resolved[kind] = registry
+            return registry
+        return cast(ResolverCache, self._resolver_cache).get_or_create(
+            (kind, key), lambda: Registry(source(context))
+        )
+
+    def _resolve_actions(self, context: CopilotKitContext) -> Registry[Action]:
+        return self._resolve("actions", self.actions, context)
+
+    def _resolve_agents(self, context: CopilotKitContext) -> Registry[Agent]:
+        return self._resolve("agents", self.agents, context)
 
     def info(self, *, context: CopilotKitContext) -> InfoDict:
         """
         Returns information about available actions and agents
         """
+        return self.serialized_info(context=context)["info"]
 
-        actions = self.actions(context) if callable(self.actions) else self.actions
-        agents = self.agents(context) if callable(self.agents) else self.agents
+    def serialized_info(self, *, context: CopilotKitContext) -> SerializedInfo:
+        """
+        Returns information about available actions and agents, together with its
+        JSON encoding and a strong ETag.
+
+        The representations are computed once per resolved set of actions and agents
+        and reused until a resolver returns a different set. The returned info must
+        not be modified.
+        """
 
-        actions_list = [action.dict_repr() for action in actions]
-        agents_list = [agent.dict_repr() for agent in agents]
+        actions = self._resolve_actions(context).serialized()
+        agents = self._resolve_agents(context).serialized()
 
         self._log_request_info(
             title="Handling info request:",
             data=[
                 ("Context", context),
-                ("Actions", actions_list),
-                ("Agents", agents_list),
+                ("Actions", actions["items"]),
+                ("Agents", agents["items"]),
             ],
         )
 
+        version = dumps(COPILOTKIT_SDK_VERSION)
+        etag = hashlib.sha256(
+            f"{actions['digest']}:{agents['digest']}:{version}".encode("utf-8")
+        ).hexdigest()
         return {
-            "actions": actions_list,
-            "agents": agents_list,
-            "sdkVersion": COPILOTKIT_SDK_VERSION,
+            "info": {
+                "actions": actions["items"],
+                "agents": agents["items"],
+                "sdkVersion": COPILOTKIT_SDK_VERSION,
+            },
+            "json": (
+                f'{{"actions":{actions["json"]},"agents":{agents["json"]},'
+                f'"sdkVersion":{version}}}'
+            ),
+            "etag": f'"{etag[:32]}"',
         }
 
     def _get_action(
@@ -260,8 +383,7 @@ class CopilotKitRemoteEndpoint:
         """
         Get an action by name
         """
-        actions = self.actions(context) if callable(self.actions) else self.actions
-        action = next((action for action in actions if action.name == name), None)
+        action = self._resolve_actions(context).get(name)
         if action is None:
             raise ActionNotFoundException(name)
         return action
@@ -310,8 +432,7 @@ class CopilotKitRemoteEndpoint:
         """
         Execute an agent
         """
-        agents = self.agents(context) if callable(self.agents) else self.agents
-        agent = next((agent for agent in agents if agent.name == name), None)
+        agent = self._resolve_agents(context).get(name)
         if agent is None:
             raise AgentNotFoundException(name)
 
@@ -353,8 +474,7 @@ class CopilotKitRemoteEndpoint:
         """
         Get agent state
         """
-        agents = self.agents(context) if callable(self.agents) else self.agents
-        agent = next((agent for agent in agents if agent.name == name), None)
+        agent = self._resolve_agents(context).get(name)
         if agent is None:
             raise AgentNotFoundException(name)
 
@@ -375,6 +495,8 @@ class CopilotKitRemoteEndpoint:
         """
         Log request info
         """
+        if not logger.isEnabledFor(logging.INFO):
+            return
         logger.info(bold(title))
         logger.info("--------------------------")
         for key, value in data:
@@ -0,0 +1,235 @@
+"""
+Output stage for the NDJSON event stream of agent runs.
+
+Token events are written one per chunk by the run loop, which means one ASGI
+send and usually one TCP segment per token. `StreamOutput` coalesces chunks
+for a short window or up to a size budget, flushes immediately on lifecycle
+events, and optionally compresses the stream with gzip or brotli, using a sync
+flush per batch so that the client can decode every batch as it arrives.
+
+```python
+from copilotkit import StreamOutput
+from copilotkit.integrations.fastapi import add_fastapi_endpoint
+
+add_fastapi_endpoint(app, sdk, "/copilotkit", stream_output=StreamOutput())
+```
+
+Brotli requires the `brotli` package, gzip is always available.
+"""
+
+import asyncio
+import re
+import zlib
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from .exc import CopilotKitMisuseError
+from .execution import EventPump
+
+# Events that are streamed in many small pieces; every other event is a
+# lifecycle event and flushes the batch.
+_DELTA_EVENT = re.compile(
+    rb'\{\s*"type"\s*:\s*"(?:TextMessageContent|ActionExecutionArgs)"'
+)
+
+Chunk = Union[str, bytes]
+
+
+def _is_delta_chunk(chunk: bytes) -> bool:
+    """True if every line of the chunk is a token or argument delta"""
+    return all(
+        _DELTA_EVENT.match(line) is not None for line in chunk.split(b"\n") if line
+    )
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, data: bytes) -> bytes:
+        """Compress and sync-flush one batch"""
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        """End the stream"""
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int):
+        import brotli  # pylint: disable=import-outside-toplevel,import-error
+
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def encode(self, data: bytes) -> bytes:
+        """Compress and flush one batch"""
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """End the stream"""
+        return self._compressor.finish()
+
+
+Encoder = Union[_GzipEncoder, _BrotliEncoder]
+
+
+def _brotli_available() -> bool:
+    try:
+        import brotli  # pylint: disable=import-outside-toplevel,import-error,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class StreamOutput:
+    """
+    Coalesces and compresses the event stream of agent runs.
+
+    Parameters
+    ----------
+    coalesce_window : float
+        Seconds a batch may wait for more events before it is sent. 0 disables
+        coalescing.
+    max_batch_bytes : int
+        A batch is sent as soon as it reaches this size.
+    compression : bool
+        Compress the stream with brotli or gzip when the client accepts it.
+    compression_level : int
+        gzip level or brotli quality, from 1 to 9.
+    """
+
+    def __init__(
+        self,
+        *,
+        coalesce_window: float = 0.01,
+        max_batch_bytes: int = 16 * 1024,
+        compression: bool = True,
+        compression_level: int = 5,
+    ):
+        if coalesce_window < 0:
+            raise CopilotKitMisuseError("coalesce_window must not be negative")
+        if max_batch_bytes < 1:
+            raise CopilotKitMisuseError("max_batch_bytes must be at least 1")
+        if not 1 <= compression_level <= 9 and compression:
+            raise CopilotKitMisuseError("compression_level must be between 1 and 9")
+        self.coalesce_window = coalesce_window
+        self.max_batch_bytes = max_batch_bytes
+        self.compression = compression
+        self.compression_level = compression_level
+        self._brotli = _brotli_available()
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Returns the content encoding to use for the given Accept-Encoding header"""
+        if not self.compression:
+            return None
+        encodings = _accepted_encodings(accept_encoding)
+        wildcard = encodings.get("*", 0.0)
+        candidates = (["br"] if self._brotli else []) + ["gzip"]
+        best, best_quality = None, 0.0
+        for name in candidates:
+            quality = encodings.get(name, wildcard)
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    def wrap(
+        self, events: AsyncIterator[Chunk], accept_encoding: Optional[str] = None
+    ) -> Tuple[AsyncIterator[bytes], Dict[str, str]]:
+        """
+        Wrap an event stream.
+
+        Returns the new stream and the headers to add to the response.
+        """
+        encoding = self.negotiate(accept_encoding)
+        headers: Dict[str, str] = {}
+        encoder: Optional[Encoder] = None
+        if encoding == "br":
+            encoder = _BrotliEncoder(self.compression_level)
+        elif encoding == "gzip":
+            encoder = _GzipEncoder(self.compression_level)
+        if encoder is not None:
+            headers["Content-Encoding"] = encoder.name
+        if self.compression:
+            headers["Vary"] = "Accept-Encoding"
+        return self._stream(events, encoder), headers
+
+    async def _stream(
+        self, events: AsyncIterator[Chunk], encoder: Optional[Encoder]
+    ) -> AsyncIterator[bytes]:
+        if self.coalesce_window == 0:
+            batches = _encoded(events)
+        else:
+            batches = self._coalesce(events)
+        try:
+            async for batch in batches:
+                yield batch if encoder is None else encoder.encode(batch)
+            if encoder is not None:
+                yield encoder.finish()
+        finally:
+            await batches.aclose()
+
+    async def _coalesce(
+        self, events: AsyncIterator[Chunk]
+    ) -> AsyncGenerator[bytes, None]:
+        loop = asyncio.get_running_loop()
+        pump: EventPump[Chunk] = EventPump(events)
+        buffer: List[bytes] = []
+        size = 0
+        deadline = 0.0
+        try:
+            while True:
+                try:
+                    chunk = await pump.get(deadline - loop.time() if buffer else None)
+                except asyncio.TimeoutError:
+                    # the window closed before the next event arrived
+                    yield b"".join(buffer)
+                    buffer, size = [], 0
+                    continue
+                except StopAsyncIteration:
+                    break
+
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                if not buffer:
+                    deadline = loop.time() + self.coalesce_window
+                buffer.append(data)
+                size += len(data)
+                if size >= self.max_batch_bytes or not _is_delta_chunk(data):
+                    yield b"".join(buffer)
+                    buffer, size = [], 0
+            if buffer:
+                yield b"".join(buffer)
+        finally:
+            await pump.aclose()
+
+
+async def _encoded(events: AsyncIterator[Chunk]) -> AsyncGenerator[bytes, None]:
+    try:
+        async for chunk in events:
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+    finally:
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
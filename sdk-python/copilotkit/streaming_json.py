@@ -0,0 +1,386 @@
+"""
+Incremental JSON parsing for streamed tool call arguments
+"""
+
+import json
+import re
+from typing import Any, Iterable, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_RUN = re.compile(r'[^"\\]*')
+_NUMBER_RUN = re.compile(r"[0-9eE+\-.]*")
+_LITERAL_RUN = re.compile(r"[a-z]*")
+
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# Tokenizer states
+_VALUE = 0
+_OBJECT_KEY_OR_END = 1
+_OBJECT_KEY = 2
+_OBJECT_COLON = 3
+_AFTER_VALUE = 4
+_STRING = 5
+_NUMBER = 6
+_LITERAL = 7
+_DONE = 8
+
+_MISSING = object()
+
+
+class _Frame:  # pylint: disable=too-few-public-methods
+    """An open object or array on the parser stack"""
+
+    __slots__ = ("container", "is_object", "key", "materialize", "empty")
+
+    def __init__(self, container: Any, is_object: bool, materialize: bool):
+        self.container = container
+        self.is_object = is_object
+        self.key: Optional[str] = None
+        self.materialize = materialize
+        self.empty = True
+
+
+class IncrementalJSONParser:
+    """
+    Resumable parser for a JSON document that arrives in chunks.
+
+    Unlike re-parsing the whole buffer on every chunk, each call to `feed` only
+    tokenizes the newly received characters. The partially built value is kept
+    between calls and can be read at any time through `value` or `get`:
+    objects and arrays contain every member received so far, a string that is
+    still streaming holds its current prefix, and incomplete keys, literals and
+    escapes are left out until they are complete.
+
+    The string that is streaming is only joined when `value` or `get` is read,
+    so feeding costs the same whether or not the string has grown long.
+    Containers returned by `value` and `get` are updated in place by later
+    calls to `feed`. Serialize or copy them if a stable snapshot is needed.
+
+    Parameters
+    ----------
+    keys : Optional[Iterable[str]]
+        When given, only these top level object members are materialized.
+        All other members are still tokenized, but no Python objects are
+        built for them.
+    """
+
+    def __init__(self, keys: Optional[Iterable[str]] = None):
+        self._keys = frozenset(keys) if keys is not None else None
+        self._stack: List[_Frame] = []
+        self._root: Any = _MISSING
+        self._state = _VALUE
+        self._carry = ""
+        self._token = ""
+        self._token_attached = False
+        # the published prefix of the string that is streaming, and the parts
+        # received since it was published
+        self._string_prefix = ""
+        self._string_parts: List[str] = []
+        # whether the scalar that is streaming changed since it was published
+        self._partial_changed = False
+        self._string_is_key = False
+        self._materialize_value = True
+        self._error: Optional[ValueError] = None
+
+    @property
+    def complete(self) -> bool:
+        """Whether a complete JSON value has been parsed"""
+        return self._state == _DONE
+
+    @property
+    def value(self) -> Any:
+        """The value parsed so far, or an empty dict if nothing was parsed yet"""
+        self._publish_partial()
+        return {} if self._root is _MISSING else self._root
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a top level member of the object parsed so far"""
+        self._publish_partial()
+        if isinstance(self._root, dict):
+            return self._root.get(key, default)
+        return default
+
+    def feed(self, chunk: str) -> None:
+        """
+        Parse the next chunk of the document. Read the result through `value`
+        or `get`.
+
+        Raises a `ValueError` if the document is not valid JSON. Once that
+        happens the parser stays failed and every later call raises again.
+        """
+        if self._error is not None:
+            raise self._error
+        data = self._carry + chunk if self._carry else chunk
+        self._carry = ""
+        try:
+            self._parse(data)
+        except ValueError as error:
+            self._error = error
+            raise
+        self._partial_changed = True
+
+    def _fail(self, data: str, pos: int) -> ValueError:
+        return ValueError(f"Invalid JSON: unexpected {data[pos : pos + 1]!r}")
+
+    def _parse(self, data: str):  # pylint: disable=too-many-branches,too-many-statements
+        pos = 0
+        end = len(data)
+        while pos < end:
+            state = self._state
+
+            if state == _STRING:
+                pos = self._parse_string(data, pos)
+                continue
+
+            if state == _NUMBER:
+                run = _NUMBER_RUN.match(data, pos).end()
+                self._token += data[pos:run]
+                pos = run
+                if pos < end:
+                    self._finish_number()
+                continue
+
+            if state == _LITERAL:
+                run = _LITERAL_RUN.match(data, pos).end()
+                self._token += data[pos:run]
+                pos = run
+                if self._token in _LITERALS or pos < end:
+                    self._finish_literal()
+                continue
+
+            pos = _WHITESPACE.match(data, pos).end()
+            if pos >= end:
+                break
+            char = data[pos]
+
+            if state == _VALUE:
+                pos = self._start_value(data, pos)
+            elif state == _OBJECT_KEY_OR_END and char == "}":
+                self._close(is_object=True)
+                pos += 1
+            elif state in (_OBJECT_KEY_OR_END, _OBJECT_KEY) and char == '"':
+                self._string_is_key = True
+                self._string_prefix = ""
+                self._string_parts = []
+                self._state = _STRING
+                pos += 1
+            elif state == _OBJECT_COLON and char == ":":
+                frame = self._stack[-1]
+                self._materialize_value = frame.materialize and (
+                    self._keys is None
+                    or len(self._stack) > 1
+                    or frame.key in self._keys
+                )
+                self._state = _VALUE
+                pos += 1
+            elif state == _AFTER_VALUE and char == ",":
+                self._state = _OBJECT_KEY if self._stack[-1].is_object else _VALUE
+                if not self._stack[-1].is_object:
+                    self._materialize_value = self._stack[-1].materialize
+                pos += 1
+            elif state == _AFTER_VALUE and char in "}]":
+                self._close(is_object=char == "}")
+                pos += 1
+            else:
+                raise self._fail(data, pos)
+
+    def _start_value(self, data: str, pos: int) -> int:
+        char = data[pos]
+        materialize = self._materialize_value
+        parent = self._stack[-1] if self._stack else None
+        if char == "]" and parent is not None and not parent.is_object:
+            # closing bracket directly after "[" closes an empty array
+            if not parent.empty:
+                raise self._fail(data, pos)
+            self._close(is_object=False)
+            return pos + 1
+        if parent is not None:
+            parent.empty = False
+        if char == "{":
+            container = {} if materialize else None
+            self._attach(container, materialize)
+            self._stack.append(_Frame(container, True, materialize))
+            self._state = _OBJECT_KEY_OR_END
+            return pos + 1
+        if char == "[":
+            container = [] if materialize else None
+            self._attach(container, materialize)
+            self._stack.append(_Frame(container, False, materialize))
+            self._state = _VALUE
+            return pos + 1
+        if char == '"':
+            self._string_is_key = False
+            self._string_prefix = ""
+            self._string_parts = []
+            self._attach("", materialize)
+            self._state = _STRING
+            return pos + 1
+        if char == "-" or char.isdigit():
+            self._token = ""
+            self._token_attached = False
+            self._state = _NUMBER
+            return pos
+        if char in "tfn":
+            self._token = ""
+            self._state = _LITERAL
+            return pos
+        raise self._fail(data, pos)
+
+    def _parse_string(self, data: str, pos: int) -> int:
+        end = len(data)
+        run = _STRING_RUN.match(data, pos).end()
+        collect = self._string_is_key or self._materialize_value
+        if collect and run > pos:
+            self._string_parts.append(data[pos:run])
+        pos = run
+        if pos >= end:
+            return pos
+
+        if data[pos] == '"':
+            self._finish_string()
+            return pos + 1
+
+        # backslash escape
+        if pos + 1 >= end:
+            self._carry = data[pos:]
+            return end
+        escape = data[pos + 1]
+        if escape in _ESCAPES:
+            if collect:
+                self._string_parts.append(_ESCAPES[escape])
+            return pos + 2
+        if escape != "u":
+            raise self._fail(data, pos + 1)
+        if pos + 6 > end:
+            self._carry = data[pos:]
+            return end
+        code = _hex(data, pos + 2)
+        consumed = 6
+        if 0xD800 <= code <= 0xDBFF:
+            if pos + 12 > end and data.startswith("\\u"[: end - pos - 6], pos + 6):
+                self._carry = data[pos:]
+                return end
+            if data.startswith("\\u", pos + 6):
+                low = _hex(data, pos + 8)
+                if 0xDC00 <= low <= 0xDFFF:
+                    code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                    consumed = 12
+        if collect:
+            self._string_parts.append(chr(code))
+        return pos + consumed
+
+    def _finish_string(self):
+        text = self._string_prefix + "".join(self._string_parts)
+        self._string_prefix = ""
+        self._string_parts = []
+        if self._string_is_key:
+            self._stack[-1].key = text
+            self._state = _OBJECT_COLON
+            return
+        if self._materialize_value:
+            self._replace(text)
+        self._state = self._after_value_state()
+
+    def _finish_number(self):
+        number = _parse_number(self._token)
+        if number is None:
+            raise ValueError(f"Invalid JSON number: {self._token!r}")
+        if self._token_attached:
+            self._replace(number)
+        elif self._materialize_value:
+            self._attach(number, True)
+        self._token = ""
+        self._token_attached = False
+        self._state = self._after_value_state()
+
+    def _finish_literal(self):
+        if self._token not in _LITERALS:
+            raise ValueError(f"Invalid JSON literal: {self._token!r}")
+        if self._materialize_value:
+            self._attach(_LITERALS[self._token], True)
+        self._token = ""
+        self._state = self._after_value_state()
+
+    def _after_value_state(self) -> int:
+        return _AFTER_VALUE if self._stack else _DONE
+
+    def _close(self, *, is_object: bool):
+        if not self._stack or self._stack[-1].is_object != is_object:
+            raise ValueError("Invalid JSON: mismatched closing bracket")
+        self._stack.pop()
+        self._state = self._after_value_state()
+        if self._stack:
+            self._materialize_value = self._stack[-1].materialize
+
+    def _attach(self, value: Any, materialize: bool):
+        """Attach a new value to its parent container"""
+        if not self._stack:
+            self._root = value
+            return
+        if not materialize:
+            return
+        frame = self._stack[-1]
+        if frame.is_object:
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+
+    def _replace(self, value: Any):
+        """Replace the value attached by the last call to `_attach`"""
+        if not self._stack:
+            self._root = value
+            return
+        frame = self._stack[-1]
+        if frame.is_object:
+            frame.container[frame.key] = value
+        else:
+            frame.container[-1] = value
+
+    def _publish_partial(self):
+        """Expose the scalar that is still streaming in its parent container"""
+        if not self._partial_changed:
+            return
+        self._partial_changed = False
+        if not self._materialize_value:
+            return
+        if self._state == _STRING and not self._string_is_key:
+            if not self._string_parts:
+                return
+            self._string_prefix += "".join(self._string_parts)
+            self._string_parts = []
+            self._replace(self._string_prefix)
+        elif self._state == _NUMBER:
+            number = _parse_number(self._token.rstrip("eE+-."))
+            if number is None:
+                return
+            if self._token_attached:
+                self._replace(number)
+            else:
+                self._attach(number, True)
+                self._token_attached = True
+
+
+def _hex(data: str, pos: int) -> int:
+    try:
+        return int(data[pos : pos + 4], 16)
+    except ValueError as error:
+        raise ValueError(f"Invalid JSON escape: {data[pos - 2 : pos + 4]!r}") from error
+
+
+def _parse_number(token: str) -> Any:
+    if not token or token == "-":
+        return None
+    try:
+        return json.loads(token)
+    except ValueError:
+        return None
@@ -0,0 +1,123 @@
+"""Tests for reusing built generate_a2ui tools across model calls and threads."""
+
+import gc
+import json
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain.agents.middleware import ModelRequest
+
+from copilotkit import copilotkit_lg_middleware
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+
+SCHEMA = json.dumps({"catalogId": "my-catalog", "components": []})
+
+
+@pytest.fixture
+def built():
+    """Patch get_a2ui_tools and collect the params of every tool it builds."""
+    calls: list = []
+
+    def _build(params):
+        calls.append(params)
+        tool = MagicMock(name="generate_a2ui")
+        tool.name = "generate_a2ui"
+        return tool
+
+    # every test uses its own models, so tools cached by other tests never match
+    with patch.object(copilotkit_lg_middleware, "get_a2ui_tools", _build):
+        yield calls
+    copilotkit_lg_middleware._a2ui_tools_by_thread.clear()
+
+
+def _request(model, schema=SCHEMA):
+    return ModelRequest(
+        model=model,
+        messages=[],
+        system_message=None,
+        tools=[],
+        state={
+            "messages": [],
+            "ag-ui": {"a2ui_schema": schema, "inject_a2ui_tool": True},
+        },
+        runtime=SimpleNamespace(context=None),
+    )
+
+
+def _tool(middleware, request, thread_id="thread"):
+    with patch.object(
+        copilotkit_lg_middleware, "_current_thread_id", return_value=thread_id
+    ):
+        return middleware._maybe_build_a2ui_tool(request)
+
+
+def test_tool_is_built_once_across_calls_and_threads(built):
+    model = MagicMock(name="model")
+    middleware = CopilotKitMiddleware()
+
+    tools = [_tool(middleware, _request(model), thread) for thread in "aabbc"]
+    tools.append(_tool(CopilotKitMiddleware(), _request(model), "d"))
+
+    assert len(built) == 1
+    assert all(tool is tools[0] for tool in tools)
+    assert built[0]["default_catalog_id"] == "my-catalog"
+    assert copilotkit_lg_middleware._a2ui_tools_by_thread["d"] is tools[0]
+
+
+def test_other_models_catalogs_and_params_get_their_own_tool(built):
+    model = MagicMock(name="model")
+    other_schema = json.dumps({"catalogId": "other", "components": []})
+
+    first = _tool(CopilotKitMiddleware(), _request(model))
+    tools = [
+        _tool(CopilotKitMiddleware(), _request(MagicMock(name="other-model"))),
+        _tool(CopilotKitMiddleware(), _request(model, other_schema)),
+        _tool(
+            CopilotKitMiddleware(a2ui_params={"tool_name": "generate_a2ui"}),
+            _request(model),
+        ),
+    ]
+
+    assert len(built) == 4
+    assert all(tool is not first for tool in tools)
+    assert built[2]["default_catalog_id"] == "other"
+
+
+def test_cached_tools_keep_their_model_alive(built):
+    # so the id of a cached model is never recycled for another one
+    model = MagicMock(name="model")
+    model_ref = weakref.ref(model)
+    _tool(CopilotKitMiddleware(), _request(model))
+
+    del model
+    gc.collect()
+
+    assert model_ref() is not None
+
+
+def test_cache_is_bounded(built):
+    size = copilotkit_lg_middleware._A2UI_TOOL_CACHE_SIZE
+    models = [MagicMock(name=f"model-{i}") for i in range(size + 5)]
+    for model in models:
+        _tool(CopilotKitMiddleware(), _request(model))
+
+    _tool(CopilotKitMiddleware(), _request(models[-1]))
+    assert len(built) == size + 5
+    _tool(CopilotKitMiddleware(), _request(models[0]))
+    assert len(built) == size + 6
+
+
+def test_concurrent_runs_share_the_cache(built):
+    models = [MagicMock(name=f"model-{i}") for i in range(8)]
+
+    def _run(i):
+        return _tool(CopilotKitMiddleware(), _request(models[i % len(models)]))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tools = list(pool.map(_run, range(400)))
+
+    assert len({id(tool) for tool in tools}) <= len(built)
+    assert {id(_run(i)) for i in range(len(models))} <= {id(t) for t in tools}
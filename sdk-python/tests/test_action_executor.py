@@ -0,0 +1,104 @@
+"""Synchronous Action handlers run off the event loop.
+
+A blocking handler used to run directly on the loop and stall every other
+request served by the same worker, the wedge reproduced in
+showcase/tests/repro/async-wedge.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from copilotkit import Action
+from copilotkit.header_propagation import get_forwarded_headers, set_forwarded_headers
+
+SLOW_HANDLER_SECONDS = 0.2
+CONCURRENT_HANDLERS = 4
+
+
+def _slow_lookup(city: str):
+    time.sleep(SLOW_HANDLER_SECONDS)
+    return f"sunny in {city}"
+
+
+async def _max_loop_lag(until: asyncio.Future, interval: float = 0.01) -> float:
+    lag = 0.0
+    while not until.done():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, time.perf_counter() - started - interval)
+    return lag
+
+
+@pytest.mark.asyncio
+async def test_slow_sync_handlers_do_not_block_the_loop():
+    action = Action(name="weather", handler=_slow_lookup)
+
+    started = time.perf_counter()
+    runs = asyncio.gather(
+        *(
+            action.execute(arguments={"city": f"city-{i}"})
+            for i in range(CONCURRENT_HANDLERS)
+        )
+    )
+    lag = await _max_loop_lag(runs)
+    results = await runs
+    elapsed = time.perf_counter() - started
+
+    assert [result["result"] for result in results] == [
+        f"sunny in city-{i}" for i in range(CONCURRENT_HANDLERS)
+    ]
+    # On the loop the handlers would run back to back and stall it for each one.
+    assert elapsed < SLOW_HANDLER_SECONDS * CONCURRENT_HANDLERS / 2
+    assert lag < SLOW_HANDLER_SECONDS / 2
+
+
+@pytest.mark.asyncio
+async def test_opt_out_runs_handler_on_the_loop_thread():
+    loop_thread = threading.get_ident()
+    action = Action(name="inline", handler=threading.get_ident, run_in_executor=False)
+
+    assert (await action.execute(arguments={}))["result"] == loop_thread
+
+
+@pytest.mark.asyncio
+async def test_custom_executor_and_forwarded_headers():
+    set_forwarded_headers({"x-request-id": "req-1"})
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="actions") as executor:
+        action = Action(
+            name="headers",
+            handler=lambda: (
+                threading.current_thread().name,
+                get_forwarded_headers(),
+            ),
+            executor=executor,
+        )
+        thread_name, headers = (await action.execute(arguments={}))["result"]
+
+    assert thread_name.startswith("actions")
+    assert headers == {"x-request-id": "req-1"}
+
+
+@pytest.mark.asyncio
+async def test_timeout_applies_to_sync_and_async_handlers():
+    async def _slow_async():
+        await asyncio.sleep(1)
+
+    for handler in (lambda: time.sleep(0.2), _slow_async):
+        action = Action(name="slow", handler=handler, timeout=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await action.execute(arguments={})
+
+
+@pytest.mark.asyncio
+async def test_async_handlers_are_awaited_on_the_loop():
+    loop_thread = threading.get_ident()
+
+    async def _handler(value: int):
+        return value, threading.get_ident()
+
+    action = Action(name="async_action", handler=_handler)
+    assert (await action.execute(arguments={"value": 3}))["result"] == (3, loop_thread)
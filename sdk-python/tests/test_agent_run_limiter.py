@@ -0,0 +1,225 @@
+"""Tests for AgentRunLimiter and admission control in the FastAPI integration."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from copilotkit import Agent, CopilotKitRemoteEndpoint
+from copilotkit.exc import AgentRunRejectedException, CopilotKitMisuseError
+from copilotkit.execution import AgentRunLimiter
+from copilotkit.integrations.fastapi import add_fastapi_endpoint, is_agent_run
+
+
+class GatedAgent(Agent):
+    """Streams one chunk and then waits until the test opens the gate."""
+
+    def __init__(self, gate: asyncio.Event):
+        super().__init__(name="gated")
+        self.gate = gate
+        self.running = 0
+        self.max_running = 0
+
+    def execute(self, **kwargs):  # pylint: disable=arguments-differ
+        async def _stream():
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                yield '{"started": true}\n'
+                await self.gate.wait()
+                yield '{"done": true}\n'
+            finally:
+                self.running -= 1
+
+        return _stream()
+
+    async def get_state(self, *, thread_id: str):
+        return await super().get_state(thread_id=thread_id)
+
+
+def _execute_body():
+    return {"name": "gated", "state": {}, "messages": [], "threadId": "t"}
+
+
+@pytest.mark.asyncio
+async def test_runs_beyond_limit_wait_in_fifo_order():
+    limiter = AgentRunLimiter(max_concurrent_runs=1, max_queued_runs=2)
+    await limiter.acquire()
+    order = []
+
+    async def _run(name):
+        await limiter.acquire()
+        order.append(name)
+
+    first = asyncio.create_task(_run("first"))
+    second = asyncio.create_task(_run("second"))
+    await asyncio.sleep(0)
+    assert limiter.metrics()["queue_depth"] == 2
+
+    limiter.release()
+    await first
+    limiter.release()
+    await second
+    limiter.release()
+
+    assert order == ["first", "second"]
+    metrics = limiter.metrics()
+    assert (metrics["active_runs"], metrics["queue_depth"]) == (0, 0)
+    assert metrics["admitted"] == 3
+    assert metrics["max_wait_time"] > 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_429():
+    limiter = AgentRunLimiter(max_concurrent_runs=1, max_queued_runs=0, retry_after=7)
+    await limiter.acquire()
+
+    with pytest.raises(AgentRunRejectedException) as info:
+        await limiter.acquire()
+
+    assert (info.value.status_code, info.value.retry_after) == (429, 7)
+    assert limiter.metrics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_rejected_with_503():
+    limiter = AgentRunLimiter(max_concurrent_runs=1, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(AgentRunRejectedException) as info:
+        await limiter.acquire()
+
+    assert info.value.status_code == 503
+    assert limiter.metrics()["timed_out"] == 1
+    assert limiter.metrics()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_the_slot():
+    limiter = AgentRunLimiter(max_concurrent_runs=1)
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    limiter.release()  # hands the slot to the waiter
+    waiting.cancel()
+    try:
+        await waiting
+    except asyncio.CancelledError:
+        pass
+    else:
+        # some Python versions let the finished wait win over the cancellation
+        limiter.release()
+
+    assert limiter.metrics()["active_runs"] == 0
+    await asyncio.wait_for(limiter.acquire(), 1)
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(CopilotKitMisuseError):
+        AgentRunLimiter(max_concurrent_runs=0)
+    with pytest.raises(CopilotKitMisuseError):
+        AgentRunLimiter(max_concurrent_runs=1, max_queued_runs=-1)
+
+
+def test_agent_run_paths():
+    assert is_agent_run("POST", "agents/execute")
+    assert is_agent_run("POST", "agent/my_agent")
+    assert not is_agent_run("POST", "agent/my_agent/state")
+    assert not is_agent_run("POST", "info")
+    assert not is_agent_run("GET", "agent/my_agent")
+
+
+@pytest.mark.asyncio
+async def test_fastapi_endpoint_caps_concurrent_runs():
+    gate = asyncio.Event()
+    agent = GatedAgent(gate)
+    limiter = AgentRunLimiter(max_concurrent_runs=2, max_queued_runs=1)
+    app = FastAPI()
+    add_fastapi_endpoint(
+        app,
+        CopilotKitRemoteEndpoint(agents=[agent]),
+        "/copilotkit",
+        run_limiter=limiter,
+    )
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def _post():
+            return await client.post("/copilotkit/agents/execute", json=_execute_body())
+
+        running = [asyncio.create_task(_post()) for _ in range(3)]
+        while limiter.metrics()["queue_depth"] < 1:
+            await asyncio.sleep(0.001)
+
+        rejected = await _post()
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "1"
+
+        info = await client.post("/copilotkit/info", json={})
+        assert info.status_code == 200
+
+        gate.set()
+        responses = await asyncio.gather(*running)
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert agent.max_running == 2
+    metrics = limiter.metrics()
+    assert (metrics["active_runs"], metrics["admitted"], metrics["rejected"]) == (
+        0,
+        3,
+        1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_state_requests_are_not_runs():
+    agent = GatedAgent(asyncio.Event())
+    limiter = AgentRunLimiter(max_concurrent_runs=1)
+    await limiter.acquire()
+    app = FastAPI()
+    add_fastapi_endpoint(
+        app,
+        CopilotKitRemoteEndpoint(agents=[agent]),
+        "/copilotkit",
+        run_limiter=limiter,
+    )
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/copilotkit/agent/gated/state", json={"threadId": "t"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["threadId"] == "t"
+    assert agent.max_running == 0
+    assert limiter.metrics()["admitted"] == 1
+
+
+def test_thread_pool_reuses_bounded_workers():
+    from fastapi.testclient import TestClient  # pylint: disable=import-outside-toplevel
+
+    app = FastAPI()
+    with pytest.warns(DeprecationWarning):
+        add_fastapi_endpoint(
+            app,
+            CopilotKitRemoteEndpoint(),
+            "/copilotkit",
+            use_thread_pool=True,
+            max_workers=2,
+        )
+    before = threading.active_count()
+    with TestClient(app) as client:
+        for _ in range(20):
+            assert client.post("/copilotkit/info", json={}).status_code == 200
+        workers = [
+            thread
+            for thread in threading.enumerate()
+            if thread.name.startswith("copilotkit")
+        ]
+    assert len(workers) <= 2
+    assert threading.active_count() <= before + 3
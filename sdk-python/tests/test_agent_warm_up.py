@@ -0,0 +1,143 @@
+"""Tests for warm_up() and the per-graph introspection cache of LangGraphAGUIAgent."""
+
+import asyncio
+import inspect
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ag_ui_langgraph import LangGraphAgent
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from copilotkit import Agent, CopilotKitRemoteEndpoint
+from copilotkit.integrations.fastapi import add_fastapi_endpoint
+from copilotkit.langgraph_agui_agent import LangGraphAGUIAgent
+
+
+def _graph():
+    builder = StateGraph(MessagesState)
+    builder.add_node("chat", lambda state: {})
+    builder.add_edge(START, "chat")
+    builder.add_edge("chat", END)
+    return builder.compile()
+
+
+def _count_schema_introspection():
+    original = LangGraphAgent.get_schema_keys
+    return patch.object(
+        LangGraphAgent, "get_schema_keys", autospec=True, side_effect=original
+    )
+
+
+def test_schema_keys_are_computed_once_per_graph():
+    graph = _graph()
+    agent = LangGraphAGUIAgent(name="chat", graph=graph)
+
+    with _count_schema_introspection() as introspect:
+        first = agent.get_schema_keys({})
+        agent.clone().get_schema_keys({})
+        LangGraphAGUIAgent(name="other", graph=graph).get_schema_keys({})
+
+    assert introspect.call_count == 1
+    assert "messages" in first["input"] and "copilotkit" in first["input"]
+    # callers get their own lists
+    first["input"].append("mutated")
+    assert "mutated" not in agent.get_schema_keys({})["input"]
+
+
+def test_other_graphs_and_constant_keys_are_cached_separately():
+    class ExtraKeysAgent(LangGraphAGUIAgent):
+        """Agent with an additional constant schema key."""
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.constant_schema_keys = self.constant_schema_keys + ["extra"]
+
+    graph = _graph()
+    with _count_schema_introspection() as introspect:
+        LangGraphAGUIAgent(name="chat", graph=graph).get_schema_keys({})
+        extra = ExtraKeysAgent(name="extra", graph=graph).get_schema_keys({})
+        LangGraphAGUIAgent(name="chat", graph=_graph()).get_schema_keys({})
+
+    assert introspect.call_count == 3
+    assert "extra" in extra["input"]
+
+
+def test_stream_kwargs_inspect_the_graph_only_in_the_adapter():
+    agent = LangGraphAGUIAgent(name="chat", graph=_graph())
+    asyncio.run(agent.warm_up())
+
+    with patch(
+        "copilotkit.langgraph_agui_agent.inspect.signature", wraps=inspect.signature
+    ) as signature:
+        for _ in range(3):
+            kwargs = agent.get_stream_kwargs(input={"messages": []}, config={})
+
+    # once per run by the adapter's get_stream_kwargs, not again by CopilotKit's
+    assert signature.call_count == 3
+    assert kwargs["input"] == {"messages": []}
+
+
+def test_warm_up_returns_capabilities_and_runs_connect_hooks():
+    calls = []
+
+    async def _async_hook():
+        calls.append("async")
+
+    def _failing_hook():
+        raise ConnectionError("provider unreachable")
+
+    agent = LangGraphAGUIAgent(name="chat", graph=_graph())
+    capabilities = asyncio.run(
+        agent.warm_up(
+            connect=[lambda: calls.append("sync"), _async_hook, _failing_hook]
+        )
+    )
+
+    assert sorted(calls) == ["async", "sync"]
+    assert isinstance(capabilities["supports_context"], bool)
+    assert "messages" in capabilities["schema_keys"]["output"]
+
+
+class WarmUpAgent(Agent):
+    """Records when it is warmed up."""
+
+    def __init__(self, name: str, fail: bool = False):
+        super().__init__(name=name)
+        self.fail = fail
+        self.warmed_up = False
+
+    def execute(self, **kwargs):  # pylint: disable=arguments-differ
+        raise NotImplementedError()
+
+    async def get_state(self, *, thread_id: str):
+        return await super().get_state(thread_id=thread_id)
+
+    async def warm_up(self) -> None:
+        if self.fail:
+            raise RuntimeError("cannot warm up")
+        self.warmed_up = True
+
+
+def test_fastapi_endpoint_warms_up_agents_at_startup():
+    agents = [WarmUpAgent("first"), WarmUpAgent("broken", fail=True)]
+    app = FastAPI()
+    add_fastapi_endpoint(
+        app, CopilotKitRemoteEndpoint(agents=agents), "/copilotkit", warm_up=True
+    )
+
+    assert not agents[0].warmed_up
+    with TestClient(app) as client:
+        assert agents[0].warmed_up
+        assert client.post("/copilotkit/info", json={}).status_code == 200
+
+
+def test_agents_are_not_warmed_up_unless_asked():
+    agent = WarmUpAgent("first")
+    app = FastAPI()
+    add_fastapi_endpoint(app, CopilotKitRemoteEndpoint(agents=[agent]), "/copilotkit")
+
+    with TestClient(app):
+        pass
+
+    assert not agent.warmed_up
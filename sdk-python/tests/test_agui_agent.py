@@ -4,17 +4,21 @@ Covers:
   1. Custom event handling (_dispatch_event with CopilotKit-specific custom events)
   2. copilotkit state namespace (langgraph_default_merge_state)
   3. Unknown custom events pass through without crashing
+  4. STATE_DELTA emission against the last state sent in a run
 """
 
+import asyncio
 import json
 from contextlib import contextmanager
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import jsonpatch
 import pytest
 from ag_ui.core import (
     CustomEvent,
     EventType,
     RunAgentInput,
+    StateSnapshotEvent,
     TextMessageContentEvent,
     ToolCallStartEvent,
 )
@@ -23,6 +27,7 @@ from copilotkit import CopilotKitRemoteEndpoint
 from copilotkit.langgraph_agui_agent import (
     CustomEventNames,
     LangGraphAGUIAgent,
+    _json_patch,
 )
 
 
@@ -237,6 +242,133 @@ class TestManuallyEmitState:
         assert EventType.STATE_SNAPSHOT in types
 
 
+# ---------- STATE_DELTA emission ----------
+
+
+def _rows(count):
+    return [{"id": i, "title": f"todo {i}", "done": False} for i in range(count)]
+
+
+@pytest.fixture
+def delta_agent():
+    """A LangGraphAGUIAgent that sends STATE_DELTA events."""
+    a = LangGraphAGUIAgent(name="test", graph=MagicMock(), emit_state_deltas=True)
+    a.active_run = {"id": "run-1", "thread_id": "t-1"}
+    return a
+
+
+class TestStateDeltas:
+    """Small changes to a large state are sent as JSON Patch STATE_DELTA events."""
+
+    def _snapshot(self, agent, state):
+        return agent._dispatch_event(
+            StateSnapshotEvent(type=EventType.STATE_SNAPSHOT, snapshot=state)
+        )
+
+    def test_first_snapshot_of_run_is_sent_in_full(self, delta_agent):
+        result = self._snapshot(delta_agent, {"todos": _rows(200)})
+        assert result.type == EventType.STATE_SNAPSHOT
+
+    def test_small_change_is_sent_as_delta(self, delta_agent):
+        before = {"todos": _rows(200)}
+        after = json.loads(json.dumps(before))
+        after["todos"][10]["done"] = True
+        after["todos"].append({"id": 200, "title": "new", "done": False})
+
+        self._snapshot(delta_agent, before)
+        result = self._snapshot(delta_agent, after)
+
+        assert result.type == EventType.STATE_DELTA
+        assert result.delta == [
+            {"op": "replace", "path": "/todos/10/done", "value": True},
+            {
+                "op": "add",
+                "path": "/todos/-",
+                "value": {"id": 200, "title": "new", "done": False},
+            },
+        ]
+        assert jsonpatch.apply_patch(before, result.delta) == after
+
+    def test_large_change_falls_back_to_snapshot(self, delta_agent):
+        self._snapshot(delta_agent, {"todos": _rows(200)})
+        result = self._snapshot(delta_agent, {"todos": _rows(200)[::-1]})
+        assert result.type == EventType.STATE_SNAPSHOT
+
+    def test_unchanged_state_is_resent(self, delta_agent):
+        self._snapshot(delta_agent, {"todos": _rows(50)})
+        result = self._snapshot(delta_agent, {"todos": _rows(50)})
+        assert result.type == EventType.STATE_SNAPSHOT
+
+    def test_checkpoint_snapshots_are_sent_in_full(self, delta_agent):
+        state = {"todos": _rows(100), "progress": 0}
+        delta_agent.get_state_snapshot = lambda values: values
+        delta_agent.graph.aget_state = AsyncMock(
+            return_value=MagicMock(values={**state, "progress": 1})
+        )
+        self._snapshot(delta_agent, state)
+
+        async def _snapshots():
+            return [
+                event
+                async for event in delta_agent.get_state_and_messages_snapshots({})
+            ]
+
+        with patch(
+            "copilotkit.langgraph_agui_agent.LangGraphAgent._dispatch_event",
+            side_effect=lambda event: event,
+        ):
+            events = asyncio.run(_snapshots())
+
+        assert events[0].type == EventType.STATE_SNAPSHOT
+        assert events[0].snapshot["progress"] == 1
+        # later states of the run are sent as deltas again
+        result = self._snapshot(delta_agent, {**state, "progress": 2})
+        assert result.type == EventType.STATE_DELTA
+
+    def test_manually_emitted_state_uses_delta(self, delta_agent):
+        delta_agent.get_state_snapshot = lambda state: state
+        self._snapshot(delta_agent, {"todos": _rows(100), "progress": 0})
+
+        result = delta_agent._dispatch_event(
+            CustomEvent(
+                type=EventType.CUSTOM,
+                name=CustomEventNames.ManuallyEmitState.value,
+                value={"todos": _rows(100), "progress": 1},
+            )
+        )
+
+        assert result.type == EventType.STATE_DELTA
+        assert result.delta == [{"op": "replace", "path": "/progress", "value": 1}]
+
+    def test_deltas_are_opt_in(self, agent):
+        self._snapshot(agent, {"todos": _rows(100)})
+        result = self._snapshot(agent, {"todos": _rows(101)})
+
+        assert result.type == EventType.STATE_SNAPSHOT
+        assert agent.emit_state_deltas is False
+
+    def test_clone_keeps_the_setting(self, delta_agent):
+        assert delta_agent.clone().emit_state_deltas is True
+
+    @pytest.mark.parametrize(
+        "before, after",
+        [
+            ({"a": 1}, {"a": 1, "b": [1, 2]}),
+            ({"a": 1, "b": 2}, {"b": 3}),
+            ({"list": [1, 2, 3, 4]}, {"list": [1, 5]}),
+            ({"x": {"y": 1}}, {"x": [1]}),
+            ({"flag": 1}, {"flag": True}),
+            ({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}}),
+            ([1, 2], {"root": "replaced"}),
+        ],
+    )
+    def test_json_patch_round_trips(self, before, after):
+        patch_ops = _json_patch(before, after)
+        assert jsonpatch.apply_patch(before, patch_ops) == after
+        if before != after:
+            assert patch_ops
+
+
 # ---------- Custom event: copilotkit_exit ----------
 
 
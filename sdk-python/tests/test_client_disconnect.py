@@ -0,0 +1,183 @@
+"""Agent runs are cancelled when the client of the streaming response goes away."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from copilotkit import Agent, CopilotKitRemoteEndpoint
+from copilotkit.execution import AgentRunLimiter, cancellation_metrics
+from copilotkit.integrations.fastapi import AgentStreamingResponse, add_fastapi_endpoint
+from copilotkit.runloop import copilotkit_run
+
+
+class HangingAgent(Agent):
+    """Sends one event, then waits for a model that never answers."""
+
+    def __init__(self):
+        super().__init__(name="hanging")
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    def execute(self, **kwargs):  # pylint: disable=arguments-differ
+        async def _stream():
+            yield '{"started": true}\n'
+            self.started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            yield '{"done": true}\n'
+
+        return _stream()
+
+    async def get_state(self, *, thread_id: str):
+        return await super().get_state(thread_id=thread_id)
+
+
+def _receive_until(disconnect: asyncio.Event, body: bytes = b""):
+    sent_body = False
+
+    async def _receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    return _receive
+
+
+def _collect(messages):
+    async def _send(message):
+        messages.append(message)
+
+    return _send
+
+
+def _execution():
+    return {
+        "thread_id": "thread",
+        "agent_name": "agent",
+        "run_id": "run",
+        "should_exit": False,
+        "node_name": "start",
+        "is_finished": False,
+        "predict_state_configuration": {},
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_stream_and_closes_the_run():
+    agent = HangingAgent()
+    disconnect = asyncio.Event()
+    closed = []
+    response = AgentStreamingResponse(agent.execute(), media_type="application/json")
+    response.on_close.append(lambda: closed.append(True))
+    before = cancellation_metrics()["client_disconnects"]
+    messages = []
+
+    serving = asyncio.create_task(
+        response({"type": "http"}, _receive_until(disconnect), _collect(messages))
+    )
+    await agent.started.wait()
+    disconnect.set()
+    await asyncio.wait_for(serving, 1)
+
+    assert agent.cancelled
+    assert closed == [True]
+    assert cancellation_metrics()["client_disconnects"] == before + 1
+    assert [m.get("body") for m in messages if m["type"] == "http.response.body"] == [
+        b'{"started": true}\n'
+    ]
+
+
+@pytest.mark.asyncio
+async def test_completed_stream_is_not_counted_as_disconnect():
+    async def _events():
+        yield "one\n"
+        yield "two\n"
+
+    before = cancellation_metrics()["client_disconnects"]
+    messages = []
+    response = AgentStreamingResponse(_events(), media_type="application/json")
+    await response(
+        {"type": "http"}, _receive_until(asyncio.Event()), _collect(messages)
+    )
+
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    assert bodies == [b"one\n", b"two\n", b""]
+    assert cancellation_metrics()["client_disconnects"] == before
+
+
+@pytest.mark.asyncio
+async def test_closing_copilotkit_run_cancels_its_task():
+    cancelled = asyncio.Event()
+
+    async def _run():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    before = cancellation_metrics()["cancelled_runs"]
+    events = copilotkit_run(_run, execution=_execution())
+    pending = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    await events.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert cancellation_metrics()["cancelled_runs"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_disconnect_frees_the_agent_run_slot():
+    agent = HangingAgent()
+    limiter = AgentRunLimiter(max_concurrent_runs=1)
+    app = FastAPI()
+    add_fastapi_endpoint(
+        app,
+        CopilotKitRemoteEndpoint(agents=[agent]),
+        "/copilotkit",
+        run_limiter=limiter,
+    )
+    body = json.dumps(
+        {"name": "hanging", "state": {}, "messages": [], "threadId": "t"}
+    ).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/copilotkit/agents/execute",
+        "raw_path": b"/copilotkit/agents/execute",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    disconnect = asyncio.Event()
+
+    serving = asyncio.create_task(
+        app(scope, _receive_until(disconnect, body), _collect([]))
+    )
+    await agent.started.wait()
+    assert limiter.metrics()["active_runs"] == 1
+
+    disconnect.set()
+    await asyncio.wait_for(serving, 1)
+
+    assert agent.cancelled
+    assert limiter.metrics()["active_runs"] == 0
@@ -0,0 +1,176 @@
+"""Tests for caching generated crew chat inputs by the crew definition."""
+
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+try:
+    from crewai.types.crew_chat import ChatInputField, ChatInputs
+
+    from copilotkit.crewai import crewai_agent
+    from copilotkit.crewai.crewai_agent import (
+        CrewChatInputsCache,
+        crew_chat_inputs_key,
+    )
+
+    _has_crewai = True
+except ImportError:
+    _has_crewai = False
+
+pytestmark = pytest.mark.skipif(not _has_crewai, reason="crewai not installed")
+
+
+def _crew(description="Research {topic}", llm="gpt-4o"):
+    researcher = SimpleNamespace(
+        role="Researcher", goal="Find facts", backstory="Curious", llm=llm
+    )
+    task = SimpleNamespace(
+        description=description, expected_output="A report", agent=researcher
+    )
+    return SimpleNamespace(agents=[researcher], tasks=[task])
+
+
+@pytest.fixture
+def generated():
+    """Patch the generation of chat inputs and collect the crews it ran for."""
+    crews: list = []
+
+    def _generate(crew, crew_name, chat_llm):
+        crews.append(crew)
+        return ChatInputs(
+            crew_name=crew_name,
+            crew_description="Researches a topic",
+            inputs=[ChatInputField(name="topic", description="The topic")],
+        )
+
+    with patch.object(crewai_agent, "crew_chat_generate_crew_chat_inputs", _generate):
+        yield crews
+
+
+def test_key_depends_on_the_crew_definition():
+    key = crew_chat_inputs_key(_crew(), "research", "gpt-4o")
+
+    assert crew_chat_inputs_key(_crew(), "research", "gpt-4o") == key
+    assert (
+        crew_chat_inputs_key(_crew("Research {topic} in {year}"), "research", "gpt-4o")
+        != key
+    )
+    assert crew_chat_inputs_key(_crew(llm="gpt-4o-mini"), "research", "gpt-4o") != key
+    assert crew_chat_inputs_key(_crew(), "research", "claude") != key
+    assert crew_chat_inputs_key(_crew(), "other", "gpt-4o") != key
+
+
+def test_inputs_survive_a_restart(tmp_path, generated):
+    first = CrewChatInputsCache(tmp_path).get_or_generate(_crew(), "research", "gpt-4o")
+    # a new process, or another replica that shares the directory
+    restarted = CrewChatInputsCache(tmp_path)
+    second = restarted.get_or_generate(_crew(), "research", "gpt-4o")
+    restarted.get_or_generate(_crew(), "research", "gpt-4o")
+
+    assert len(generated) == 1
+    assert second == first
+    assert second.inputs[0].name == "topic"
+
+
+def test_entries_of_another_version_are_regenerated(tmp_path, generated):
+    key = crew_chat_inputs_key(_crew(), "research", "gpt-4o")
+    CrewChatInputsCache(tmp_path).get_or_generate(_crew(), "research", "gpt-4o")
+    path = tmp_path / f"{key}.json"
+    stored = json.loads(path.read_text())
+    stored["version"] = -1
+    path.write_text(json.dumps(stored))
+
+    CrewChatInputsCache(tmp_path).get_or_generate(_crew(), "research", "gpt-4o")
+
+    assert len(generated) == 2
+    assert json.loads(path.read_text())["version"] != -1
+
+
+def test_corrupt_entries_are_regenerated(tmp_path, generated):
+    key = crew_chat_inputs_key(_crew(), "research", "gpt-4o")
+    (tmp_path / f"{key}.json").write_text("{not json")
+
+    inputs = CrewChatInputsCache(tmp_path).get_or_generate(
+        _crew(), "research", "gpt-4o"
+    )
+
+    assert len(generated) == 1
+    assert inputs.crew_name == "research"
+
+
+def test_least_recently_used_entries_are_evicted_from_memory(generated):
+    cache = CrewChatInputsCache(max_entries=2)
+    crews = [_crew(f"Research {{topic}} {i}") for i in range(3)]
+    for crew in (crews[0], crews[1], crews[0], crews[2]):
+        cache.get_or_generate(crew, "research", "gpt-4o")
+
+    assert list(cache._entries) == [
+        crew_chat_inputs_key(crew, "research", "gpt-4o")
+        for crew in (crews[0], crews[2])
+    ]
+    assert len(generated) == 3
+
+
+def test_oldest_files_are_evicted(tmp_path, generated):
+    cache = CrewChatInputsCache(tmp_path, max_entries=2)
+    crews = [_crew(f"Research {{topic}} {i}") for i in range(3)]
+    for age, crew in enumerate(crews[:2]):
+        cache.get_or_generate(crew, "research", "gpt-4o")
+        key = crew_chat_inputs_key(crew, "research", "gpt-4o")
+        # set the times so that the order does not depend on the clock resolution
+        os.utime(tmp_path / f"{key}.json", (1_000 + age, 1_000 + age))
+    cache.get_or_generate(crews[2], "research", "gpt-4o")
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    restarted = CrewChatInputsCache(tmp_path)
+    restarted.get_or_generate(crews[1], "research", "gpt-4o")
+    assert len(generated) == 3
+    restarted.get_or_generate(crews[0], "research", "gpt-4o")
+    assert len(generated) == 4
+
+
+def test_memory_hits_do_not_touch_the_directory(tmp_path, generated):
+    cache = CrewChatInputsCache(tmp_path)
+    cache.get_or_generate(_crew(), "research", "gpt-4o")
+
+    with (
+        patch.object(crewai_agent.os, "utime") as utime,
+        patch("builtins.open") as opened,
+    ):
+        cache.get_or_generate(_crew(), "research", "gpt-4o")
+
+    utime.assert_not_called()
+    opened.assert_not_called()
+
+
+def test_unwritable_directories_only_lose_persistence(tmp_path, generated):
+    directory = tmp_path / "file"
+    directory.write_text("")
+    cache = CrewChatInputsCache(directory)
+
+    cache.get_or_generate(_crew(), "research", "gpt-4o")
+    cache.get_or_generate(_crew(), "research", "gpt-4o")
+
+    assert len(generated) == 1
+
+
+def test_directory_can_be_configured(tmp_path, monkeypatch):
+    monkeypatch.setenv(crewai_agent.CREW_CHAT_INPUTS_CACHE_DIR_ENV, str(tmp_path))
+
+    assert CrewChatInputsCache().directory == tmp_path
+
+
+def test_entries_are_only_kept_in_memory_by_default(monkeypatch, generated):
+    monkeypatch.delenv(crewai_agent.CREW_CHAT_INPUTS_CACHE_DIR_ENV, raising=False)
+    cache = CrewChatInputsCache()
+
+    with patch.object(crewai_agent, "tempfile") as files:
+        cache.get_or_generate(_crew(), "research", "gpt-4o")
+        cache.get_or_generate(_crew(), "research", "gpt-4o")
+
+    assert cache.directory is None
+    files.mkstemp.assert_not_called()
+    assert len(generated) == 1
@@ -0,0 +1,195 @@
+"""Tests for running the crew of ChatWithCrewFlow off the event loop."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+try:
+    from crewai import Flow
+
+    from copilotkit.crewai import crewai_agent
+    from copilotkit.crewai.crewai_agent import (
+        ChatWithCrewFlow,
+        TaskCompletedEvent,
+        TaskStartedEvent,
+        crewai_event_bus,
+    )
+
+    _has_crewai = True
+except ImportError:
+    _has_crewai = False
+
+pytestmark = pytest.mark.skipif(not _has_crewai, reason="crewai not installed")
+
+
+class FakeAgent:  # pylint: disable=too-few-public-methods
+    """An agent of a crew, hashable like crewai's agents."""
+
+    def __init__(self, crew):
+        self.role = "researcher"
+        self.crew = crew
+
+
+class FakeCrew:
+    """Emits a task event per step and sleeps in between, like a working crew."""
+
+    def __init__(self, steps=3, step_time=0.05, error=None, threaded=False):
+        self.steps = steps
+        self.step_time = step_time
+        self.error = error
+        self.threaded = threaded
+        self.inputs = None
+        self.stopped = threading.Event()
+        self.agent = FakeAgent(self)
+        self.agents = [self.agent]
+        self.tasks = []
+        self.step_callback = None
+        self.task_callback = None
+
+    def _task(self, step):
+        task = SimpleNamespace(name=f"task {step}", agent=self.agent)
+        crewai_event_bus.emit(task, TaskStartedEvent(context="", task=task))
+        time.sleep(self.step_time)
+        if self.error:
+            raise self.error
+        # like crewai, after the agent's step and after the task
+        if self.step_callback:
+            self.step_callback(f"step {step}")
+        if self.task_callback:
+            self.task_callback(f"output {step}")
+
+    def kickoff(self, inputs):
+        self.inputs = inputs
+        try:
+            for step in range(self.steps):
+                if self.threaded:
+                    # like crewai's asynchronous tasks, without the caller's context
+                    worker = threading.Thread(target=self._task, args=(step,))
+                    worker.start()
+                    worker.join()
+                else:
+                    self._task(step)
+            return "crew output"
+        finally:
+            self.stopped.set()
+
+
+def _flow(crew):
+    flow = ChatWithCrewFlow.__new__(ChatWithCrewFlow)
+    Flow.__init__(flow)
+    flow.crew = crew
+    flow.executor = None
+    return flow
+
+
+def test_crew_runs_off_the_loop_and_reports_progress():
+    crew = FakeCrew()
+    flow = _flow(crew)
+    ticks = []
+
+    async def _tick():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+
+    async def _run():
+        ticker = asyncio.create_task(_tick())
+        result = await flow.kickoff_crew({"topic": "ai"}, [{"role": "user"}])
+        ticker.cancel()
+        return result
+
+    with patch.object(crewai_agent, "copilotkit_emit_state", AsyncMock()) as emit:
+        assert asyncio.run(_run()) == "crew output"
+
+    assert crew.inputs["topic"] == "ai"
+    assert crew.inputs["crew_chat_messages"] == '[{"role": "user"}]'
+    # the loop kept running while the crew worked
+    assert len(ticks) > 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.04
+    progress = [call.args[0]["crew_progress"] for call in emit.call_args_list]
+    assert [update["task"] for update in progress] == ["task 0", "task 1", "task 2"]
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_every_update_is_emitted_before_the_result(threaded):
+    flow = _flow(FakeCrew(steps=5, step_time=0, threaded=threaded))
+
+    with patch.object(crewai_agent, "copilotkit_emit_state", AsyncMock()) as emit:
+        assert asyncio.run(flow.kickoff_crew({}, [])) == "crew output"
+
+    progress = [call.args[0]["crew_progress"] for call in emit.call_args_list]
+    assert [update["task"] for update in progress] == [f"task {i}" for i in range(5)]
+    assert flow.crew.step_callback is None
+    assert flow.crew.task_callback is None
+
+
+def test_callbacks_of_the_crew_are_kept():
+    crew = FakeCrew(steps=2, step_time=0)
+    crew.step_callback = steps = MagicMock()
+    crew.task_callback = outputs = MagicMock()
+
+    with patch.object(crewai_agent, "copilotkit_emit_state", AsyncMock()):
+        asyncio.run(_flow(crew).kickoff_crew({}, []))
+
+    assert [call.args[0] for call in steps.call_args_list] == ["step 0", "step 1"]
+    assert [call.args[0] for call in outputs.call_args_list] == ["output 0", "output 1"]
+    assert crew.step_callback is steps
+    assert crew.task_callback is outputs
+
+
+def test_crew_errors_are_raised():
+    flow = _flow(FakeCrew(error=ValueError("crew failed")))
+
+    with patch.object(crewai_agent, "copilotkit_emit_state", AsyncMock()):
+        with pytest.raises(ValueError, match="crew failed"):
+            asyncio.run(flow.kickoff_crew({}, []))
+
+
+def test_cancelling_stops_the_crew_at_its_next_step():
+    crew = FakeCrew(steps=1_000, step_time=0.01)
+    flow = _flow(crew)
+
+    async def _run():
+        kickoff = asyncio.ensure_future(flow.kickoff_crew({}, []))
+        await asyncio.sleep(0.05)
+        kickoff.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await kickoff
+
+    with patch.object(crewai_agent, "copilotkit_emit_state", AsyncMock()):
+        asyncio.run(_run())
+
+    assert crew.stopped.wait(1)
+    assert crew.step_callback is None
+
+
+def test_cancelled_runs_do_not_raise_from_the_event_bus():
+    crew = FakeCrew()
+    run = crewai_agent._CrewRun(crew, lambda update: None)
+    run.cancelled = True
+    task = SimpleNamespace(name="research", agent=crew.agent)
+
+    with run:
+        # the listener only reports, the crew stops at its callbacks
+        run.update(TaskStartedEvent(context="", task=task))
+        with pytest.raises(crewai_agent._CrewCancelled):
+            crew.step_callback("step")
+        with pytest.raises(crewai_agent._CrewCancelled):
+            crew.task_callback("output")
+
+
+def test_completed_tasks_are_counted():
+    progress = crewai_agent._CrewRun(FakeCrew(), lambda update: None)
+    task = SimpleNamespace(name="research")
+
+    progress.update(TaskStartedEvent(context="", task=task))
+    progress.update(
+        TaskCompletedEvent.model_construct(task=task, type="task_completed")
+    )
+
+    assert progress.state["task"] == "research"
+    assert progress.state["tasks_completed"] == 1
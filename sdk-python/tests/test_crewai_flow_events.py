@@ -0,0 +1,119 @@
+"""Tests for routing crewai flow events to the run of the flow that emitted them."""
+
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+
+try:
+    from crewai import Flow
+    from crewai.flow import start
+
+    from copilotkit.crewai import crewai_sdk
+    from copilotkit.crewai.crewai_sdk import (
+        FlowStartedEvent,
+        _crewai_event_bus,
+        crewai_flow_async_runner,
+    )
+    from copilotkit.protocol import RuntimeEventTypes
+    from copilotkit.runloop import RunEventQueue, set_context_queue
+
+    _has_crewai = True
+except ImportError:
+    _has_crewai = False
+
+pytestmark = pytest.mark.skipif(not _has_crewai, reason="crewai not installed")
+
+SOAK_RUNS = 10_000
+
+if _has_crewai:
+
+    class EmittingFlow(Flow):
+        """A flow whose kickoff only emits a FlowStartedEvent."""
+
+        async def kickoff_async(self, inputs=None):
+            _crewai_event_bus.emit(self, FlowStartedEvent(flow_name="emitting"))
+
+        @start()
+        def begin(self):
+            pass
+
+    class ThreadedFlow(EmittingFlow):
+        """A flow whose events are emitted from a worker thread, like crewai's."""
+
+        async def kickoff_async(self, inputs=None):
+            await asyncio.to_thread(
+                _crewai_event_bus.emit, self, FlowStartedEvent(flow_name="threaded")
+            )
+
+
+def _run(flows):
+    """Run every flow in turn and return the events queued by each run."""
+
+    async def _runs():
+        queued = []
+        for flow in flows:
+            q = RunEventQueue()
+            set_context_queue(q)
+            await crewai_flow_async_runner(flow, {})
+            queued.append(q.qsize())
+        return queued
+
+    return asyncio.run(_runs())
+
+
+def _emit_time(flow, events=200):
+    """Seconds per event emitted by a flow that is not running."""
+    start_time = time.perf_counter()
+    for _ in range(events):
+        _crewai_event_bus.emit(flow, FlowStartedEvent(flow_name="idle"))
+    return (time.perf_counter() - start_time) / events
+
+
+def test_each_run_receives_only_its_own_events():
+    queued = _run([EmittingFlow() for _ in range(5)])
+
+    assert queued == [1] * 5
+    assert len(crewai_sdk._running_flows) == 0
+
+
+def test_finished_flows_are_not_kept():
+    flow = EmittingFlow()
+    _run([flow])
+    del flow
+    gc.collect()
+
+    assert len(crewai_sdk._running_flows) == 0
+
+
+def test_event_cost_stays_flat_after_many_runs():
+    idle = EmittingFlow()
+    before = min(_emit_time(idle) for _ in range(3))
+
+    flows = [EmittingFlow() for _ in range(10)]
+    queued = _run(flows[run % len(flows)] for run in range(SOAK_RUNS))
+
+    after = min(_emit_time(idle) for _ in range(3))
+    assert queued == [1] * SOAK_RUNS
+    assert len(crewai_sdk._running_flows) == 0
+    # previously every run left a listener behind, so each event fanned out
+    # to all of them
+    assert after < before * 5 + 1e-4
+
+
+def test_events_emitted_off_loop_are_queued_on_the_loop(monkeypatch):
+    queued_from = []
+    put_nowait = RunEventQueue.put_nowait
+
+    def _put_nowait(self, event):
+        queued_from.append(threading.current_thread())
+        put_nowait(self, event)
+
+    monkeypatch.setattr(RunEventQueue, "put_nowait", _put_nowait)
+
+    queued = _run([ThreadedFlow(), EmittingFlow()])
+
+    assert queued == [1, 1]
+    assert queued_from == [threading.main_thread()] * 2
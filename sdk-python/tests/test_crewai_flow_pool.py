@@ -0,0 +1,241 @@
+"""Tests for reusing pooled flows in CrewAIAgent instead of copying them per request."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+try:
+    from crewai import Agent, Crew, Flow, Task
+    from crewai.tasks.task_output import TaskOutput
+    from crewai.types.usage_metrics import UsageMetrics
+    from crewai.flow import and_, listen, start
+
+    from copilotkit.crewai import crewai_agent
+    from copilotkit.crewai.crewai_agent import CrewAIAgent
+
+    _has_crewai = True
+except ImportError:
+    _has_crewai = False
+
+pytestmark = pytest.mark.skipif(not _has_crewai, reason="crewai not installed")
+
+if _has_crewai:
+
+    class CounterFlow(Flow):
+        """A flow that changes its state and an attribute during a run."""
+
+        def __init__(self):
+            super().__init__()
+            self.resets = 0
+            self.scratch = []
+
+        @start()
+        def count(self):
+            self.state["count"] = self.state.get("count", 0) + 1
+
+        def copilotkit_reset(self):
+            self.resets += 1
+            self.scratch = []
+
+    class JoinFlow(Flow):
+        """A flow with a listener that waits for two start methods."""
+
+        @start()
+        def first(self):
+            self.state.setdefault("calls", []).append("first")
+
+        @start()
+        def second(self):
+            self.state.setdefault("calls", []).append("second")
+
+        @listen(and_(first, second))
+        def joined(self):
+            self.state["calls"].append("joined")
+            return "joined"
+
+    class CrewProject:
+        """A crew project like the ones @CrewBase generates."""
+
+        def crew(self):
+            researcher = Agent(
+                role="Researcher", goal="Find facts", backstory="Curious", llm="gpt-4o"
+            )
+            task = Task(
+                description="Research {topic}",
+                expected_output="A report",
+                agent=researcher,
+            )
+            return Crew(agents=[researcher], tasks=[task], chat_llm="gpt-4o")
+
+
+def _execute(agent, thread_id="thread", fail=False):
+    """Run the agent with execute_flow replaced by a run that uses the flow.
+
+    Returns the flow and its count and scratch as seen at the end of the run.
+    """
+    runs = []
+
+    async def _execute_flow(self, *, flow, **kwargs):
+        flow.state["count"] = flow.state.get("count", 0) + 1
+        flow.scratch.append(thread_id)
+        runs.append((flow, flow.state["count"], list(flow.scratch)))
+        yield "event"
+        if fail:
+            raise RuntimeError("run failed")
+
+    async def _consume():
+        return [
+            event
+            async for event in agent.execute(
+                state={}, thread_id=thread_id, messages=[], actions=[]
+            )
+        ]
+
+    with patch.object(CrewAIAgent, "execute_flow", _execute_flow):
+        try:
+            asyncio.run(_consume())
+        except RuntimeError:
+            pass
+    return runs[0]
+
+
+def test_pooled_flows_are_reused_and_reset():
+    agent = CrewAIAgent(name="counter", flow=CounterFlow(), pool_size=2)
+
+    first, _, _ = _execute(agent, "a")
+    second, count, scratch = _execute(agent, "b")
+
+    assert second is first
+    assert count == 1
+    assert scratch == ["b"]
+    assert second.resets == 2
+    assert agent.flow.state.get("count") is None
+
+
+def test_flows_are_copied_without_a_pool():
+    agent = CrewAIAgent(name="counter", flow=CounterFlow())
+
+    assert _execute(agent)[0] is not _execute(agent)[0]
+
+
+def test_failed_runs_do_not_return_the_flow():
+    agent = CrewAIAgent(name="counter", flow=CounterFlow(), pool_size=2)
+
+    failed, _, _ = _execute(agent, fail=True)
+
+    assert _execute(agent)[0] is not failed
+
+
+def test_warm_up_prepares_the_pool():
+    agent = CrewAIAgent(name="counter", flow=CounterFlow(), pool_size=3)
+    with patch.object(crewai_agent, "deepcopy", wraps=crewai_agent.deepcopy) as copy:
+        asyncio.run(agent.warm_up())
+        copies = copy.call_count
+        _execute(agent)
+        _execute(agent)
+
+    assert copies >= 3
+    # only the initial state is copied again when a flow is returned
+    assert copy.call_count == copies + 2
+
+
+def test_pool_keeps_at_most_pool_size_flows():
+    agent = CrewAIAgent(name="counter", flow=CounterFlow(), pool_size=1)
+    pool = agent._pool
+    checked_out = [pool.check_out() for _ in range(3)]
+    for flow, initial_state in checked_out:
+        pool.check_in(flow, initial_state)
+
+    assert len(pool._idle) == 1
+
+
+def test_negative_pool_size_is_rejected():
+    with pytest.raises(ValueError):
+        CrewAIAgent(name="counter", flow=CounterFlow(), pool_size=-1)
+
+
+def test_real_flows_run_the_same_after_a_reset():
+    agent = CrewAIAgent(name="join", flow=JoinFlow(), pool_size=1)
+    flow, initial_state = agent._pool.check_out()
+
+    runs = []
+    for _ in range(2):
+        result = asyncio.run(flow.kickoff_async())
+        runs.append((result, sorted(flow.state["calls"])))
+        agent._pool.check_in(flow, initial_state)
+        flow, initial_state = agent._pool.check_out()
+
+    assert runs[0] == runs[1] == ("joined", ["first", "joined", "second"])
+    assert flow._method_execution_counts == {}
+    assert flow._pending_and_listeners == {}
+    assert "calls" not in flow.state
+
+
+def _run_crew(crew):
+    """What a kickoff leaves on a crew, its tasks and its agents."""
+    for task in crew.tasks:
+        task.output = TaskOutput(description="", raw="answer", agent="Researcher")
+        task.retry_count = 1
+        task.processed_by_agents.add("Researcher")
+    for agent in crew.agents:
+        agent.tools_results.append({"result": "answer"})
+        agent._times_executed = 1
+        agent._token_process.sum_prompt_tokens(10)
+    crew.usage_metrics = UsageMetrics(total_tokens=10)
+
+
+def test_pooled_crews_are_reset():
+    crew = CrewProject().crew()
+    _run_crew(crew)
+
+    crewai_agent._reset_crew(crew)
+
+    task, agent = crew.tasks[0], crew.agents[0]
+    assert crew.usage_metrics is None
+    assert task.output is None
+    assert task.retry_count == 0
+    assert task.processed_by_agents == set()
+    assert agent.tools_results == []
+    assert agent._times_executed == 0
+    assert agent._token_process.get_summary().prompt_tokens == 0
+
+
+def test_pooled_crews_are_not_copied_per_request():
+    async def _execute_flow(self, *, flow, **kwargs):
+        assert flow.crew.tasks[0].output is None
+        _run_crew(flow.crew)
+        yield "event"
+
+    async def _consume(agent):
+        async for _ in agent.execute(
+            state={}, thread_id="thread", messages=[], actions=[]
+        ):
+            pass
+
+    chat = {
+        name: MagicMock()
+        for name in (
+            "crew_chat_initialize_chat_llm",
+            "crew_chat_generate_crew_tool_schema",
+            "crew_chat_build_system_message",
+        )
+    }
+    agent = CrewAIAgent(name="crew", crew=CrewProject(), pool_size=1)
+    with (
+        patch.multiple(crewai_agent, **chat),
+        patch.object(crewai_agent._crew_chat_inputs_cache, "get_or_generate"),
+        patch.object(CrewAIAgent, "execute_flow", _execute_flow),
+    ):
+        asyncio.run(agent.warm_up())
+        with patch.object(
+            crewai_agent, "deepcopy", wraps=crewai_agent.deepcopy
+        ) as copy:
+            for _ in range(5):
+                asyncio.run(_consume(agent))
+
+    # only the initial state of the flow is copied when it is returned
+    assert copy.call_count == 5
+    assert all(
+        not isinstance(call.args[0], CrewProject) for call in copy.call_args_list
+    )
@@ -0,0 +1,128 @@
+"""Tests for merging token deltas in LangGraphAGUIAgent.run()."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    TextMessageContentEvent,
+    TextMessageEndEvent,
+    TextMessageStartEvent,
+    ToolCallArgsEvent,
+)
+
+from copilotkit.exc import CopilotKitMisuseError
+from copilotkit.langgraph_agui_agent import LangGraphAGUIAgent
+
+
+def _agent(**kwargs):
+    return LangGraphAGUIAgent(name="test", graph=MagicMock(), **kwargs)
+
+
+def _text(delta, message_id="m1"):
+    return TextMessageContentEvent(messageId=message_id, delta=delta)
+
+
+def _args(delta, tool_call_id="t1"):
+    return ToolCallArgsEvent(toolCallId=tool_call_id, delta=delta)
+
+
+def _run(agent, source, received=None):
+    received = [] if received is None else received
+
+    # pylint: disable-next=redefined-builtin,unused-argument
+    async def _super_run(self, input):
+        async for event in source():
+            yield event
+
+    async def _collect():
+        async for event in agent.run(MagicMock()):
+            received.append(event)
+
+    with patch.object(LangGraphAGUIAgent.__bases__[0], "run", new=_super_run):
+        asyncio.run(_collect())
+    return received
+
+
+def _summary(events):
+    return [(event.type, getattr(event, "delta", None)) for event in events]
+
+
+def test_consecutive_deltas_are_merged_until_another_event():
+    async def _source():
+        yield TextMessageStartEvent(messageId="m1", role="assistant")
+        for char in "hello":
+            yield _text(char)
+        yield _text("!", message_id="m2")
+        yield TextMessageEndEvent(messageId="m2")
+        for char in '{"a":1}':
+            yield _args(char)
+        yield None
+
+    events = _run(_agent(coalesce_window=1), _source)
+
+    assert _summary(events) == [
+        (EventType.TEXT_MESSAGE_START, None),
+        (EventType.TEXT_MESSAGE_CONTENT, "hello"),
+        (EventType.TEXT_MESSAGE_CONTENT, "!"),
+        (EventType.TEXT_MESSAGE_END, None),
+        (EventType.TOOL_CALL_ARGS, '{"a":1}'),
+    ]
+    assert events[1].message_id == "m1"
+
+
+def test_window_sends_deltas_while_the_model_is_slow():
+    async def _source():
+        yield _text("a")
+        yield _text("b")
+        await asyncio.sleep(0.05)
+        yield _text("c")
+
+    events = _run(_agent(coalesce_window=0.005), _source)
+
+    assert [event.delta for event in events] == ["ab", "c"]
+
+
+def test_deltas_are_sent_at_the_size_budget():
+    async def _source():
+        for _ in range(10):
+            yield _text("x" * 10)
+
+    events = _run(_agent(coalesce_window=1, coalesce_max_bytes=25), _source)
+
+    assert [event.delta for event in events] == ["x" * 30, "x" * 30, "x" * 30, "x" * 10]
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"coalesce_window": 0}])
+def test_deltas_are_kept_unless_coalescing_is_enabled(kwargs):
+    async def _source():
+        for char in "abc":
+            yield _text(char)
+
+    events = _run(_agent(**kwargs), _source)
+
+    assert [event.delta for event in events] == ["a", "b", "c"]
+
+
+def test_pending_deltas_are_sent_before_errors_of_the_graph():
+    async def _source():
+        yield _text("a")
+        yield _text("b")
+        raise RuntimeError("model failed")
+
+    received = []
+    with pytest.raises(RuntimeError, match="model failed"):
+        _run(_agent(coalesce_window=1), _source, received)
+
+    assert [event.delta for event in received] == ["ab"]
+
+
+def test_options_are_validated_and_cloned():
+    with pytest.raises(CopilotKitMisuseError):
+        _agent(coalesce_window=-1)
+    with pytest.raises(CopilotKitMisuseError):
+        _agent(coalesce_max_bytes=0)
+
+    clone = _agent(coalesce_window=0.05, coalesce_max_bytes=100).clone()
+    assert (clone.coalesce_window, clone.coalesce_max_bytes) == (0.05, 100)
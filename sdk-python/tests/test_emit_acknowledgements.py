@@ -0,0 +1,193 @@
+"""Acknowledged flush for the copilotkit_emit_* helpers.
+
+The helpers used to sleep 20 ms after every dispatch so that a following emit
+could not overtake the previous one on its way to the client. When the graph is
+streamed through LangGraphAGUIAgent, the agent now acknowledges each custom
+event once it has been dispatched, and the helpers wait for that instead.
+Without an acknowledging consumer they do not wait at all.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from ag_ui.core import EventType, UserMessage
+from ag_ui.core.types import RunAgentInput
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from copilotkit.langgraph import (
+    EMIT_ID_METADATA_KEY,
+    EmitAcknowledgements,
+    copilotkit_emit_message,
+    copilotkit_emit_state,
+    copilotkit_emit_tool_call,
+    set_emit_acknowledgements,
+    reset_emit_acknowledgements,
+)
+from copilotkit.langgraph_agui_agent import CustomEventNames, LangGraphAGUIAgent
+
+EMITS = 1_000
+# the delay the helpers used to sleep after every dispatch
+SLEEP_DELAY = 0.02
+MESSAGE_EVENT = CustomEventNames.ManuallyEmitMessage.value
+
+
+class ProgressState(MessagesState):
+    progress: Optional[int]
+
+
+def _run_agent(graph) -> list[Any]:
+    agent = LangGraphAGUIAgent(name="test", graph=graph)
+    run_input = RunAgentInput(
+        threadId="t1",
+        runId="r1",
+        state={},
+        messages=[UserMessage(id="u1", content="hi")],
+        tools=[],
+        context=[],
+        forwardedProps={},
+    )
+
+    async def _run():
+        return [event async for event in agent.run(run_input)]
+
+    return asyncio.run(_run())
+
+
+def test_back_to_back_emits_keep_their_order_without_fixed_delay():
+    async def progress_node(state: ProgressState, config: RunnableConfig):
+        for i in range(EMITS):
+            if i % 2:
+                await copilotkit_emit_state(config, {"progress": i})
+            else:
+                await copilotkit_emit_message(config, f"step {i}")
+        return {"progress": EMITS}
+
+    builder = StateGraph(ProgressState)
+    builder.add_node("progress", progress_node)
+    builder.add_edge(START, "progress")
+    builder.add_edge("progress", END)
+
+    started = time.perf_counter()
+    events = _run_agent(builder.compile(checkpointer=InMemorySaver()))
+    elapsed = time.perf_counter() - started
+
+    emitted = []
+    for event in events:
+        value = None
+        if event.type == EventType.CUSTOM and event.name == MESSAGE_EVENT:
+            value = int(event.value["message"].removeprefix("step "))
+        elif event.type == EventType.STATE_SNAPSHOT:
+            value = event.snapshot.get("progress")
+        # the base adapter follows each emitted state with its own snapshot
+        if value is not None and value < EMITS and value not in emitted[-1:]:
+            emitted.append(value)
+
+    assert emitted == list(range(EMITS))
+    # The sleeping implementation needed EMITS * 20 ms = 20 s.
+    assert elapsed < EMITS * SLEEP_DELAY / 4
+
+
+@pytest.mark.asyncio
+async def test_emit_waits_for_acknowledgement():
+    acks = EmitAcknowledgements()
+    token = set_emit_acknowledgements(acks)
+    dispatched = []
+
+    async def _dispatch(name, payload, config):
+        dispatched.append(config["metadata"][EMIT_ID_METADATA_KEY])
+
+    try:
+        with patch("copilotkit.langgraph.adispatch_custom_event", new=_dispatch):
+            emit = asyncio.create_task(
+                copilotkit_emit_tool_call({}, name="Tool", args={}, tool_call_id="id")
+            )
+            await asyncio.sleep(SLEEP_DELAY * 2)
+            assert dispatched and not emit.done()
+
+            acks.acknowledge(dispatched[0])
+            assert await emit == "id"
+    finally:
+        reset_emit_acknowledgements(token)
+
+
+@pytest.mark.asyncio
+async def test_emits_of_the_same_payload_are_acknowledged_separately():
+    acks = EmitAcknowledgements()
+    token = set_emit_acknowledgements(acks)
+    state = {"progress": 1}
+    dispatched = []
+
+    async def _dispatch(name, payload, config):
+        dispatched.append(config["metadata"][EMIT_ID_METADATA_KEY])
+
+    try:
+        with patch("copilotkit.langgraph.adispatch_custom_event", new=_dispatch):
+            first = asyncio.create_task(copilotkit_emit_state({}, state))
+            second = asyncio.create_task(copilotkit_emit_state({}, state))
+            await asyncio.sleep(0)
+            assert len(set(dispatched)) == 2
+
+            acks.acknowledge(dispatched[1])
+            assert await second is True
+            assert not first.done()
+            acks.acknowledge(dispatched[0])
+            assert await first is True
+    finally:
+        reset_emit_acknowledgements(token)
+
+
+@pytest.mark.asyncio
+async def test_emits_without_a_consumer_do_not_wait(caplog):
+    with (
+        patch(
+            "copilotkit.langgraph.adispatch_custom_event", new_callable=AsyncMock
+        ) as dispatch,
+        patch("copilotkit.langgraph.asyncio.sleep") as sleep,
+    ):
+        started = time.perf_counter()
+        for i in range(EMITS):
+            await copilotkit_emit_state({"metadata": {}}, {"progress": i})
+        elapsed = time.perf_counter() - started
+
+    assert dispatch.await_count == EMITS
+    assert dispatch.await_args.kwargs["config"] == {"metadata": {}}
+    sleep.assert_not_called()
+    assert elapsed < EMITS * SLEEP_DELAY / 4
+    assert "not acknowledged" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_emit_times_out():
+    acks = EmitAcknowledgements()
+    token = set_emit_acknowledgements(acks)
+    try:
+        with (
+            patch(
+                "copilotkit.langgraph.adispatch_custom_event", new_callable=AsyncMock
+            ),
+            patch("copilotkit.langgraph.EMIT_ACK_TIMEOUT", 0.01),
+        ):
+            assert await copilotkit_emit_state({}, {"progress": 1}) is True
+    finally:
+        reset_emit_acknowledgements(token)
+
+
+@pytest.mark.asyncio
+async def test_release_all_unblocks_pending_emits():
+    acks = EmitAcknowledgements()
+    token = set_emit_acknowledgements(acks)
+    try:
+        with patch(
+            "copilotkit.langgraph.adispatch_custom_event", new_callable=AsyncMock
+        ):
+            emit = asyncio.create_task(copilotkit_emit_state({}, {"progress": 1}))
+            await asyncio.sleep(0)
+            acks.release_all()
+            assert await emit is True
+    finally:
+        reset_emit_acknowledgements(token)
@@ -13,7 +13,15 @@ from ag_ui.core import (
     TextMessageStartEvent,
     TextMessageContentEvent,
     ToolCallStartEvent,
+    UserMessage,
 )
+from ag_ui.core.types import RunAgentInput
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+from copilotkit.langgraph import copilotkit_customize_config
 from copilotkit.langgraph_agui_agent import LangGraphAGUIAgent
 
 
@@ -192,3 +200,127 @@ class TestNoneEmitMetadataValues:
         event = _make_text_event({"copilotkit:emit-messages": 0})
         result = agent._dispatch_event(event)
         assert result is not None
+
+
+# ---------- Hidden chat models are skipped before events are built ----------
+
+
+def _model_stream_event(metadata: dict, run_id: str = "lg-run-1", content="hi"):
+    return {
+        "event": "on_chat_model_stream",
+        "run_id": run_id,
+        "metadata": metadata,
+        "data": {"chunk": AIMessageChunk(id="ai-1", content=content)},
+    }
+
+
+def _adapter_calls(agent, event):
+    calls = []
+
+    async def _base_handle_single_event(self, event, state):
+        calls.append(event)
+        yield TextMessageContentEvent(messageId="ai-1", delta="hi", rawEvent=event)
+
+    with patch.object(
+        LangGraphAGUIAgent.__bases__[0],
+        "_handle_single_event",
+        new=_base_handle_single_event,
+    ):
+        asyncio.run(_collect_async_gen(agent._handle_single_event(event, {})))
+    return calls
+
+
+class TestHiddenModelRuns:
+    """Models hidden with copilotkit_customize_config never reach the adapter."""
+
+    HIDDEN = {"copilotkit:emit-messages": False, "copilotkit:emit-tool-calls": False}
+
+    def test_hidden_model_stream_is_skipped(self, agent):
+        assert _adapter_calls(agent, _model_stream_event(self.HIDDEN)) == []
+        end_event = {**_model_stream_event(self.HIDDEN), "event": "on_chat_model_end"}
+        assert _adapter_calls(agent, end_event) == []
+
+    def test_partially_hidden_model_is_still_handled(self, agent):
+        event = _model_stream_event({"copilotkit:emit-messages": False})
+        assert _adapter_calls(agent, event) == [event]
+
+    def test_hidden_model_with_predicted_state_is_still_handled(self, agent):
+        event = _model_stream_event(
+            {
+                **self.HIDDEN,
+                "copilotkit:emit-intermediate-state": [
+                    {"state_key": "steps", "tool": "plan", "tool_argument": "steps"}
+                ],
+            }
+        )
+        assert len(_adapter_calls(agent, event)) == 1
+
+    def test_hidden_model_reasoning_is_still_handled(self, agent):
+        event = _model_stream_event(
+            self.HIDDEN, content=[{"type": "thinking", "thinking": "hmm"}]
+        )
+        assert len(_adapter_calls(agent, event)) == 1
+
+    def test_metadata_is_read_once_per_run_id(self, agent):
+        first = _make_text_event({"copilotkit:emit-messages": False})
+        first.raw_event["run_id"] = "lg-run-1"
+        later = _make_text_event({})
+        later.raw_event["run_id"] = "lg-run-1"
+        other_run = _make_text_event({})
+        other_run.raw_event["run_id"] = "lg-run-2"
+
+        assert agent._dispatch_event(first) is None
+        assert agent._dispatch_event(later) is None
+        assert agent._dispatch_event(other_run) is not None
+
+    def test_graph_with_hidden_sub_model_streams_only_the_answer(self):
+        hidden_model = GenericFakeChatModel(
+            messages=iter([AIMessage(content="secret " * 20)])
+        )
+        visible_model = GenericFakeChatModel(messages=iter([AIMessage(content="done")]))
+
+        async def research(state: MessagesState, config: RunnableConfig):
+            await hidden_model.ainvoke(
+                state["messages"],
+                copilotkit_customize_config(
+                    config, emit_messages=False, emit_tool_calls=False
+                ),
+            )
+            return {}
+
+        async def answer(state: MessagesState):
+            return {"messages": [await visible_model.ainvoke(state["messages"])]}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node("research", research)
+        builder.add_node("answer", answer)
+        builder.add_edge(START, "research")
+        builder.add_edge("research", "answer")
+        builder.add_edge("answer", END)
+        graph = builder.compile(checkpointer=InMemorySaver())
+        graph_agent = LangGraphAGUIAgent(name="test", graph=graph)
+        run_input = RunAgentInput(
+            threadId="t1",
+            runId="r1",
+            state={},
+            messages=[UserMessage(id="u1", content="hi")],
+            tools=[],
+            context=[],
+            forwardedProps={},
+        )
+
+        events = asyncio.run(_collect_async_gen(graph_agent.run(run_input)))
+
+        text = "".join(
+            event.delta
+            for event in events
+            if event.type == EventType.TEXT_MESSAGE_CONTENT
+        )
+        assert text == "done"
+        assert events[-1].type == EventType.RUN_FINISHED
+        # the hidden stream is only passed through in the RAW events
+        assert all(
+            event.type == EventType.RAW
+            for event in events
+            if "secret" in event.model_dump_json()
+        )
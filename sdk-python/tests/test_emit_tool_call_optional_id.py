@@ -206,74 +206,74 @@ class TestLangGraphEmitToolCallOptionalId:
                 )
 
     @pytest.mark.asyncio
-    async def test_cancelled_error_propagates_from_post_dispatch_sleep(self):
-        """CancelledError during the shielded post-dispatch sleep must propagate."""
-        with patch(
-            "copilotkit.langgraph.adispatch_custom_event", new_callable=AsyncMock
-        ) as mock_dispatch:
-            from copilotkit.langgraph import copilotkit_emit_tool_call
-
-            config = {"metadata": {}}
-
-            async def _run_and_cancel():
-                task = asyncio.current_task()
-                # Schedule cancellation after dispatch completes but during sleep
-                original_sleep = asyncio.sleep
+    async def test_cancelled_error_propagates_from_post_dispatch_flush(self):
+        """CancelledError while waiting for the shielded flush must propagate."""
+        from copilotkit.langgraph import (
+            EmitAcknowledgements,
+            copilotkit_emit_tool_call,
+            reset_emit_acknowledgements,
+            set_emit_acknowledgements,
+        )
 
-                async def _cancel_during_sleep(delay):
-                    task.cancel()
-                    await original_sleep(0)
+        config = {"metadata": {}}
+        task = asyncio.current_task()
 
-                with patch(
-                    "copilotkit.langgraph.asyncio.sleep",
-                    side_effect=_cancel_during_sleep,
-                ):
-                    with patch(
-                        "copilotkit.langgraph.asyncio.shield",
-                        side_effect=lambda coro: coro,
-                    ):
-                        return await copilotkit_emit_tool_call(
-                            config,
-                            name="CancelTool",
-                            args={},
-                            tool_call_id="cancel-test-id",
-                        )
+        async def _cancel_after_dispatch(*args, **kwargs):
+            # cancel once the emit waits for its acknowledgement
+            asyncio.get_running_loop().call_soon(task.cancel)
 
-            with pytest.raises(asyncio.CancelledError):
-                await _run_and_cancel()
+        token = set_emit_acknowledgements(EmitAcknowledgements())
+        try:
+            with patch(
+                "copilotkit.langgraph.adispatch_custom_event",
+                side_effect=_cancel_after_dispatch,
+            ) as mock_dispatch:
+                with pytest.raises(asyncio.CancelledError):
+                    await copilotkit_emit_tool_call(
+                        config,
+                        name="CancelTool",
+                        args={},
+                        tool_call_id="cancel-test-id",
+                    )
+        finally:
+            reset_emit_acknowledgements(token)
 
-            mock_dispatch.assert_called_once()
+        mock_dispatch.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_cancelled_error_logs_warning(self, caplog):
-        """CancelledError during post-dispatch sleep should log with the tool_call_id."""
-        with patch(
-            "copilotkit.langgraph.adispatch_custom_event", new_callable=AsyncMock
-        ):
-            from copilotkit.langgraph import copilotkit_emit_tool_call
+        """CancelledError during the post-dispatch flush should log with the tool_call_id."""
+        from copilotkit.langgraph import (
+            EmitAcknowledgements,
+            copilotkit_emit_tool_call,
+            reset_emit_acknowledgements,
+            set_emit_acknowledgements,
+        )
 
-            config = {"metadata": {}}
+        config = {"metadata": {}}
+        task = asyncio.current_task()
 
-            async def _cancel_sleep(delay):
-                raise asyncio.CancelledError()
+        async def _cancel_after_dispatch(*args, **kwargs):
+            asyncio.get_running_loop().call_soon(task.cancel)
 
+        token = set_emit_acknowledgements(EmitAcknowledgements())
+        try:
             with caplog.at_level(logging.WARNING, logger="copilotkit.langgraph"):
                 with patch(
-                    "copilotkit.langgraph.asyncio.sleep", side_effect=_cancel_sleep
+                    "copilotkit.langgraph.adispatch_custom_event",
+                    side_effect=_cancel_after_dispatch,
                 ):
-                    with patch(
-                        "copilotkit.langgraph.asyncio.shield",
-                        side_effect=lambda coro: coro,
-                    ):
-                        with pytest.raises(asyncio.CancelledError):
-                            await copilotkit_emit_tool_call(
-                                config,
-                                name="Tool",
-                                args={},
-                                tool_call_id="log-cancel-id",
-                            )
-
-            assert any("log-cancel-id" in record.message for record in caplog.records)
+                    with pytest.raises(asyncio.CancelledError):
+                        await copilotkit_emit_tool_call(
+                            config,
+                            name="Tool",
+                            args={},
+                            tool_call_id="log-cancel-id",
+                        )
+        finally:
+            reset_emit_acknowledgements(token)
+
+        assert any("log-cancel-id" in record.message for record in caplog.records)
 
 
 # ---- CrewAI variant tests ----
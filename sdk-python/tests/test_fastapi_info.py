@@ -0,0 +1,133 @@
+"""Tests for the cached, ETag-aware info endpoint of the FastAPI integration."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from copilotkit import Action, CopilotKitRemoteEndpoint
+from copilotkit.integrations.fastapi import add_fastapi_endpoint, etag_matches
+
+
+def _action(name, description=None):
+    return Action(
+        name=name,
+        description=description or f"{name} action",
+        handler=lambda city: city,
+        parameters=[{"name": "city"}],
+    )
+
+
+@contextmanager
+def _count_dict_repr():
+    original = Action.dict_repr
+    with patch.object(Action, "dict_repr", autospec=True, side_effect=original) as spy:
+        yield spy
+
+
+def _client(sdk):
+    app = FastAPI()
+    add_fastapi_endpoint(app, sdk, "/copilotkit")
+    return TestClient(app)
+
+
+def test_info_returns_etag_and_same_payload_as_before():
+    sdk = CopilotKitRemoteEndpoint(actions=[_action("weather")])
+    response = _client(sdk).post("/copilotkit/info", json={})
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    body = response.json()
+    assert body["actions"] == [
+        {
+            "name": "weather",
+            "description": "weather action",
+            "parameters": [
+                {"name": "city", "type": "string", "required": True, "description": ""}
+            ],
+        }
+    ]
+    assert body["agents"] == []
+    assert "sdkVersion" in body
+
+
+def test_if_none_match_answers_not_modified():
+    client = _client(CopilotKitRemoteEndpoint(actions=[_action("weather")]))
+    etag = client.post("/copilotkit", json={}).headers["etag"]
+
+    response = client.post("/copilotkit", json={}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not response.content
+
+    response = client.post("/copilotkit", json={}, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_static_actions_are_serialized_once():
+    sdk = CopilotKitRemoteEndpoint(actions=[_action("weather")])
+    client = _client(sdk)
+
+    with _count_dict_repr() as spy:
+        etags = {
+            client.post("/copilotkit/info", json={}).headers["etag"] for _ in range(5)
+        }
+
+    assert spy.call_count == 1
+    assert len(etags) == 1
+
+
+def test_etag_changes_when_dynamic_resolver_returns_a_different_set():
+    weather, news = _action("weather"), _action("news")
+    current = [weather]
+    client = _client(CopilotKitRemoteEndpoint(actions=lambda context: list(current)))
+
+    with _count_dict_repr() as spy:
+        first = client.post("/copilotkit/info", json={}).headers["etag"]
+        assert client.post("/copilotkit/info", json={}).headers["etag"] == first
+        assert spy.call_count == 1
+
+        current.append(news)
+        response = client.post(
+            "/copilotkit/info", json={}, headers={"If-None-Match": first}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first
+    assert [action["name"] for action in response.json()["actions"]] == [
+        "weather",
+        "news",
+    ]
+
+
+def test_info_is_not_logged_unless_enabled():
+    sdk = CopilotKitRemoteEndpoint(actions=[_action("weather")])
+    with patch("copilotkit.sdk.pformat") as pformat:
+        sdk.info(context={"properties": {}, "frontend_url": None, "headers": {}})
+    pformat.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ('"other"', False),
+        ("*", True),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_serialized_json_matches_info():
+    sdk = CopilotKitRemoteEndpoint(actions=[_action("weather", "Wetter für Köln")])
+    result = sdk.serialized_info(
+        context={"properties": {}, "frontend_url": None, "headers": {}}
+    )
+    assert json.loads(result["json"]) == result["info"]
@@ -0,0 +1,101 @@
+"""Tests for the pluggable JSON codec used on the serialization hot paths."""
+
+import json
+from enum import Enum
+
+import pytest
+
+from copilotkit import json_codec
+from copilotkit.exc import CopilotKitMisuseError
+from copilotkit.protocol import (
+    RuntimeEventTypes,
+    emit_runtime_events,
+    text_message_content,
+)
+
+
+class Color(Enum):
+    """Plain Enum, not a str subclass"""
+
+    RED = "red"
+
+
+def _installed_codecs():
+    names = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            json_codec.set_json_codec(name)
+        except CopilotKitMisuseError:
+            continue
+        names.append(name)
+    json_codec.set_json_codec()
+    return names
+
+
+@pytest.fixture(params=_installed_codecs())
+def codec(request):
+    yield json_codec.set_json_codec(request.param)
+    json_codec.set_json_codec()
+
+
+def test_enums_are_encoded_as_values(codec):
+    encoded = codec.dumps(
+        {"type": RuntimeEventTypes.TEXT_MESSAGE_CONTENT, "c": Color.RED}
+    )
+    assert json.loads(encoded) == {"type": "TextMessageContent", "c": "red"}
+
+
+def test_output_is_compact_utf8(codec):
+    assert codec.dumps({"a": [1, "ü"]}) == '{"a":[1,"ü"]}'
+    assert codec.dumps_bytes({"a": "ü"}) == '{"a":"ü"}'.encode("utf-8")
+    assert codec.loads(b'{"a":"\\u00fc"}') == {"a": "ü"}
+
+
+def test_values_beyond_the_native_encoder_fall_back(codec):
+    big = 2**70
+    assert json.loads(codec.dumps({"n": big})) == {"n": big}
+    assert json.loads(codec.dumps({"when": object()}, default=lambda _: "x")) == {
+        "when": "x"
+    }
+    with pytest.raises(TypeError):
+        codec.dumps({"when": object()})
+
+
+def test_emit_runtime_events_matches_the_previous_format(codec):
+    events = [
+        text_message_content(message_id="m", content="hello"),
+        {"type": RuntimeEventTypes.RUN_FINISHED, "state": {}},
+    ]
+
+    lines = emit_runtime_events(*events)
+
+    assert lines.endswith("\n")
+    assert [json.loads(line) for line in lines.splitlines()] == [
+        {"type": "TextMessageContent", "messageId": "m", "content": "hello"},
+        {"type": "RunFinished", "state": {}},
+    ]
+    assert codec.name == json_codec.get_json_codec().name
+
+
+def test_stdlib_codec_can_be_forced():
+    try:
+        assert json_codec.set_json_codec("json").name == "json"
+        assert json_codec.dumps({"a": 1}) == '{"a":1}'
+    finally:
+        json_codec.set_json_codec()
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(CopilotKitMisuseError):
+        json_codec.set_json_codec("yaml")
+
+
+def test_missing_codec_is_reported(monkeypatch):
+    def _missing():
+        raise ImportError("msgspec")
+
+    monkeypatch.setitem(json_codec._CODECS, "msgspec", _missing)  # pylint: disable=protected-access
+    before = json_codec.get_json_codec()
+    with pytest.raises(CopilotKitMisuseError, match="pip install msgspec"):
+        json_codec.set_json_codec("msgspec")
+    assert json_codec.get_json_codec() is before
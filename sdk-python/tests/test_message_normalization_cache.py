@@ -0,0 +1,151 @@
+"""Tests for the per-thread cache of fixed message histories in CopilotKitMiddleware."""
+
+import copy
+import json
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from copilotkit import copilotkit_lg_middleware
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+
+PLACEHOLDER = "Tool call 'search' with id '{}' was interrupted before completion."
+
+
+def _ai(name: str, *tool_call_ids: str, string_args: bool = False) -> AIMessage:
+    message = AIMessage(
+        content=[
+            {"type": "text", "text": name},
+            *(
+                {"type": "tool_use", "id": tc_id, "name": "search", "input": "{}"}
+                for tc_id in tool_call_ids
+            ),
+        ],
+        tool_calls=[
+            {"id": tc_id, "name": "search", "args": {"q": name}}
+            for tc_id in tool_call_ids
+        ],
+        id=name,
+    )
+    if string_args:
+        for tool_call in message.tool_calls:
+            tool_call["args"] = json.dumps(tool_call["args"])
+    return message
+
+
+def _tool(tc_id: str, content: str = "result") -> ToolMessage:
+    return ToolMessage(
+        content=content, tool_call_id=tc_id, id=f"tool-{content}-{tc_id}"
+    )
+
+
+def _dump(messages: list) -> list:
+    return [message.model_dump() for message in messages]
+
+
+@pytest.fixture
+def thread():
+    with patch.object(
+        copilotkit_lg_middleware, "_history_cache_key", return_value=("t", "")
+    ):
+        yield
+
+
+def _assert_matches_full_fix(steps: list[list[Any]]):
+    """Grow a history step by step and compare every call with a full fix."""
+    middleware = CopilotKitMiddleware()
+    history: list = []
+    for step in steps:
+        history.extend(step)
+        expected = CopilotKitMiddleware._fix_messages_for_bedrock(
+            copy.deepcopy(history)
+        )
+        assert _dump(middleware._normalize_messages(history, {})) == _dump(expected)
+
+
+def test_regular_turns_match_a_full_fix(thread):
+    _assert_matches_full_fix(
+        [
+            [HumanMessage("hi", id="h1"), _ai("a1", "tc1", string_args=True)],
+            [_tool("tc1"), _ai("a2")],
+            [HumanMessage("more", id="h2"), _ai("a3", "tc2", "tc3")],
+            [_tool("tc2"), _tool("tc3")],
+            [_ai("a4", "tc4")],
+            [_tool("tc4"), _ai("a5"), HumanMessage("bye", id="h3")],
+        ]
+    )
+
+
+def test_results_arriving_in_later_calls_match_a_full_fix(thread):
+    _assert_matches_full_fix(
+        [
+            # the answer to tc1 is only appended with the next call
+            [HumanMessage("hi", id="h1"), _ai("a1", "tc1", "tc2")],
+            [_tool("tc1"), _tool("tc2"), _ai("a2", "tc3")],
+            # a placeholder, then the real result after a later AIMessage
+            [_tool("tc3", PLACEHOLDER.format("tc3")), _ai("a3")],
+            [HumanMessage("again", id="h2"), _tool("tc3", "real")],
+            # a result for a tool call that is only made later
+            [_tool("tc5"), _ai("a4", "tc5")],
+            [_tool("tc5", "late"), HumanMessage("end", id="h3")],
+        ]
+    )
+
+
+def test_only_appended_messages_are_fixed(thread):
+    middleware = CopilotKitMiddleware()
+    history: list = [HumanMessage("hi", id="h0")]
+    for turn in range(50):
+        history.extend([_ai(f"a{turn}", f"tc{turn}"), _tool(f"tc{turn}")])
+    middleware._normalize_messages(history, {})
+
+    history.extend([_ai("next", "tc-next"), _tool("tc-next")])
+    with patch.object(
+        CopilotKitMiddleware,
+        "_fix_messages_for_bedrock",
+        side_effect=CopilotKitMiddleware._fix_messages_for_bedrock,
+    ) as fix:
+        normalized = middleware._normalize_messages(history, {})
+
+    assert sum(len(call.args[0]) for call in fix.call_args_list) <= 4
+    assert len(normalized) == len(history)
+
+
+def test_messages_replaced_under_the_same_id_are_fixed_again(thread):
+    middleware = CopilotKitMiddleware()
+    ai = _ai("a1", "tc1", "fe1")
+    history = [HumanMessage("hi", id="h1"), ai, _tool("tc1"), _ai("a2")]
+    middleware._normalize_messages(history, {})
+
+    # e.g. after_model stripping frontend calls keeps the message id
+    history[1] = ai.model_copy(update={"tool_calls": ai.tool_calls[:1]})
+    normalized = middleware._normalize_messages(history, {})
+
+    assert [tc["id"] for tc in normalized[1].tool_calls] == ["tc1"]
+    assert normalized[1] is history[1]
+
+
+def test_histories_are_not_cached_outside_a_thread():
+    middleware = CopilotKitMiddleware()
+    middleware._normalize_messages([HumanMessage("hi", id="h1"), _ai("a1")], {})
+
+    assert not middleware._normalized_histories
+
+
+def test_cache_is_bounded():
+    middleware = CopilotKitMiddleware()
+    for thread_id in range(copilotkit_lg_middleware._NORMALIZED_HISTORIES_SIZE + 10):
+        with patch.object(
+            copilotkit_lg_middleware,
+            "_history_cache_key",
+            return_value=(thread_id, ""),
+        ):
+            middleware._normalize_messages([HumanMessage("hi", id="h1")], {})
+
+    assert (
+        len(middleware._normalized_histories)
+        == copilotkit_lg_middleware._NORMALIZED_HISTORIES_SIZE
+    )
+    assert (0, "") not in middleware._normalized_histories
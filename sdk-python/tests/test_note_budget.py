@@ -0,0 +1,97 @@
+"""Tests for the size budgets of the notes added by CopilotKitMiddleware."""
+
+import json
+
+import pytest
+
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+from copilotkit.exc import CopilotKitMisuseError
+
+
+def _body(note: str) -> str:
+    return note.split("\n", 1)[1]
+
+
+def test_state_note_is_compact_json_by_default():
+    middleware = CopilotKitMiddleware(expose_state=True)
+    state = {"todos": [{"title": "a", "done": False}], "count": 3}
+
+    body = _body(middleware._build_state_note(state))
+
+    assert "\n" not in body
+    assert json.loads(body) == state
+
+
+def test_long_lists_keep_their_first_and_last_items():
+    middleware = CopilotKitMiddleware(
+        expose_state=True, note_budget={"max_list_items": 4}
+    )
+
+    rendered = json.loads(
+        _body(middleware._build_state_note({"rows": list(range(100))}))
+    )
+
+    assert rendered["rows"] == [0, 1, "… 96 more items …", 98, 99]
+
+
+def test_keys_over_their_budget_are_cut_down():
+    middleware = CopilotKitMiddleware(
+        expose_state=True, note_budget={"max_key_chars": 200}
+    )
+    state = {
+        "document": "x" * 5_000,
+        "rows": [{"id": i, "done": False} for i in range(500)],
+        "title": "Report",
+    }
+
+    body = _body(middleware._build_state_note(state))
+    rendered = json.loads(body)
+
+    assert len(body) < 700
+    assert rendered["title"] == "Report"
+    assert rendered["document"].endswith("more characters]")
+    assert "more items" in json.dumps(rendered["rows"], ensure_ascii=False)
+
+
+def test_keys_past_the_total_budget_are_listed_as_omitted():
+    middleware = CopilotKitMiddleware(expose_state=True, note_budget={"max_chars": 300})
+    state = {"first": "a" * 250, "second": "b" * 5_000, "third": 1}
+
+    body = _body(middleware._build_state_note(state))
+    rendered = json.loads(body)
+
+    assert rendered["first"] == "a" * 250
+    assert rendered["second"] == "[omitted: 5002 characters]"
+    assert set(rendered) == {"first", "second", "third"}
+
+
+def test_state_changed_in_place_is_rendered_again():
+    middleware = CopilotKitMiddleware(
+        expose_state=True, note_budget={"max_list_items": 10}
+    )
+    state = {"rows": list(range(1_000))}
+
+    first = middleware._build_state_note(state)
+    state["rows"].append(1_000)
+
+    assert middleware._build_state_note(state) != first
+    assert "1000" in middleware._build_state_note(state)
+
+
+@pytest.mark.parametrize(
+    "budget", [{"max_chars": 0}, {"max_key_chars": -5}, {"max_list_items": "10"}]
+)
+def test_invalid_budgets_are_rejected(budget):
+    with pytest.raises(CopilotKitMisuseError):
+        CopilotKitMiddleware(note_budget=budget)
+
+
+def test_app_context_note_respects_the_budget():
+    middleware = CopilotKitMiddleware(note_budget={"max_list_items": 2})
+    context = [{"description": f"item {i}", "value": i} for i in range(50)]
+
+    note = middleware._build_app_context_note({"copilotkit": {"context": context}})
+
+    rendered = json.loads(_body(note))
+    assert rendered[1] == "… 48 more items …"
+    assert len(rendered) == 3
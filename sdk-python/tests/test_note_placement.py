@@ -0,0 +1,141 @@
+"""Tests for the prompt-cache friendly placement of CopilotKitMiddleware notes."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from copilotkit.copilotkit_lg_middleware import CopilotKitMiddleware
+from copilotkit.exc import CopilotKitMisuseError
+
+CONTEXT = [{"description": "viewer role", "value": "admin"}]
+
+
+class FakeAnthropicModel(GenericFakeChatModel):
+    """Reports the LLM type of ChatAnthropic."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "anthropic-chat"
+
+
+def _request(model: Any = None, todos: Any = ("buy milk",), messages=None):
+    messages = messages or [
+        HumanMessage("hi", id="h1"),
+        AIMessage(
+            content="",
+            tool_calls=[{"id": "tc1", "name": "search", "args": {}}],
+            id="a1",
+        ),
+        ToolMessage(content="result", tool_call_id="tc1", id="t1"),
+    ]
+    runtime = MagicMock(name="runtime")
+    runtime.context = None
+    return ModelRequest(
+        model=model or GenericFakeChatModel(messages=iter([])),
+        messages=messages,
+        system_message=SystemMessage("You are a helpful assistant."),
+        tools=[],
+        state={
+            "messages": messages,
+            "todos": list(todos),
+            "copilotkit": {"context": CONTEXT},
+        },
+        runtime=runtime,
+    )
+
+
+def _model_request(middleware: CopilotKitMiddleware, request: ModelRequest):
+    received = []
+
+    def _handler(model_request):
+        received.append(model_request)
+        return ModelResponse(result=[AIMessage("ok")])
+
+    middleware.wrap_model_call(request, _handler)
+    return received[0]
+
+
+def _has_cache_control(message) -> bool:
+    return isinstance(message.content, list) and any(
+        isinstance(block, dict) and "cache_control" in block
+        for block in message.content
+    )
+
+
+def test_trailing_notes_keep_the_prompt_prefix_stable():
+    middleware = CopilotKitMiddleware(expose_state=True, note_placement="trailing")
+
+    first = _model_request(middleware, _request(todos=["buy milk"]))
+    second = _model_request(middleware, _request(todos=["buy milk", "walk dog"]))
+
+    assert first.system_message.content == "You are a helpful assistant."
+    assert first.system_message == second.system_message
+    assert first.messages[:-1] == second.messages[:-1]
+    assert "buy milk" in first.messages[-1].content
+    assert "walk dog" in second.messages[-1].content
+    assert "App Context:" in second.messages[-1].content
+    assert not any(_has_cache_control(message) for message in first.messages)
+
+
+def test_system_placement_is_the_default():
+    request = _model_request(CopilotKitMiddleware(expose_state=True), _request())
+
+    assert "Current agent state:" in request.system_message.content
+    assert "App Context:" in request.system_message.content
+    assert len(request.messages) == 3
+
+
+def test_anthropic_models_get_cache_breakpoints():
+    original = _request(model=FakeAnthropicModel(messages=iter([])))
+    middleware = CopilotKitMiddleware(expose_state=True, note_placement="trailing")
+
+    request = _model_request(middleware, original)
+
+    assert request.system_message.content == [
+        {
+            "type": "text",
+            "text": "You are a helpful assistant.",
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+    # the breakpoint ends the conversation, before the notes
+    assert [_has_cache_control(message) for message in request.messages] == [
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert request.messages[2].tool_call_id == "tc1"
+    assert original.messages[2].content == "result"
+
+
+def test_breakpoints_skip_messages_without_content():
+    messages = [
+        HumanMessage(content=["hello", {"type": "text", "text": "there"}], id="h1"),
+        AIMessage(
+            content="",
+            tool_calls=[{"id": "tc1", "name": "search", "args": {}}],
+            id="a1",
+        ),
+    ]
+    middleware = CopilotKitMiddleware(note_placement="trailing")
+
+    request = _model_request(
+        middleware,
+        _request(model=FakeAnthropicModel(messages=iter([])), messages=messages),
+    )
+
+    assert request.messages[0].content == [
+        {"type": "text", "text": "hello"},
+        {"type": "text", "text": "there", "cache_control": {"type": "ephemeral"}},
+    ]
+    assert request.messages[1].content == ""
+
+
+def test_unknown_placement_is_rejected():
+    with pytest.raises(CopilotKitMisuseError):
+        CopilotKitMiddleware(note_placement="middle")
@@ -1,22 +1,18 @@
-"""Tripwire coverage for the partialjson dependency behind predict_state().
-
-`pyproject.toml` allows any partialjson in `>=0.0.8,<2.0.0` (#6123, issue #4131).
-The only consumer is `predict_state()` in copilotkit/runloop.py, which parses the
-still-incomplete tool-call argument buffer via `JSONParser().parse(...)` inside a
-bare `except`. That makes a regression silent: every partialjson failure mode
-degrades to "no predicted state was emitted", and nothing else in the suite looks
-at this path — disabling `JSONParser.parse` outright left all other tests passing.
-
-These assertions are deliberately version-agnostic. Intermediate frames legitimately
-differ across the allowed range (1.1.0 keeps trailing whitespace inside a partially
-streamed string where 0.0.8 dropped it), so we pin only the guarantees the range must
-keep: a completed payload parses exactly, and a prefix yields a prefix.
+"""Coverage for parsing partial tool-call arguments in predict_state().
+
+`predict_state()` in copilotkit/runloop.py feeds each streamed chunk of the tool-call
+arguments to an `IncrementalJSONParser` and drops chunks the parser rejects. That
+makes a regression silent: every parser failure mode degrades to "no predicted state
+was emitted", so these tests look at this path directly. They pin the guarantees
+predict_state() relies on: a completed payload parses exactly, and a prefix yields a
+prefix.
 """
 
 import json
 
-from partialjson.json_parser import JSONParser
+import pytest
 
+from copilotkit.streaming_json import IncrementalJSONParser
 from copilotkit.protocol import RuntimeEventTypes
 from copilotkit.runloop import predict_state
 
@@ -43,7 +39,6 @@ def _execution() -> dict:
             "whole": {"tool_name": TOOL_NAME},
         },
         "predicted_state": {},
-        "argument_buffer": "",
         "current_tool_call": None,
         "state": {},
     }
@@ -85,8 +80,8 @@ def test_streaming_arguments_emit_predicted_state():
     frames, _ = _stream(chunk_size=1)
 
     assert frames, (
-        "no predicted state was emitted while arguments streamed — partialjson "
-        "parsed nothing usable from any prefix of the buffer"
+        "no predicted state was emitted while arguments streamed — the parser "
+        "produced nothing usable from any prefix of the arguments"
     )
     assert len(frames) > 10, f"expected many incremental frames, got {len(frames)}"
 
@@ -109,15 +104,11 @@ def test_intermediate_predictions_are_prefixes_of_the_final_value():
         if partial is None:
             continue
         assert isinstance(partial, str), f"expected a string, got {partial!r}"
-        # Trailing whitespace handling differs across the allowed range, so compare
-        # on the stripped prefix rather than the raw frame.
-        assert final.startswith(partial.rstrip()), (
-            f"{partial!r} is not a prefix of {final!r}"
-        )
+        assert final.startswith(partial), f"{partial!r} is not a prefix of {final!r}"
 
 
 def test_unterminated_escape_does_not_escape_predict_state():
-    """Prefixes that older partialjson rejects must stay contained by the bare except."""
+    """A chunk that ends inside an escape is carried over to the next chunk."""
     execution = _execution()
     predict_state(
         thread_id="t-1",
@@ -130,30 +121,47 @@ def test_unterminated_escape_does_not_escape_predict_state():
         },
     )
 
-    # 0.0.8 raises JSONDecodeError here; 1.x parses it. Either way predict_state()
-    # must not propagate the failure to the run loop.
-    predict_state(
-        thread_id="t-1",
-        agent_name="agent",
-        run_id="run-1",
-        execution=execution,
-        event={
-            "type": RuntimeEventTypes.ACTION_EXECUTION_ARGS,
-            "args": '{"task": "line\\',
-        },
-    )
+    for args in ('{"task": "line\\', 'nbreak"}'):
+        predict_state(
+            thread_id="t-1",
+            agent_name="agent",
+            run_id="run-1",
+            execution=execution,
+            event={"type": RuntimeEventTypes.ACTION_EXECUTION_ARGS, "args": args},
+        )
+
+    assert execution["predicted_state"]["plan"] == "line\nbreak"
 
 
-def test_partialjson_api_contract():
-    """The API predict_state() depends on, asserted directly against the dependency.
+def test_invalid_arguments_do_not_escape_predict_state():
+    """Chunks the parser rejects are dropped instead of failing the run loop."""
+    execution = _execution()
+    for event in (
+        {"type": RuntimeEventTypes.ACTION_EXECUTION_START, "actionName": TOOL_NAME},
+        {"type": RuntimeEventTypes.ACTION_EXECUTION_ARGS, "args": '{"task": ]'},
+    ):
+        assert (
+            predict_state(
+                thread_id="t-1",
+                agent_name="agent",
+                run_id="run-1",
+                execution=execution,
+                event=event,
+            )
+            is None
+        )
 
-    This is the tripwire for a future release inside `>=0.0.8,<2.0.0`: the range
-    admits versions that do not exist yet, and this is what notices if one of them
-    changes the constructor, the method, or the parse of a truncated object.
-    """
-    parser = JSONParser()
 
-    assert parser.parse(PAYLOAD) == ARGUMENTS
-    assert parser.parse('{"task": "wri') == {"task": "wri"}
-    assert parser.parse('{"steps": ["draft"') == {"steps": ["draft"]}
-    assert parser.parse("") == {}
+def test_parser_api_contract():
+    """The API predict_state() depends on, asserted directly against the parser."""
+    for payload, expected in (
+        (PAYLOAD, ARGUMENTS),
+        ('{"task": "wri', {"task": "wri"}),
+        ('{"steps": ["draft"', {"steps": ["draft"]}),
+        ("", {}),
+    ):
+        parser = IncrementalJSONParser()
+        parser.feed(payload)
+        assert parser.value == expected
+    with pytest.raises(ValueError):
+        IncrementalJSONParser().feed("{]")
@@ -0,0 +1,134 @@
+"""Tests for name-indexed lookup and memoized dynamic resolvers in CopilotKitRemoteEndpoint."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from copilotkit import Action, CopilotKitRemoteEndpoint
+from copilotkit.exc import ActionNotFoundException
+from copilotkit.registry import Registry, ResolverCache
+
+
+def _context(tenant=None):
+    return {"properties": {"tenant": tenant}, "frontend_url": None, "headers": {}}
+
+
+def _action(name, result=None):
+    return Action(name=name, handler=lambda: result or name)
+
+
+class _CountingFactory:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, context):
+        self.calls += 1
+        tenant = context["properties"]["tenant"]
+        return [_action("greet", result=f"hello {tenant}"), _action("other")]
+
+
+def test_registry_returns_first_item_for_duplicate_names():
+    first, second = _action("same", "first"), _action("same", "second")
+    registry = Registry([first, second])
+
+    assert registry.get("same") is first
+    assert registry.get("missing") is None
+    assert list(registry) == [first, second]
+
+
+def test_static_actions_are_indexed_once():
+    sdk = CopilotKitRemoteEndpoint(actions=[_action("a"), _action("b")])
+
+    with patch("copilotkit.sdk.Registry", wraps=Registry) as registry_cls:
+        for _ in range(3):
+            assert sdk._get_action(context=_context(), name="b").name == "b"
+
+    assert registry_cls.call_count == 1
+    with pytest.raises(ActionNotFoundException):
+        sdk._get_action(context=_context(), name="missing")
+
+
+def test_static_actions_reindexed_after_mutation():
+    actions = [_action("a")]
+    sdk = CopilotKitRemoteEndpoint(actions=actions)
+    sdk._get_action(context=_context(), name="a")
+
+    actions.append(_action("b"))
+
+    assert sdk._get_action(context=_context(), name="b").name == "b"
+
+
+def test_dynamic_resolver_without_cache_key_runs_every_request():
+    factory = _CountingFactory()
+    sdk = CopilotKitRemoteEndpoint(actions=factory)
+
+    sdk.info(context=_context("acme"))
+    sdk._get_action(context=_context("acme"), name="greet")
+
+    assert factory.calls == 2
+    assert sdk.cache_info() is None
+
+
+def test_dynamic_resolver_is_memoized_per_cache_key():
+    factory = _CountingFactory()
+    sdk = CopilotKitRemoteEndpoint(
+        actions=factory,
+        cache_key=lambda context: context["properties"]["tenant"],
+    )
+
+    first = sdk._get_action(context=_context("acme"), name="greet")
+    again = sdk._get_action(context=_context("acme"), name="greet")
+    other = sdk._get_action(context=_context("globex"), name="greet")
+
+    assert first is again
+    assert first is not other
+    assert factory.calls == 2
+    assert asyncio.run(other.execute(arguments={})) == {"result": "hello globex"}
+    info = sdk.cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 2, 2)
+
+
+def test_cache_key_none_bypasses_cache():
+    factory = _CountingFactory()
+    sdk = CopilotKitRemoteEndpoint(actions=factory, cache_key=lambda context: None)
+
+    sdk.info(context=_context())
+    sdk.info(context=_context())
+
+    assert factory.calls == 2
+    assert sdk.cache_info()["size"] == 0
+
+
+def test_resolver_cache_evicts_least_recently_used():
+    cache = ResolverCache(maxsize=2)
+    builds = []
+
+    def _factory(key):
+        def _build():
+            builds.append(key)
+            return Registry([])
+
+        return _build
+
+    cache.get_or_create("a", _factory("a"))
+    cache.get_or_create("b", _factory("b"))
+    cache.get_or_create("a", _factory("a"))
+    cache.get_or_create("c", _factory("c"))
+    cache.get_or_create("a", _factory("a"))
+    cache.get_or_create("b", _factory("b"))
+
+    assert builds == ["a", "b", "c", "b"]
+    assert cache.info()["evictions"] == 2
+
+
+def test_resolver_cache_expires_entries_after_ttl():
+    cache = ResolverCache(ttl=10)
+    with patch("copilotkit.registry.time.monotonic", return_value=100.0):
+        first = cache.get_or_create("key", lambda: Registry([]))
+    with patch("copilotkit.registry.time.monotonic", return_value=105.0):
+        assert cache.get_or_create("key", lambda: Registry([])) is first
+    with patch("copilotkit.registry.time.monotonic", return_value=111.0):
+        assert cache.get_or_create("key", lambda: Registry([])) is not first
+
+    assert cache.info()["evictions"] == 1
@@ -0,0 +1,174 @@
+"""Tests for the bounded, conflating event queue of copilotkit_run."""
+
+import asyncio
+import json
+
+import pytest
+
+from copilotkit.protocol import (
+    RuntimeEventTypes,
+    action_execution_args,
+    action_execution_start,
+    agent_state_message,
+    meta_event,
+    RuntimeMetaEventName,
+    text_message_content,
+)
+from copilotkit.runloop import (
+    RunEventQueue,
+    copilotkit_run,
+    queue_put,
+    queue_put_nowait,
+)
+
+
+def _state(progress):
+    return agent_state_message(
+        thread_id="thread",
+        agent_name="agent",
+        node_name="node",
+        run_id="run",
+        active=True,
+        role="assistant",
+        state=json.dumps({"progress": progress}),
+        running=True,
+    )
+
+
+def _text(content):
+    return text_message_content(message_id="m", content=content)
+
+
+def _execution(**overrides):
+    execution = {
+        "thread_id": "thread",
+        "agent_name": "agent",
+        "run_id": "run",
+        "should_exit": False,
+        "node_name": "node",
+        "is_finished": False,
+        "predict_state_configuration": {},
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+    execution.update(overrides)
+    return execution
+
+
+def _finished():
+    return {"type": RuntimeEventTypes.RUN_FINISHED, "state": {}}
+
+
+async def _collect(fn, **kwargs):
+    lines = []
+    async for chunk in copilotkit_run(fn, execution=_execution(), **kwargs):
+        lines.extend(json.loads(line) for line in chunk.splitlines())
+    return lines
+
+
+@pytest.mark.asyncio
+async def test_put_waits_while_the_queue_is_full():
+    queue = RunEventQueue(maxsize=2)
+    await queue.put(_text("a"))
+    await queue.put(_text("b"))
+
+    blocked = asyncio.create_task(queue.put(_text("c")))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert [event["content"] for event in await queue.get_batch()] == ["a", "b"]
+    await asyncio.wait_for(blocked, 1)
+    assert [event["content"] for event in await queue.get_batch()] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_pending_state_is_replaced_by_the_latest():
+    queue = RunEventQueue(maxsize=2)
+    await queue.put(_state(1))
+    await queue.put(_text("a"))
+    # the queue is full, but the state replaces the pending one without waiting
+    await asyncio.wait_for(queue.put(_state(2)), 1)
+    await asyncio.wait_for(queue.put(_state(3)), 1)
+    assert queue.qsize() == 2
+
+    batch = await queue.get_batch()
+    # the latest state goes out after the text that was put before it
+    assert len(batch) == 2
+    assert batch[0]["content"] == "a"
+    assert json.loads(batch[1]["state"])["progress"] == 3
+
+    await queue.put(_state(4))
+    assert json.loads((await queue.get_batch())[0]["state"])["progress"] == 4
+
+
+@pytest.mark.asyncio
+async def test_priority_events_skip_the_bound_and_keep_their_position():
+    queue = RunEventQueue(maxsize=1)
+    await queue.put(_text("a"))
+    await asyncio.wait_for(queue.put(_finished(), priority=True), 1)
+    queue.put_nowait(_text("b"))
+
+    batch = await queue.get_batch()
+    assert [event["type"] for event in batch] == [
+        RuntimeEventTypes.TEXT_MESSAGE_CONTENT,
+        RuntimeEventTypes.RUN_FINISHED,
+        RuntimeEventTypes.TEXT_MESSAGE_CONTENT,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_limited_in_size():
+    queue = RunEventQueue()
+    for i in range(5):
+        await queue.put(_text(str(i)))
+
+    assert len(await queue.get_batch(3)) == 3
+    assert len(await queue.get_batch(3)) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_drains_events_in_order_and_stops_when_finished():
+    async def _run():
+        for i in range(100):
+            await queue_put(_text(str(i)))
+        queue_put_nowait(_finished())
+        await queue_put(_text("after the end"))
+
+    lines = await _collect(_run, queue_size=8, batch_size=16)
+
+    assert [line["content"] for line in lines] == [str(i) for i in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_predicted_state_is_sent_once_per_batch_of_arguments():
+    async def _run():
+        await queue_put(
+            meta_event(
+                name=RuntimeMetaEventName.PREDICT_STATE,
+                value={"document": {"tool_name": "write", "tool_argument": "text"}},
+            )
+        )
+        await queue_put(
+            action_execution_start(action_execution_id="1", action_name="write")
+        )
+        for chunk in ['{"te', 'xt": "he', "llo", ' world"}']:
+            await queue_put(action_execution_args(action_execution_id="1", args=chunk))
+        await queue_put(_finished())
+
+    lines = await _collect(_run)
+
+    types = [line["type"] for line in lines]
+    assert types.count(RuntimeEventTypes.ACTION_EXECUTION_ARGS.value) == 4
+    states = [
+        json.loads(line["state"])
+        for line in lines
+        if line["type"] == RuntimeEventTypes.AGENT_STATE_MESSAGE.value
+    ]
+    assert states == [{"document": "hello world"}]
+    assert types[-1] == RuntimeEventTypes.AGENT_STATE_MESSAGE.value
+
+
+def test_queue_size_must_be_positive():
+    with pytest.raises(ValueError):
+        RunEventQueue(maxsize=0)
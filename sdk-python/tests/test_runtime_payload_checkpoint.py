@@ -0,0 +1,128 @@
+"""Tests for keeping the frontend actions and app context out of LangGraph checkpoints."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from ag_ui.core import RunAgentInput
+from ag_ui_langgraph import LangGraphAgent
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from copilotkit.langgraph import CopilotKitState, copilotkit_get_payload
+from copilotkit.langgraph_agui_agent import LangGraphAGUIAgent
+
+TOOL = {
+    "name": "highlight_row",
+    "description": "Highlights a row of the table " + "x" * 2000,
+    "parameters": {"type": "object", "properties": {"row": {"type": "integer"}}},
+}
+CONTEXT = {"description": "viewer role", "value": "admin"}
+
+
+def _input(thread_id="thread", run_id="run"):
+    return RunAgentInput(
+        thread_id=thread_id,
+        run_id=run_id,
+        state={},
+        messages=[{"id": run_id, "role": "user", "content": "hi"}],
+        tools=[TOOL],
+        context=[CONTEXT],
+        forwarded_props={},
+    )
+
+
+def _graph(seen):
+    def chat(state: CopilotKitState):
+        seen.append(copilotkit_get_payload(state))
+        return {}
+
+    builder = StateGraph(CopilotKitState)
+    builder.add_node("chat", chat)
+    builder.add_edge(START, "chat")
+    builder.add_edge("chat", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _run(agent, run_input):
+    async def _consume():
+        return [event async for event in agent.run(run_input)]
+
+    return asyncio.run(_consume())
+
+
+def _checkpointed_bytes(graph):
+    # serialized channel values, as a database checkpointer would store them
+    return sum(len(blob) for _, blob in graph.checkpointer.blobs.values())
+
+
+def test_payload_reaches_the_graph_without_being_checkpointed():
+    seen = []
+    graph = _graph(seen)
+    agent = LangGraphAGUIAgent(
+        name="chat", graph=graph, checkpoint_runtime_payload=False
+    )
+
+    _run(agent, _input())
+
+    assert seen[0]["actions"][0]["name"] == "highlight_row"
+    assert seen[0]["context"] == [CONTEXT]
+    state = graph.get_state({"configurable": {"thread_id": "thread"}}).values
+    assert not state["copilotkit"].get("actions")
+    assert "x" * 2000 not in repr(list(graph.checkpointer.list(None)))
+
+
+def test_checkpoints_are_smaller_without_the_payload():
+    sizes = {}
+    for checkpoint_payload in (True, False):
+        graph = _graph([])
+        agent = LangGraphAGUIAgent(
+            name="chat", graph=graph, checkpoint_runtime_payload=checkpoint_payload
+        )
+        _run(agent, _input())
+        sizes[checkpoint_payload] = _checkpointed_bytes(graph)
+
+    assert sizes[False] * 2 < sizes[True]
+
+
+def test_payload_checkpointed_by_earlier_runs_is_replaced():
+    seen = []
+    graph = _graph(seen)
+    _run(LangGraphAGUIAgent(name="chat", graph=graph), _input(run_id="first"))
+
+    agent = LangGraphAGUIAgent(
+        name="chat", graph=graph, checkpoint_runtime_payload=False
+    )
+    _run(agent, _input(run_id="second"))
+
+    state = graph.get_state({"configurable": {"thread_id": "thread"}}).values
+    assert not state["copilotkit"].get("actions")
+    assert seen[-1]["actions"][0]["name"] == "highlight_row"
+
+
+def test_merge_state_empties_the_payload_keys():
+    agent = LangGraphAGUIAgent(
+        name="chat", graph=MagicMock(), checkpoint_runtime_payload=False
+    )
+    merged = {
+        "messages": [],
+        "tools": [TOOL],
+        "ag-ui": {"tools": [TOOL], "context": [CONTEXT], "a2ui_schema": "{}"},
+        "copilotkit": {"actions": [TOOL]},
+    }
+
+    with patch.object(
+        LangGraphAgent, "langgraph_default_merge_state", return_value=merged
+    ):
+        result = agent.langgraph_default_merge_state({}, [], MagicMock())
+
+    assert result["copilotkit"] == {}
+    assert result["tools"] == []
+    assert result["ag-ui"] == {"tools": [], "context": [], "a2ui_schema": "{}"}
+    assert agent.clone().checkpoint_runtime_payload is False
+
+
+def test_get_payload_outside_a_graph_run_reads_the_state():
+    assert copilotkit_get_payload({"copilotkit": {"actions": [TOOL]}}) == {
+        "actions": [TOOL]
+    }
+    assert copilotkit_get_payload({}) == {}
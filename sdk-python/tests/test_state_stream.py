@@ -0,0 +1,121 @@
+"""Tests for copilotkit_state_stream, the rate-limited state emitter."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from copilotkit.exc import CopilotKitMisuseError
+from copilotkit.langgraph import copilotkit_state_stream
+
+
+class _Recorder:
+    """Stands in for copilotkit_emit_state and records what was emitted."""
+
+    def __init__(self):
+        self.states = []
+
+    async def __call__(self, config, state):
+        self.states.append(state)
+        await asyncio.sleep(0)
+        return True
+
+
+@pytest.fixture
+def emitted():
+    recorder = _Recorder()
+    with patch("copilotkit.langgraph.copilotkit_emit_state", new=recorder):
+        yield recorder.states
+
+
+@pytest.mark.asyncio
+async def test_burst_of_updates_emits_first_and_final_state(emitted):
+    async with copilotkit_state_stream({}, max_hz=10) as stream:
+        for i in range(500):
+            stream.update({"progress": i})
+            await asyncio.sleep(0)
+
+    assert emitted[0] == {"progress": 0}
+    assert emitted[-1] == {"progress": 499}
+    assert len(emitted) <= 3
+
+
+@pytest.mark.asyncio
+async def test_emits_at_most_max_hz_with_latest_wins(emitted):
+    async with copilotkit_state_stream({}, max_hz=20) as stream:
+        for i in range(30):
+            stream.update({"progress": i})
+            await asyncio.sleep(0.01)
+
+    # 0.3 s at 20 Hz allows about 6 emits plus the final flush
+    assert 3 <= len(emitted) <= 9
+    progress = [state["progress"] for state in emitted]
+    assert progress == sorted(set(progress))
+    assert progress[-1] == 29
+
+
+@pytest.mark.asyncio
+async def test_pending_state_is_emitted_without_further_updates(emitted):
+    async with copilotkit_state_stream({}, max_hz=50) as stream:
+        stream.update({"progress": 1})
+        await asyncio.sleep(0.001)
+        stream.update({"progress": 2})
+        await asyncio.sleep(0.1)
+        assert emitted == [{"progress": 1}, {"progress": 2}]
+
+
+@pytest.mark.asyncio
+async def test_no_updates_emits_nothing(emitted):
+    async with copilotkit_state_stream({}):
+        pass
+
+    assert not emitted
+
+
+@pytest.mark.asyncio
+async def test_error_in_block_discards_the_pending_state(emitted):
+    with pytest.raises(RuntimeError):
+        async with copilotkit_state_stream({}, max_hz=1) as stream:
+            stream.update({"progress": 1})
+            await asyncio.sleep(0)
+            stream.update({"progress": 2})
+            raise RuntimeError("node failed")
+
+    # the flusher has stopped by the time the block exits
+    assert stream._flusher.cancelled()
+    await asyncio.sleep(1.1)
+    assert emitted == [{"progress": 1}]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_node_stops_the_flusher(emitted):
+    async def node(stream):
+        async with stream:
+            stream.update({"progress": 1})
+            await asyncio.sleep(0)
+            stream.update({"progress": 2})
+            await asyncio.sleep(10)
+
+    stream = copilotkit_state_stream({}, max_hz=1)
+    task = asyncio.create_task(node(stream))
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert stream._flusher.done()
+    assert emitted == [{"progress": 1}]
+
+
+@pytest.mark.asyncio
+async def test_update_after_close_is_rejected(emitted):
+    async with copilotkit_state_stream({}) as stream:
+        stream.update({"progress": 1})
+
+    with pytest.raises(CopilotKitMisuseError):
+        stream.update({"progress": 2})
+
+
+def test_max_hz_must_be_positive():
+    with pytest.raises(CopilotKitMisuseError):
+        copilotkit_state_stream({}, max_hz=0)
@@ -0,0 +1,153 @@
+"""Tests for reading blocking LLM streams without stalling the event loop."""
+
+import asyncio
+import contextvars
+import time
+from contextlib import aclosing
+
+import pytest
+
+from copilotkit.execution import iterate_in_thread
+from copilotkit.runloop import RunEventQueue, set_context_queue
+
+try:
+    import litellm
+
+    from copilotkit.crewai.crewai_sdk import copilotkit_stream
+
+    _has_litellm = True
+except ImportError:
+    _has_litellm = False
+
+# the time a blocking stream spends reading each chunk
+READ_TIME = 0.1
+# the longest the event loop may be held up while such a stream is consumed
+MAX_LAG = 0.04
+
+_REQUEST = contextvars.ContextVar("request", default=None)
+
+
+def _slow(items):
+    for item in items:
+        time.sleep(READ_TIME)
+        yield item
+
+
+async def _with_loop_lag(consume):
+    """Await ``consume`` and return its result and the largest loop lag seen."""
+    lags = []
+    done = asyncio.Event()
+
+    async def _tick():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    ticker = asyncio.create_task(_tick())
+    await asyncio.sleep(0)  # the ticker starts before ``consume`` can block
+    try:
+        result = await consume
+    finally:
+        done.set()
+        await ticker
+    return result, max(lags, default=0.0)
+
+
+async def _collect(items, **kwargs):
+    return [item async for item in iterate_in_thread(items, **kwargs)]
+
+
+def test_blocking_iterators_do_not_stall_the_loop():
+    items, lag = asyncio.run(_with_loop_lag(_collect(_slow(range(5)))))
+
+    assert items == [0, 1, 2, 3, 4]
+    assert lag < MAX_LAG
+
+
+def test_errors_of_the_iterator_are_raised():
+    def _failing():
+        yield 1
+        raise ValueError("stream broken")
+
+    with pytest.raises(ValueError, match="stream broken"):
+        asyncio.run(_collect(_failing()))
+
+
+def test_stopping_early_closes_the_iterator():
+    read = []
+    closed = []
+
+    def _source():
+        try:
+            for item in range(1_000):
+                read.append(item)
+                yield item
+        finally:
+            closed.append(True)
+
+    async def _first():
+        async with aclosing(iterate_in_thread(_source(), maxsize=4)) as items:
+            async for item in items:
+                return item
+        return None
+
+    async def _run():
+        first = await _first()
+        await asyncio.sleep(0.1)
+        return first
+
+    assert asyncio.run(_run()) == 0
+    assert closed == [True]
+    assert len(read) <= 6
+
+
+def test_the_worker_sees_the_context():
+    def _source():
+        yield _REQUEST.get()
+
+    async def _run():
+        _REQUEST.set("request-1")
+        return await _collect(_source())
+
+    assert asyncio.run(_run()) == ["request-1"]
+
+
+@pytest.mark.skipif(not _has_litellm, reason="litellm not installed")
+class TestCopilotKitStream:
+    """copilotkit_stream with synchronous and asynchronous LiteLLM streams"""
+
+    MESSAGES = [{"role": "user", "content": "hi"}]
+
+    async def _stream(self, response):
+        set_context_queue(RunEventQueue())
+        return await copilotkit_stream(response)
+
+    def test_sync_streams_do_not_stall_the_loop(self):
+        response = litellm.completion(
+            model="gpt-4o",
+            messages=self.MESSAGES,
+            mock_response="Hello there friend",
+            stream=True,
+        )
+        response.completion_stream = _slow(response.completion_stream)
+
+        result, lag = asyncio.run(_with_loop_lag(self._stream(response)))
+
+        assert result.choices[0].message.content == "Hello there friend"
+        assert lag < MAX_LAG
+
+    def test_async_streams_are_read_on_the_loop(self):
+        async def _run():
+            response = await litellm.acompletion(
+                model="gpt-4o",
+                messages=self.MESSAGES,
+                mock_response="Hello there",
+                stream=True,
+            )
+            return await _with_loop_lag(self._stream(response))
+
+        result, lag = asyncio.run(_run())
+
+        assert result.choices[0].message.content == "Hello there"
+        assert lag < MAX_LAG
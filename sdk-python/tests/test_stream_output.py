@@ -0,0 +1,215 @@
+"""Tests for coalescing and compression of the agent event stream."""
+
+import asyncio
+import json
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from copilotkit import Agent, CopilotKitRemoteEndpoint, StreamOutput
+from copilotkit.exc import CopilotKitMisuseError
+from copilotkit.integrations.fastapi import add_fastapi_endpoint
+from copilotkit.protocol import (
+    RuntimeEventTypes,
+    emit_runtime_events,
+    text_message_content,
+    text_message_end,
+)
+from copilotkit.runloop import copilotkit_run, queue_put
+
+
+def _token(content):
+    return emit_runtime_events(text_message_content(message_id="m", content=content))
+
+
+def _end():
+    return emit_runtime_events(text_message_end(message_id="m"))
+
+
+async def _source(chunks, delay=0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def _writes(stream):
+    return [batch async for batch in stream]
+
+
+def _lines(data: bytes):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_coalesced_and_lifecycle_events_flush():
+    output = StreamOutput(coalesce_window=1, compression=False)
+    chunks = [_token(str(i)) for i in range(50)] + [_end()] + [_token("x")]
+
+    stream, headers = output.wrap(_source(chunks))
+    writes = await _writes(stream)
+
+    assert headers == {}
+    assert len(writes) == 2
+    assert b"".join(writes).decode() == "".join(chunks)
+    assert _lines(writes[0])[-1]["type"] == RuntimeEventTypes.TEXT_MESSAGE_END.value
+
+
+@pytest.mark.asyncio
+async def test_window_flushes_while_the_run_is_idle():
+    output = StreamOutput(coalesce_window=0.01, compression=False)
+    gate = asyncio.Event()
+    received = []
+
+    async def _slow_source():
+        yield _token("a")
+        yield _token("b")
+        await gate.wait()
+        yield _token("c")
+
+    stream, _ = output.wrap(_slow_source())
+    first = await asyncio.wait_for(stream.__anext__(), 1)
+    received.append(first)
+    gate.set()
+    received.extend(await _writes(stream))
+
+    assert [line["content"] for line in _lines(received[0])] == ["a", "b"]
+    assert [line["content"] for line in _lines(received[1])] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_sent_at_the_size_budget():
+    output = StreamOutput(coalesce_window=1, max_batch_bytes=200, compression=False)
+    chunks = [_token("x" * 50) for _ in range(10)]
+
+    writes = await _writes(output.wrap(_source(chunks))[0])
+
+    assert 1 < len(writes) < len(chunks)
+    assert all(len(write) < 200 + len(chunks[0]) for write in writes)
+
+
+@pytest.mark.asyncio
+async def test_gzip_batches_decode_as_they_arrive():
+    output = StreamOutput(coalesce_window=1)
+    chunks = [_token(str(i)) for i in range(20)] + [_end()]
+
+    stream, headers = output.wrap(_source(chunks), "br;q=0, gzip, deflate")
+    assert headers == {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    writes = await _writes(stream)
+    # the first batch is complete without waiting for the end of the stream
+    assert decoder.decompress(writes[0]).decode() == "".join(chunks)
+    assert zlib.decompress(b"".join(writes), 16 + zlib.MAX_WBITS).decode() == "".join(
+        chunks
+    )
+
+
+def test_encoding_negotiation():
+    output = StreamOutput()
+    assert output.negotiate("gzip, deflate") == "gzip"
+    assert output.negotiate("gzip;q=0") is None
+    assert output.negotiate("identity") is None
+    assert output.negotiate("*") in ("br", "gzip")
+    assert output.negotiate(None) is None
+    assert StreamOutput(compression=False).negotiate("gzip") is None
+
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(CopilotKitMisuseError):
+        StreamOutput(coalesce_window=-1)
+    with pytest.raises(CopilotKitMisuseError):
+        StreamOutput(max_batch_bytes=0)
+    with pytest.raises(CopilotKitMisuseError):
+        StreamOutput(compression_level=12)
+
+
+@pytest.mark.asyncio
+async def test_copilotkit_run_streams_through_the_output_stage():
+    async def _run():
+        for i in range(100):
+            await queue_put(text_message_content(message_id="m", content=str(i)))
+        await queue_put({"type": RuntimeEventTypes.RUN_FINISHED, "state": {}})
+
+    execution = {
+        "thread_id": "thread",
+        "agent_name": "agent",
+        "run_id": "run",
+        "should_exit": False,
+        "node_name": "node",
+        "is_finished": False,
+        "predict_state_configuration": {},
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+    stream, _ = StreamOutput(compression=False).wrap(
+        copilotkit_run(_run, execution=execution)
+    )
+
+    lines = _lines(b"".join(await _writes(stream)))
+
+    assert [line["content"] for line in lines] == [str(i) for i in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_output_cancels_the_run():
+    cancelled = asyncio.Event()
+
+    async def _hanging():
+        try:
+            yield _token("a")
+            await asyncio.Event().wait()
+        finally:
+            cancelled.set()
+
+    stream, _ = StreamOutput(coalesce_window=0.001).wrap(_hanging(), "gzip")
+    await asyncio.wait_for(stream.__anext__(), 1)
+    await stream.aclose()
+
+    assert cancelled.is_set()
+
+
+class TokenAgent(Agent):
+    """Streams a fixed answer"""
+
+    def __init__(self):
+        super().__init__(name="tokens")
+
+    def execute(self, **kwargs):  # pylint: disable=arguments-differ
+        return _source([_token(f"token {i} ") for i in range(200)] + [_end()])
+
+    async def get_state(self, *, thread_id: str):
+        return await super().get_state(thread_id=thread_id)
+
+
+@pytest.mark.asyncio
+async def test_fastapi_endpoint_compresses_agent_runs():
+    app = FastAPI()
+    add_fastapi_endpoint(
+        app,
+        CopilotKitRemoteEndpoint(agents=[TokenAgent()]),
+        "/copilotkit",
+        stream_output=StreamOutput(),
+    )
+    body = {"name": "tokens", "state": {}, "messages": [], "threadId": "t"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        compressed = await client.post(
+            "/copilotkit/agents/execute",
+            json=body,
+            headers={"Accept-Encoding": "gzip"},
+        )
+        plain = await client.post(
+            "/copilotkit/agents/execute",
+            json=body,
+            headers={"Accept-Encoding": "identity"},
+        )
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert compressed.text == plain.text
+    assert len(_lines(plain.content)) == 201
@@ -0,0 +1,146 @@
+"""Tests for the incremental JSON parser behind predict_state().
+
+`IncrementalJSONParser` replaces re-parsing the whole tool-call argument buffer
+on every ACTION_EXECUTION_ARGS chunk. These tests pin the guarantees
+predict_state() relies on: any chunking of a document produces the same final
+value as `json.loads`, prefixes expose a usable partial value, and the `keys`
+filter only materializes the configured top-level arguments.
+"""
+
+import json
+
+import pytest
+
+from copilotkit.protocol import RuntimeEventTypes
+from copilotkit.runloop import predict_state
+from copilotkit.streaming_json import IncrementalJSONParser
+
+DOCUMENT = {
+    "title": 'Quarterly "report"\n\ttabbed \\ slashed',
+    "unicode": "café ☃ \U0001f600",
+    "numbers": [0, -1, 3.25, 1e-7, 12345678901234567890],
+    "flags": [True, False, None],
+    "nested": {"empty_object": {}, "empty_list": [], "deep": [[{"a": [1]}]]},
+}
+
+
+def _feed(parser: IncrementalJSONParser, payload: str, chunk_size: int):
+    for start in range(0, len(payload), chunk_size):
+        parser.feed(payload[start : start + chunk_size])
+    return parser.value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 13, 1000])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_any_chunking_matches_json_loads(chunk_size, ensure_ascii):
+    payload = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii, indent=2)
+    parser = IncrementalJSONParser()
+
+    assert _feed(parser, payload, chunk_size) == DOCUMENT
+    assert parser.complete
+
+
+@pytest.mark.parametrize(
+    "prefix, expected",
+    [
+        ("", {}),
+        ('{"ta', {}),
+        ('{"task": ', {}),
+        ('{"task": "wri', {"task": "wri"}),
+        ('{"task": "line\\', {"task": "line"}),
+        ('{"task": "\\u00', {"task": ""}),
+        ('{"n": 12', {"n": 12}),
+        ('{"n": 1.', {"n": 1}),
+        ('{"flag": tr', {}),
+        ('{"steps": ["draft"', {"steps": ["draft"]}),
+        ('{"a": [1, {"b": "x', {"a": [1, {"b": "x"}]}),
+    ],
+)
+def test_prefix_exposes_partial_value(prefix, expected):
+    parser = IncrementalJSONParser()
+    parser.feed(prefix)
+
+    assert parser.value == expected
+
+
+def test_streaming_string_is_only_joined_when_read():
+    parser = IncrementalJSONParser(keys=["document"])
+    parser.feed('{"document": "')
+    for _ in range(1_000):
+        parser.feed("lorem ")
+
+    # nothing was joined while feeding
+    assert parser._string_prefix == ""
+    assert parser.get("document") == "lorem " * 1_000
+    parser.feed("ipsum")
+    assert parser.get("document") == "lorem " * 1_000 + "ipsum"
+    parser.feed('"}')
+    assert parser.value == {"document": "lorem " * 1_000 + "ipsum"}
+
+
+def test_split_surrogate_pair_is_decoded():
+    payload = json.dumps({"emoji": "\U0001f600"})
+    split = payload.index("\\ude")
+    parser = IncrementalJSONParser()
+
+    parser.feed(payload[: split - 1])
+    parser.feed(payload[split - 1 :])
+
+    assert parser.value == {"emoji": "\U0001f600"}
+
+
+def test_keys_filter_only_materializes_requested_members():
+    payload = json.dumps(
+        {"skip": {"task": "nested"}, "task": "kept", "other": [1, 2, 3]}
+    )
+    parser = IncrementalJSONParser(keys=["task"])
+
+    assert _feed(parser, payload, 4) == {"task": "kept"}
+    assert parser.get("task") == "kept"
+    assert parser.get("skip") is None
+
+
+@pytest.mark.parametrize("payload", ['{"a" 1}', "[1,]", '{"a": tx}', "{]", '"\\x"'])
+def test_invalid_json_raises_and_stays_failed(payload):
+    parser = IncrementalJSONParser()
+
+    with pytest.raises(ValueError):
+        _feed(parser, payload, 1)
+    with pytest.raises(ValueError):
+        parser.feed("{}")
+
+
+def test_predict_state_keeps_one_parser_per_tool_call():
+    execution = {
+        "thread_id": "t-1",
+        "agent_name": "agent",
+        "run_id": "run-1",
+        "should_exit": False,
+        "node_name": "node",
+        "is_finished": False,
+        "predict_state_configuration": {
+            "document": {"tool_name": "write", "tool_argument": "document"},
+        },
+        "predicted_state": {},
+        "current_tool_call": None,
+        "state": {},
+    }
+
+    def _event(event_type, **kwargs):
+        return predict_state(
+            thread_id="t-1",
+            agent_name="agent",
+            run_id="run-1",
+            execution=execution,
+            event={"type": event_type, **kwargs},
+        )
+
+    for text in ("first", "second"):
+        _event(RuntimeEventTypes.ACTION_EXECUTION_START, actionName="write")
+        payload = json.dumps({"other": [1, 2], "document": text})
+        for char in payload:
+            _event(RuntimeEventTypes.ACTION_EXECUTION_ARGS, args=char)
+        parser = execution["argument_parser"]
+
+        assert execution["predicted_state"]["document"] == text
+        assert parser.value == {"document": text}